@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    from supabase import AsyncClient, acreate_client
+except ImportError:
+    AsyncClient = None  # type: ignore[assignment,misc]
+    acreate_client = None
+
+logger = logging.getLogger("zora-agent.config")
+
+CALCOM_CONFIG_FUNCTION = "get-assistant-calcom-config"
+
+# config younger than this is served without contacting Supabase
+CONFIG_FRESH_TTL_S = 60.0
+# older config is still served immediately (and refreshed in the background) up to this age
+CONFIG_STALE_TTL_S = 60 * 60.0
+CONFIG_CACHE_MAX_ENTRIES = 256
+# a call never waits longer than this on Supabase when no usable config is cached
+CONFIG_FETCH_TIMEOUT_S = 3.0
+
+
+class ConfigUnavailableError(Exception):
+    """The configuration could not be fetched (Supabase unreachable, slow or failing).
+
+    Not the same as an assistant without Cal.com configuration, for which the loader returns None.
+    """
+
+
+@dataclass
+class ConfigLoaderStats:
+    fresh_hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refresh_failures: int = 0
+
+
+@dataclass
+class _Entry:
+    config: dict[str, Any] | None
+    fetched_at: float
+
+
+class AssistantConfigLoader:
+    """Loads per-assistant Cal.com configuration through the `get-assistant-calcom-config`
+    edge function.
+
+    One Supabase client is kept for the whole worker process. Results are kept in an LRU cache
+    and served stale-while-revalidate, so a slow or failing Supabase never blocks a call when a
+    recent config exists.
+    """
+
+    def __init__(
+        self,
+        *,
+        supabase_url: str | None = None,
+        supabase_key: str | None = None,
+        fresh_ttl: float = CONFIG_FRESH_TTL_S,
+        stale_ttl: float = CONFIG_STALE_TTL_S,
+        max_entries: int = CONFIG_CACHE_MAX_ENTRIES,
+        fetch_timeout: float = CONFIG_FETCH_TIMEOUT_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._supabase_url = supabase_url
+        self._supabase_key = supabase_key
+        self._fresh_ttl = fresh_ttl
+        self._stale_ttl = stale_ttl
+        self._max_entries = max_entries
+        self._fetch_timeout = fetch_timeout
+        self._clock = clock
+
+        self._client: AsyncClient | None = None
+        self._client_lock = asyncio.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._pending: dict[str, asyncio.Future[dict[str, Any] | None]] = {}
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self._realtime_channel: Any = None
+        self._watch_task: asyncio.Task[bool] | None = None
+        self.stats = ConfigLoaderStats()
+
+    async def get_calcom_config(self, assistant_id: str) -> dict[str, Any] | None:
+        """Configuration Cal.com de l'assistant, ou None si non configuré.
+
+        Lève `ConfigUnavailableError` si elle n'a pas pu être récupérée (et n'est pas en cache).
+        """
+        if (entry := self._entries.get(assistant_id)) is not None:
+            age = self._clock() - entry.fetched_at
+            if age < self._stale_ttl:
+                self._entries.move_to_end(assistant_id)
+                if age < self._fresh_ttl:
+                    self.stats.fresh_hits += 1
+                else:
+                    self.stats.stale_hits += 1
+                    self._refresh_in_background(assistant_id)
+                return entry.config
+
+            del self._entries[assistant_id]
+
+        self.stats.misses += 1
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(self._fetch_shared(assistant_id)), self._fetch_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"❌ Délai dépassé pour la config Cal.com de l'assistant {assistant_id}")
+            raise ConfigUnavailableError(
+                f"Cal.com config of assistant {assistant_id} not fetched in time"
+            ) from None
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la récupération de la config Cal.com: {e}")
+            raise ConfigUnavailableError(f"Cal.com config of assistant {assistant_id}: {e}") from e
+
+    def invalidate(self, assistant_id: str) -> None:
+        """Oublie la config d'un assistant (ex: nouveaux réglages Cal.com sauvegardés)"""
+        if self._entries.pop(assistant_id, None) is not None:
+            logger.info(f"🔄 Config Cal.com invalidée pour l'assistant {assistant_id}")
+
+    def start_watching(self) -> None:
+        """Lance `watch_updates` en arrière-plan (une seule fois par processus)"""
+        if self._watch_task is None or (
+            self._watch_task.done() and self._realtime_channel is None
+        ):
+            self._watch_task = asyncio.create_task(self.watch_updates())
+            self._tasks.add(self._watch_task)
+            self._watch_task.add_done_callback(self._tasks.discard)
+
+    async def watch_updates(self) -> bool:
+        """Invalide le cache à chaque mise à jour de la table `assistants` (Supabase Realtime).
+
+        Best effort: requires the table to be part of the realtime publication.
+        """
+        if self._realtime_channel is not None:
+            return True
+
+        try:
+            client = await self._get_client()
+            if client is None:
+                return False
+
+            def _on_update(payload: dict[str, Any]) -> None:
+                data = payload.get("data", payload)
+                record = data.get("record") or data.get("new") or {}
+                if assistant_id := record.get("id"):
+                    self.invalidate(str(assistant_id))
+
+            channel = client.channel("assistants-config").on_postgres_changes(
+                "UPDATE", _on_update, table="assistants", schema="public"
+            )
+            await channel.subscribe()
+            self._realtime_channel = channel
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Abonnement aux mises à jour des assistants impossible: {e}")
+            return False
+
+    async def aclose(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._realtime_channel is not None:
+            try:
+                await self._realtime_channel.unsubscribe()
+            except Exception:
+                pass
+            self._realtime_channel = None
+
+    def _fetch_shared(self, assistant_id: str) -> asyncio.Future[dict[str, Any] | None]:
+        if (pending := self._pending.get(assistant_id)) is None:
+            pending = asyncio.ensure_future(self._fetch(assistant_id))
+            self._pending[assistant_id] = pending
+
+            def _on_done(fut: asyncio.Future[dict[str, Any] | None]) -> None:
+                self._pending.pop(assistant_id, None)
+                if not fut.cancelled():
+                    fut.exception()
+
+            pending.add_done_callback(_on_done)
+        return pending
+
+    def _refresh_in_background(self, assistant_id: str) -> None:
+        if assistant_id in self._pending:
+            return
+
+        async def _refresh() -> None:
+            try:
+                await self._fetch_shared(assistant_id)
+            except Exception as e:
+                self.stats.refresh_failures += 1
+                logger.warning(f"⚠️ Rafraîchissement de la config Cal.com échoué: {e}")
+
+        task = asyncio.create_task(_refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, assistant_id: str) -> dict[str, Any] | None:
+        client = await self._get_client()
+        if client is None:
+            # the assistant may well have a configuration: it just can't be read
+            raise ConfigUnavailableError("Supabase client not available")
+
+        data = await client.functions.invoke(
+            CALCOM_CONFIG_FUNCTION,
+            invoke_options={"body": {"assistantId": assistant_id}, "responseType": "json"},
+        )
+
+        calcom_config = data.get("calcomConfig") if isinstance(data, dict) else None
+        if calcom_config:
+            logger.info("✅ Configuration Cal.com récupérée depuis Supabase")
+        else:
+            logger.info("ℹ️ Aucune configuration Cal.com trouvée")
+
+        self._store(assistant_id, calcom_config)
+        return calcom_config
+
+    def _store(self, assistant_id: str, config: dict[str, Any] | None) -> None:
+        self._entries[assistant_id] = _Entry(config=config, fetched_at=self._clock())
+        self._entries.move_to_end(assistant_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def _get_client(self) -> AsyncClient | None:
+        if self._client is not None:
+            return self._client
+
+        async with self._client_lock:
+            if self._client is not None:
+                return self._client
+
+            if acreate_client is None:
+                logger.warning("⚠️ Bibliothèque supabase-py non disponible")
+                return None
+
+            supabase_url = self._supabase_url or os.getenv("SUPABASE_URL")
+            supabase_key = self._supabase_key or os.getenv("SUPABASE_ANON_KEY")
+            if not supabase_url or not supabase_key:
+                logger.warning("⚠️ Variables d'environnement Supabase manquantes")
+                return None
+
+            self._client = await acreate_client(supabase_url, supabase_key)
+            return self._client
+
+
+# un seul loader (et un seul client Supabase) par processus worker
+shared_config_loader = AssistantConfigLoader()
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import datetime
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from calendar_api import AvailableSlot, PartialSlots
+from range_planner import FetchSlots, fetch_slots_prefix
+from slot_store import SlotStore
+
+# availability fetched longer ago than this is fetched again before being offered
+AVAILABILITY_MAX_AGE_S = 120.0
+# a partial answer (some calendars left out) is fetched again almost at once
+AVAILABILITY_PARTIAL_MAX_AGE_S = 5.0
+# slot ids remembered for the LLM; older ones are re-resolved from the availability index
+LISTED_SLOTS_MAX = 200
+
+_ONE_SECOND = datetime.timedelta(seconds=1)
+
+
+@dataclass
+class _Interval:
+    start_time: datetime.datetime
+    end_time: datetime.datetime
+    fetched_at: float
+    max_age: float
+
+
+class AvailabilityIndex:
+    """Per-session index of the availability already fetched.
+
+    Remembers which time intervals were fetched and when, so widening the requested range only
+    fetches what is missing, and intervals older than `max_age` are refreshed on their own.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_age: float = AVAILABILITY_MAX_AGE_S,
+        partial_max_age: float = AVAILABILITY_PARTIAL_MAX_AGE_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_age = max_age
+        self._partial_max_age = partial_max_age
+        self._clock = clock
+        self._intervals: list[_Interval] = []  # sorted, non-overlapping
+        self._store = SlotStore()
+        # slot id -> start (epoch seconds) of the slots recorded, checked against the store
+        self._ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    async def list_slots(
+        self,
+        fetch: FetchSlots,
+        *,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int | None = None,
+    ) -> list[AvailableSlot]:
+        """Slots of [start_time, end_time), fetching only missing or stale intervals.
+
+        With `limit`, stops fetching once `limit` slots are known from `start_time` onwards.
+        """
+        partial = False
+
+        async def _fetch(**window: Any) -> list[AvailableSlot]:
+            # a gap fetched in chunks is partial when any of its chunks is
+            nonlocal partial
+            slots = await fetch(**window)
+            partial = partial or isinstance(slots, PartialSlots)
+            return slots
+
+        for gap_start, gap_end in self.missing(start_time, end_time):
+            known = self._store.count(start_time, gap_start)
+            if limit is not None and known >= limit:
+                break
+
+            partial = False
+            slots, covered_until = await fetch_slots_prefix(
+                _fetch,
+                start_time=gap_start,
+                end_time=gap_end,
+                limit=limit - known if limit is not None else None,
+            )
+            self.record(gap_start, covered_until, slots, partial=partial)
+            if covered_until < gap_end:
+                break
+
+        # only return what is contiguous from `start_time`: a hole in the middle would make
+        # later slots look like the earliest ones
+        covered_until = self._covered_until(start_time, end_time)
+        return self._store.window(start_time, covered_until, limit=limit)
+
+    def record(
+        self,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        slots: list[AvailableSlot],
+        *,
+        fetched_at: float | None = None,
+        partial: bool = False,
+    ) -> None:
+        """Replace everything known about [start_time, end_time) with `slots`.
+
+        A `partial` answer (or `PartialSlots`) is only trusted for `partial_max_age`.
+        """
+        if start_time >= end_time:
+            return
+
+        self._store.replace(start_time, end_time, slots)
+        start_ts, end_ts = start_time.timestamp(), end_time.timestamp()
+        for slot in slots:
+            if start_ts <= (ts := slot.start_time.timestamp()) < end_ts:
+                self._ids[slot.unique_hash] = int(ts)
+        if len(self._ids) > 2 * len(self._store) + LISTED_SLOTS_MAX:
+            # ids of slots gone from refetched intervals
+            self._ids = {
+                slot_id: ts for slot_id, ts in self._ids.items() if self._find_at(slot_id, ts)
+            }
+
+        intervals: list[_Interval] = []
+        for interval in self._intervals:
+            if interval.end_time <= start_time or interval.start_time >= end_time:
+                intervals.append(interval)
+                continue
+            # keep the parts of the old interval outside the new one
+            if interval.start_time < start_time:
+                intervals.append(
+                    _Interval(
+                        interval.start_time, start_time, interval.fetched_at, interval.max_age
+                    )
+                )
+            if interval.end_time > end_time:
+                intervals.append(
+                    _Interval(end_time, interval.end_time, interval.fetched_at, interval.max_age)
+                )
+
+        partial = partial or isinstance(slots, PartialSlots)
+        intervals.append(
+            _Interval(
+                start_time,
+                end_time,
+                self._clock() if fetched_at is None else fetched_at,
+                self._partial_max_age if partial else self._max_age,
+            )
+        )
+        intervals.sort(key=lambda i: i.start_time)
+        self._intervals = intervals
+
+    def known(
+        self,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        *,
+        limit: int | None = None,
+    ) -> list[AvailableSlot]:
+        """Slots of [start_time, end_time) already fetched (stale ones included), without any
+        fetch"""
+        return self._store.window(start_time, end_time, limit=limit)
+
+    def discard(self, start_time: datetime.datetime) -> None:
+        """Forget a slot (booked, or reported unavailable)"""
+        for slot in self._store.window(start_time, start_time + _ONE_SECOND):
+            self._ids.pop(slot.unique_hash, None)
+        self._store.remove(start_time)
+
+    def find(self, slot_id: str) -> AvailableSlot | None:
+        """Slot with this `unique_hash` among the known availability, without any fetch"""
+        if (ts := self._ids.get(slot_id)) is None:
+            return None
+        if (slot := self._find_at(slot_id, ts)) is None:
+            del self._ids[slot_id]  # replaced by a refetch without it
+        return slot
+
+    def missing(
+        self, start_time: datetime.datetime, end_time: datetime.datetime
+    ) -> list[tuple[datetime.datetime, datetime.datetime]]:
+        """Sub-intervals of [start_time, end_time) never fetched or stale, in time order"""
+        now = self._clock()
+        gaps: list[tuple[datetime.datetime, datetime.datetime]] = []
+        cursor = start_time
+        for interval in self._intervals:
+            if interval.end_time <= cursor:
+                continue
+            if interval.start_time >= end_time:
+                break
+            if interval.start_time > cursor:
+                gaps.append((cursor, interval.start_time))
+                cursor = interval.start_time
+            upper = min(interval.end_time, end_time)
+            if now - interval.fetched_at >= interval.max_age:
+                gaps.append((cursor, upper))  # stale: refreshed as its own interval
+            cursor = upper
+        if cursor < end_time:
+            gaps.append((cursor, end_time))
+        return gaps
+
+    def _find_at(self, slot_id: str, ts: int) -> AvailableSlot | None:
+        start_time = datetime.datetime.fromtimestamp(ts, datetime.timezone.utc)
+        return next(
+            (
+                slot
+                for slot in self._store.window(start_time, start_time + _ONE_SECOND)
+                if slot.unique_hash == slot_id
+            ),
+            None,
+        )
+
+    def _covered_until(
+        self, start_time: datetime.datetime, end_time: datetime.datetime
+    ) -> datetime.datetime:
+        now = self._clock()
+        cursor = start_time
+        for interval in self._intervals:
+            if interval.end_time <= cursor:
+                continue
+            if interval.start_time > cursor or now - interval.fetched_at >= interval.max_age:
+                break
+            cursor = interval.end_time
+            if cursor >= end_time:
+                return end_time
+        return cursor
+
+
+class ListedSlots:
+    """Slots already listed to the LLM, by slot id.
+
+    Bounded (least recently listed ids go first) and pruned of past slots, with a reverse
+    start time -> slot id lookup.
+    """
+
+    def __init__(self, *, max_size: int = LISTED_SLOTS_MAX) -> None:
+        self._max_size = max_size
+        self._by_id: OrderedDict[str, AvailableSlot] = OrderedDict()
+        self._id_by_start: dict[datetime.datetime, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def add(self, slot: AvailableSlot) -> str:
+        slot_id = slot.unique_hash
+        if slot_id in self._by_id:
+            self._by_id.move_to_end(slot_id)
+            return slot_id
+
+        self._by_id[slot_id] = slot
+        self._id_by_start[slot.start_time] = slot_id
+        while len(self._by_id) > self._max_size:
+            _, evicted = self._by_id.popitem(last=False)
+            self._forget_start(evicted)
+        return slot_id
+
+    def get(self, slot_id: str) -> AvailableSlot | None:
+        return self._by_id.get(slot_id)
+
+    def id_of(self, start_time: datetime.datetime) -> str | None:
+        return self._id_by_start.get(start_time)
+
+    def discard(self, slot_id: str) -> None:
+        if (slot := self._by_id.pop(slot_id, None)) is not None:
+            self._forget_start(slot)
+
+    def prune(self, now: datetime.datetime) -> int:
+        """Drop the slots that already started"""
+        past = [slot_id for slot_id, slot in self._by_id.items() if slot.start_time < now]
+        for slot_id in past:
+            self.discard(slot_id)
+        return len(past)
+
+    def _forget_start(self, slot: AvailableSlot) -> None:
+        if self._id_by_start.get(slot.start_time) == slot.unique_hash:
+            del self._id_by_start[slot.start_time]
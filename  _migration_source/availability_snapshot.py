@@ -0,0 +1,393 @@
+"""Availability and calendar setups shared by the worker processes of a host.
+
+LiveKit runs each job in its own process: the slot cache and the calendar registry of one process
+were invisible to the others, so every process fetched the same windows (and resolved the same
+event types) again. With `ZORA_AVAILABILITY_SNAPSHOT` set to a file path (tmpfs preferably), they
+are also written to a small SQLite database in WAL mode, which every process reads:
+
+- `slot_windows`: one row per cached window of a scope (api key + event type), the slot start
+  times packed as an int64 blob and their durations as an uint16 blob;
+- `calendar_setups`: the result of `CalComCalendar.initialize()` per (api key, event id);
+- `slot_holds`: the holds placed on slots by the calls of every process (see `slot_holds`).
+
+Every row carries the wall-clock time it was fetched at. A lookup is a primary key read of one row,
+done inline (tens of microseconds): nothing else is decoded. Scopes and keys are stored hashed,
+never the api key itself. The snapshot is best effort: a locked or unusable database reads as a
+miss and is written again by the next fetch.
+"""
+
+from __future__ import annotations
+
+import bisect
+import datetime
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from array import array
+from collections.abc import Callable, Hashable, Iterator
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from calendar_api import AvailableSlot
+
+logger = logging.getLogger("availability-snapshot")
+
+# path of the database shared by the worker processes of a host (unset: per-process caches only)
+AVAILABILITY_SNAPSHOT_ENV = "ZORA_AVAILABILITY_SNAPSHOT"
+# a writer holding the database longer than this makes the call a miss (or a skipped write)
+SNAPSHOT_BUSY_TIMEOUT_MS = 20
+# rows older than this are deleted (longest stale TTL of the caches using the snapshot)
+SNAPSHOT_MAX_AGE_S = 15 * 60.0
+# old rows are purged once every this many writes
+SNAPSHOT_PURGE_EVERY = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS slot_windows (
+    scope TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    starts BLOB NOT NULL,
+    durations BLOB NOT NULL,
+    PRIMARY KEY (scope, start_ts, end_ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS calendar_setups (
+    key TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    event_type_id TEXT NOT NULL,
+    event_type_id_is_int INTEGER NOT NULL,
+    resolved_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS slot_holds (
+    scope TEXT NOT NULL,
+    calendar TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (scope, calendar, start_ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS slot_holds_session ON slot_holds (session);
+CREATE INDEX IF NOT EXISTS slot_holds_expiry ON slot_holds (expires_at);
+"""
+
+
+@dataclass
+class AvailabilitySnapshotStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    errors: int = 0
+
+
+@dataclass
+class SnapshotWindow:
+    start_ts: int
+    end_ts: int
+    # seconds since it was fetched, by any process
+    age_s: float
+    starts: array[int]
+    durations: array[int]
+
+    def slots(
+        self,
+        start_time: datetime.datetime | None = None,
+        end_time: datetime.datetime | None = None,
+        *,
+        tz: datetime.tzinfo = datetime.timezone.utc,
+    ) -> list[AvailableSlot]:
+        """`AvailableSlot`s of the window, or of its part [start_time, end_time)"""
+        from calendar_api import AvailableSlot
+
+        lo, hi = 0, len(self.starts)
+        if start_time is not None:
+            lo = bisect.bisect_left(self.starts, _ceil(start_time))
+        if end_time is not None:
+            hi = bisect.bisect_left(self.starts, _ceil(end_time))
+        return [
+            AvailableSlot(
+                start_time=datetime.datetime.fromtimestamp(self.starts[i], tz),
+                duration_min=self.durations[i],
+            )
+            for i in range(lo, hi)
+        ]
+
+
+class AvailabilitySnapshot:
+    """SQLite (WAL) store of availability windows and calendar setups, shared across processes"""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        busy_timeout_ms: int = SNAPSHOT_BUSY_TIMEOUT_MS,
+        max_age: float = SNAPSHOT_MAX_AGE_S,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self._busy_timeout_ms = busy_timeout_ms
+        self._max_age = max_age
+        self._clock = clock
+        self._conn: sqlite3.Connection | None = None
+        self._pid: int | None = None
+        self._writes_since_purge = 0
+        self._reported: set[str] = set()
+        self.stats = AvailabilitySnapshotStats()
+
+    @classmethod
+    def from_env(cls) -> AvailabilitySnapshot | None:
+        path = os.getenv(AVAILABILITY_SNAPSHOT_ENV)
+        return cls(path) if path else None
+
+    def get_window(
+        self, scope: Hashable, start_ts: int, end_ts: int, *, max_age: float
+    ) -> SnapshotWindow | None:
+        """The window [start_ts, end_ts) of `scope`, if fetched less than `max_age` seconds ago"""
+        row = self._query(
+            "SELECT fetched_at, starts, durations FROM slot_windows "
+            "WHERE scope = ? AND start_ts = ? AND end_ts = ?",
+            (_digest(scope), start_ts, end_ts),
+        )
+        if row is None or (age := self._clock() - row[0]) >= max_age:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return _window(start_ts, end_ts, age, row[1], row[2])
+
+    def windows(
+        self, scope: Hashable, start_ts: float, end_ts: float, *, max_age: float
+    ) -> list[SnapshotWindow]:
+        """Every window of `scope` overlapping [start_ts, end_ts), fetched less than `max_age`
+        seconds ago"""
+        rows = self._query(
+            "SELECT start_ts, end_ts, fetched_at, starts, durations FROM slot_windows "
+            "WHERE scope = ? AND end_ts > ? AND start_ts < ? AND fetched_at > ?",
+            (_digest(scope), start_ts, end_ts, self._clock() - max_age),
+            many=True,
+        )
+        now = self._clock()
+        return [
+            _window(lo, hi, now - fetched_at, starts, durations)
+            for lo, hi, fetched_at, starts, durations in rows or ()
+        ]
+
+    def put_window(
+        self, scope: Hashable, start_ts: int, end_ts: int, slots: list[AvailableSlot]
+    ) -> None:
+        ordered = sorted(slots, key=lambda s: s.start_time)
+        starts = array("q", (int(slot.start_time.timestamp()) for slot in ordered))
+        durations = array("H", (slot.duration_min for slot in ordered))
+        self._write(
+            "INSERT OR REPLACE INTO slot_windows VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                _digest(scope),
+                start_ts,
+                end_ts,
+                self._clock(),
+                starts.tobytes(),
+                durations.tobytes(),
+            ),
+        )
+
+    def invalidate_windows(self, scope: Hashable, at: float | None = None) -> None:
+        """Drop the windows of `scope` containing `at` (all of them if `at` is None)"""
+        if at is None:
+            self._write("DELETE FROM slot_windows WHERE scope = ?", (_digest(scope),))
+        else:
+            self._write(
+                "DELETE FROM slot_windows WHERE scope = ? AND start_ts <= ? AND end_ts > ?",
+                (_digest(scope), at, at),
+            )
+
+    def get_setup(
+        self, key: Hashable, *, max_age: float
+    ) -> tuple[str, str | int, float] | None:
+        """(username, event type id, age in seconds) resolved for `key` by any process"""
+        row = self._query(
+            "SELECT username, event_type_id, event_type_id_is_int, resolved_at "
+            "FROM calendar_setups WHERE key = ?",
+            (_digest(key),),
+        )
+        if row is None or (age := self._clock() - row[3]) >= max_age:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        username, event_type_id, is_int, _ = row
+        return username, int(event_type_id) if is_int else event_type_id, age
+
+    def put_setup(self, key: Hashable, username: str, event_type_id: str | int) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO calendar_setups VALUES (?, ?, ?, ?, ?)",
+            (
+                _digest(key),
+                username,
+                str(event_type_id),
+                int(isinstance(event_type_id, int)),
+                self._clock(),
+            ),
+        )
+
+    def invalidate_setup(self, key: Hashable) -> None:
+        self._write("DELETE FROM calendar_setups WHERE key = ?", (_digest(key),))
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Reads and writes of the block done at once, with respect to every process"""
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            self._failed(e)  # best effort: the statements run on their own
+            yield
+            return
+        try:
+            yield
+        except BaseException:
+            with suppress(sqlite3.Error):
+                conn.execute("ROLLBACK")
+            raise
+        try:
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            self._failed(e)
+            with suppress(sqlite3.Error):
+                conn.execute("ROLLBACK")
+
+    def purge_holds(self, now: float) -> int:
+        """Delete the expired holds, returns how many"""
+        cursor = self._execute("DELETE FROM slot_holds WHERE expires_at <= ?", (now,))
+        return cursor.rowcount if cursor is not None else 0
+
+    def get_hold(
+        self, scope: Hashable, calendar: str | None, start_ts: int
+    ) -> tuple[str, str] | None:
+        row = self._query(
+            "SELECT session, kind FROM slot_holds "
+            "WHERE scope = ? AND calendar = ? AND start_ts = ?",
+            (_digest(scope), calendar or "", start_ts),
+        )
+        return (row[0], row[1]) if row is not None else None
+
+    def put_hold(
+        self,
+        scope: Hashable,
+        calendar: str | None,
+        start_ts: int,
+        session: str,
+        kind: str,
+        expires_at: float,
+    ) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO slot_holds VALUES "
+            "(?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM slot_holds))",
+            (_digest(scope), calendar or "", start_ts, session, kind, expires_at),
+        )
+
+    def delete_hold(self, scope: Hashable, calendar: str | None, start_ts: int) -> None:
+        self._write(
+            "DELETE FROM slot_holds WHERE scope = ? AND calendar = ? AND start_ts = ?",
+            (_digest(scope), calendar or "", start_ts),
+        )
+
+    def delete_session_holds(
+        self, session: str, kinds: tuple[str, ...], *, keep_newest: int = 0
+    ) -> int:
+        marks = ", ".join("?" * len(kinds))
+        cursor = self._execute(
+            f"DELETE FROM slot_holds WHERE session = ? AND kind IN ({marks}) AND seq NOT IN "
+            f"(SELECT seq FROM slot_holds WHERE session = ? AND kind IN ({marks}) "
+            "ORDER BY seq DESC LIMIT ?)",
+            (session, *kinds, session, *kinds, keep_newest),
+        )
+        return cursor.rowcount if cursor is not None else 0
+
+    def count_holds(self) -> int:
+        row = self._query("SELECT COUNT(*) FROM slot_holds", ())
+        return row[0] if row is not None else 0
+
+    def clear_holds(self) -> None:
+        self._write("DELETE FROM slot_holds", ())
+
+    def clear(self) -> None:
+        self._write("DELETE FROM slot_windows", ())
+        self._write("DELETE FROM calendar_setups", ())
+        self.clear_holds()
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    def _query(self, sql: str, params: tuple, *, many: bool = False) -> Any:
+        try:
+            cursor = self._connection().execute(sql, params)
+            return cursor.fetchall() if many else cursor.fetchone()
+        except sqlite3.Error as e:
+            self._failed(e)
+            return None
+
+    def _write(self, sql: str, params: tuple) -> None:
+        self._execute(sql, params)
+
+    def _execute(self, sql: str, params: tuple) -> sqlite3.Cursor | None:
+        try:
+            conn = self._connection()
+            cursor = conn.execute(sql, params)
+            self.stats.writes += 1
+            self._writes_since_purge += 1
+            if self._writes_since_purge >= SNAPSHOT_PURGE_EVERY:
+                self._writes_since_purge = 0
+                oldest = self._clock() - self._max_age
+                conn.execute("DELETE FROM slot_windows WHERE fetched_at < ?", (oldest,))
+                conn.execute("DELETE FROM calendar_setups WHERE resolved_at < ?", (oldest,))
+            return cursor
+        except sqlite3.Error as e:
+            self._failed(e)
+            return None
+
+    def _connection(self) -> sqlite3.Connection:
+        # one connection per process: a connection inherited through fork() is never used
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout = {int(self._busy_timeout_ms)}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _failed(self, error: sqlite3.Error) -> None:
+        self.stats.errors += 1
+        # a database busy under contention is expected (a miss); anything else is logged once
+        if "locked" not in str(error) and str(error) not in self._reported:
+            self._reported.add(str(error))
+            logger.warning(f"⚠️ Availability snapshot {self.path} unavailable: {error}")
+
+
+def _window(
+    start_ts: int, end_ts: int, age_s: float, starts: bytes, durations: bytes
+) -> SnapshotWindow:
+    window = SnapshotWindow(
+        start_ts=start_ts, end_ts=end_ts, age_s=age_s, starts=array("q"), durations=array("H")
+    )
+    window.starts.frombytes(starts)
+    window.durations.frombytes(durations)
+    return window
+
+
+def _digest(key: Hashable) -> str:
+    # scopes hold api keys: only their digest is written to disk
+    return hashlib.blake2s(repr(key).encode(), digest_size=16).hexdigest()
+
+
+def _ceil(value: datetime.datetime) -> int:
+    return -int(-value.timestamp() // 1)
+
+
+# per worker process, on the database shared by the host's processes (None if not configured)
+shared_availability_snapshot = AvailabilitySnapshot.from_env()
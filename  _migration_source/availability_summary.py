@@ -0,0 +1,176 @@
+"""Compact descriptions of availability for the LLM.
+
+A listing used to be one line per slot (id, full date, relative phrase), cut at 20 slots: hundreds
+of tokens re-read on every following turn, and a caller asking for Thursday afternoon might not
+find it in the first 20. Instead:
+
+- `summarize` groups the slots by day and part of the day ("matin", "après-midi", "soir") with a
+  count and a couple of representative slot ids per group;
+- `detail` lists every slot of a drill-down (one day, one part of the day), one compact line per
+  day.
+
+Day and month names are French whatever the locale of the worker.
+"""
+
+from __future__ import annotations
+
+import datetime
+import unicodedata
+from collections.abc import Callable
+
+from calendar_api import AvailableSlot
+
+# part of the day -> [start hour, end hour) in the calendar's timezone
+DAY_PARTS = {
+    "matin": (0, 12),
+    "après-midi": (12, 18),
+    "soir": (18, 24),
+}
+# days described by a summary (the others are only counted), slot ids given per part of a day
+SUMMARY_MAX_DAYS = 7
+SUMMARY_SAMPLES_PER_PART = 2
+# slots listed by a drill-down
+DETAIL_MAX_SLOTS = 20
+
+WEEKDAYS = ("lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche")
+MONTHS = (
+    "janvier",
+    "février",
+    "mars",
+    "avril",
+    "mai",
+    "juin",
+    "juillet",
+    "août",
+    "septembre",
+    "octobre",
+    "novembre",
+    "décembre",
+)
+
+# registers a slot for booking and returns its id
+RegisterSlot = Callable[[AvailableSlot], str]
+
+
+def part_of_day(local: datetime.datetime) -> str:
+    return next(part for part, (lo, hi) in DAY_PARTS.items() if lo <= local.hour < hi)
+
+
+def part_window(
+    day: datetime.date, part: str | None, tz: datetime.tzinfo
+) -> tuple[datetime.datetime, datetime.datetime]:
+    """[start, end) of `day` (or of one of its parts) in `tz`"""
+    lo, hi = DAY_PARTS[part] if part is not None else (0, 24)
+    start = datetime.datetime.combine(day, datetime.time(lo), tzinfo=tz)
+    if hi == 24:
+        day, hi = day + datetime.timedelta(days=1), 0
+    return start, datetime.datetime.combine(day, datetime.time(hi), tzinfo=tz)
+
+
+def parse_day(value: str, today: datetime.date) -> datetime.date | None:
+    """`2026-10-22`, `jeudi` (next one, today included), `aujourd'hui` or `demain`; None if not
+    recognized"""
+    try:
+        return datetime.date.fromisoformat(value.strip())
+    except ValueError:
+        pass
+
+    word = _fold(value)
+    if word in ("aujourd'hui", "aujourdhui"):
+        return today
+    if word == "demain":
+        return today + datetime.timedelta(days=1)
+    folded_weekdays = [_fold(name) for name in WEEKDAYS]
+    if word in folded_weekdays:
+        return today + datetime.timedelta(days=(folded_weekdays.index(word) - today.weekday()) % 7)
+    return None
+
+
+def day_label(day: datetime.date, today: datetime.date) -> str:
+    label = f"{WEEKDAYS[day.weekday()]} {day.day} {MONTHS[day.month - 1]}"
+    if day == today:
+        return f"{label} (aujourd'hui)"
+    if day == today + datetime.timedelta(days=1):
+        return f"{label} (demain)"
+    return label
+
+
+def summarize(
+    slots: list[AvailableSlot],
+    *,
+    tz: datetime.tzinfo,
+    now: datetime.datetime,
+    register: RegisterSlot,
+    max_days: int = SUMMARY_MAX_DAYS,
+    samples: int = SUMMARY_SAMPLES_PER_PART,
+) -> list[str]:
+    """One line per day: each part of the day with its count and a few slot ids"""
+    today = now.astimezone(tz).date()
+    days = _group(slots, tz)
+    lines = [f"{len(slots)} créneaux libres (réserver avec l'identifiant) :"]
+    for day, parts in list(days.items())[:max_days]:
+        described = []
+        for part, part_slots in parts.items():
+            # earliest and latest of the part (then evenly spread) stand for the others
+            picked = _spread(part_slots, samples)
+            ids = ", ".join(
+                f"{register(slot)} {slot.start_time.astimezone(tz):%H:%M}" for slot in picked
+            )
+            described.append(f"{part} {len(part_slots)} ({ids})")
+        lines.append(f"- {day_label(day, today)} : {', '.join(described)}")
+
+    if len(days) > max_days:
+        last = list(days)[-1]
+        lines.append(
+            f"- et {len(days) - max_days} autres jours jusqu'au {day_label(last, today)}"
+        )
+    lines.append("Pour les autres horaires : préciser le jour et/ou le moment de la journée.")
+    return lines
+
+
+def detail(
+    slots: list[AvailableSlot],
+    *,
+    tz: datetime.tzinfo,
+    now: datetime.datetime,
+    register: RegisterSlot,
+    max_slots: int = DETAIL_MAX_SLOTS,
+) -> list[str]:
+    """Every slot (up to `max_slots`), one line per day"""
+    today = now.astimezone(tz).date()
+    lines = []
+    for day, parts in _group(slots[:max_slots], tz).items():
+        listed = [slot for part_slots in parts.values() for slot in part_slots]
+        times = ", ".join(
+            f"{register(slot)} {slot.start_time.astimezone(tz):%H:%M}" for slot in listed
+        )
+        lines.append(f"- {day_label(day, today)} : {times}")
+    if len(slots) > max_slots:
+        lines.append(f"- et {len(slots) - max_slots} autres créneaux : préciser le jour")
+    return lines
+
+
+def _group(
+    slots: list[AvailableSlot], tz: datetime.tzinfo
+) -> dict[datetime.date, dict[str, list[AvailableSlot]]]:
+    """Slots by day then part of the day, in time order"""
+    days: dict[datetime.date, dict[str, list[AvailableSlot]]] = {}
+    for slot in sorted(slots, key=lambda s: s.start_time):
+        local = slot.start_time.astimezone(tz)
+        days.setdefault(local.date(), {}).setdefault(part_of_day(local), []).append(slot)
+    return days
+
+
+def _spread(slots: list[AvailableSlot], count: int) -> list[AvailableSlot]:
+    if len(slots) <= count:
+        return slots
+    if count == 1:
+        return slots[:1]
+    step = (len(slots) - 1) / (count - 1)
+    return [slots[round(i * step)] for i in range(count)]
+
+
+def _fold(value: str) -> str:
+    """Lowercase, without accents nor surrounding blanks ("Mercredi " -> "mercredi")"""
+    decomposed = unicodedata.normalize("NFKD", value.strip().lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).replace("’", "'")
@@ -0,0 +1,144 @@
+"""Upstream traffic of several worker processes, with and without the availability snapshot.
+
+    python benchmarks/bench_availability_snapshot.py --processes 1 2 4 8 --jobs 20
+
+Each process stands for a LiveKit worker process: its own slot cache and calendar registry, and
+`--jobs` jobs one after another (with a short pause), each creating its `CalComCalendar`,
+initializing it and listing the coming week. Every process asks about the same practice, the
+process i starting i * `--stagger-ms` after the first (calls don't all arrive at once). Counts the
+requests the Cal.com stand-in received, then times a snapshot read alone.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+from calcom_standin import CalComStandin, StandinConfig
+
+from availability_snapshot import AvailabilitySnapshot
+from calendar_api import AvailableSlot, CalComCalendar
+from calendar_registry import CalendarRegistry
+from slot_cache import SlotCache
+
+
+async def _worker(
+    base_url: str, snapshot_path: str | None, jobs: int, seed: int, delay: float
+) -> list[float]:
+    await asyncio.sleep(delay)
+    snapshot = AvailabilitySnapshot(snapshot_path) if snapshot_path else None
+    slot_cache = SlotCache(snapshot=snapshot)
+    registry = CalendarRegistry(snapshot=snapshot)
+    rng = random.Random(seed)
+    samples = []
+    async with aiohttp.ClientSession() as session:
+        for _ in range(jobs):
+            await asyncio.sleep(rng.uniform(0.0, 0.05))
+            started_at = time.perf_counter()
+            calendar = CalComCalendar(
+                api_key="bench",
+                timezone="Europe/Paris",
+                event_id="1001",
+                slot_cache=slot_cache,
+                registry=registry,
+                base_url=base_url,
+                http_session=session,
+            )
+            await calendar.initialize()
+            now = datetime.datetime.now(datetime.timezone.utc)
+            await calendar.list_available_slots(
+                start_time=now, end_time=now + datetime.timedelta(days=7)
+            )
+            samples.append((time.perf_counter() - started_at) * 1000)
+    return samples
+
+
+def _run_worker(args: tuple[str, str | None, int, int, float]) -> list[float]:
+    return asyncio.run(_worker(*args))
+
+
+async def _round(
+    standin: CalComStandin, base_url: str, processes: int, jobs: int, stagger: float, shared: bool
+) -> None:
+    standin.requests.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "availability.db") if shared else None
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(processes) as pool:
+            results = await asyncio.get_running_loop().run_in_executor(
+                None,
+                pool.map,
+                _run_worker,
+                [(base_url, path, jobs, i, i * stagger) for i in range(processes)],
+            )
+    samples = sorted(s for result in results for s in result)
+    upstream = ", ".join(f"{name}={count}" for name, count in sorted(standin.requests.items()))
+    print(
+        f"{processes:>2} processes {'shared' if shared else 'private':<8}"
+        f" job p50={statistics.median(samples):6.1f} ms  upstream: {upstream}"
+    )
+
+
+def _read_cost(runs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = AvailabilitySnapshot(os.path.join(tmp, "availability.db"))
+        now = datetime.datetime.now(datetime.timezone.utc).replace(minute=0, second=0)
+        week = [
+            AvailableSlot(start_time=now + datetime.timedelta(minutes=30 * i), duration_min=30)
+            for i in range(16 * 7)
+        ]
+        start_ts = int(now.timestamp())
+        for day in range(30):
+            # other windows in the same table
+            snapshot.put_window(("other", day), start_ts, start_ts + 7 * 86400, week)
+        snapshot.put_window("bench", start_ts, start_ts + 7 * 86400, week)
+
+        started_at = time.perf_counter()
+        for _ in range(runs):
+            snapshot.get_window("bench", start_ts, start_ts + 7 * 86400, max_age=60)
+        read_us = (time.perf_counter() - started_at) / runs * 1e6
+        started_at = time.perf_counter()
+        for _ in range(runs):
+            snapshot.get_window("bench", start_ts, start_ts + 7 * 86400, max_age=60).slots()
+        decode_us = (time.perf_counter() - started_at) / runs * 1e6
+        print(
+            f"snapshot read of a {len(week)}-slot window: {read_us:.0f} us, "
+            f"{decode_us:.0f} us with the AvailableSlots"
+        )
+        snapshot.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--stagger-ms", type=float, default=150.0)
+    parser.add_argument("--read-runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    standin = CalComStandin(StandinConfig(latency_ms=args.latency_ms))
+    base_url = await standin.start()
+    print(f"{args.jobs} jobs per process, {args.latency_ms:.0f} ms upstream latency")
+    for processes in args.processes:
+        for shared in (False, True):
+            await _round(
+                standin, base_url, processes, args.jobs, args.stagger_ms / 1000, shared
+            )
+    await standin.aclose()
+    _read_cost(args.read_runs)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+"""Latency/throughput baseline of `CalComCalendar` against the local Cal.com stand-in.
+
+    python benchmarks/bench_calendar.py --concurrency 8 --requests 200 --latency-ms 40 --jitter-ms 20
+
+Reports p50/p95/p99 and throughput for initialize(), list_available_slots() over 14/30/90 days
+(and 90 days with a limit) and schedule_appointment() under concurrency. Caches, the setup
+registry and the rate limit are disabled so every operation reaches the stand-in.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import logging
+import os
+import sys
+import time
+from collections.abc import Awaitable, Callable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+from calcom_standin import CalComStandin, StandinConfig
+
+from calendar_api import CalComCalendar, SlotUnavailableError
+from rate_limiter import RateLimiters
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_load(
+    op: Callable[[int], Awaitable[object]], *, requests: int, concurrency: int
+) -> tuple[list[float], float, int]:
+    """Runs `op` `requests` times with `concurrency` workers: (latencies ms, wall s, errors)"""
+    counter = itertools.count()
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while (i := next(counter)) < requests:
+            started_at = time.perf_counter()
+            try:
+                await op(i)
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - started_at) * 1000)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started_at, errors
+
+
+def report(name: str, latencies: list[float], wall_s: float, errors: int) -> None:
+    print(
+        f"{name:<24} p50={percentile(latencies, 50):7.1f} ms  p95={percentile(latencies, 95):7.1f} ms  "
+        f"p99={percentile(latencies, 99):7.1f} ms  {len(latencies) / wall_s:8.1f} ops/s  errors={errors}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--latency-per-day-ms", type=float, default=3.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slots-per-day", type=int, default=16)
+    parser.add_argument("--conflict-rate", type=float, default=0.0)
+    parser.add_argument("--verbose", action="store_true", help="keep the calendar logs")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger("cal.com").setLevel(logging.CRITICAL)
+
+    standin = CalComStandin(
+        StandinConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            latency_per_day_ms=args.latency_per_day_ms,
+            error_rate=args.error_rate,
+            slots_per_day=args.slots_per_day,
+            conflict_rate=args.conflict_rate,
+            seed=0,
+        )
+    )
+    base_url = await standin.start()
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, latency {args.latency_ms}"
+        f"+{args.jitter_ms} ms, error rate {args.error_rate:.0%}\n"
+    )
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency * 2)
+    rate_limiters = RateLimiters(rate_per_min=1e9)
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        def new_calendar() -> CalComCalendar:
+            return CalComCalendar(
+                api_key="bench",
+                timezone="Europe/Paris",
+                event_id=str(standin.config.event_type_id),
+                slot_cache=None,
+                registry=None,
+                base_url=base_url,
+                http_session=session,
+                rate_limiters=rate_limiters,
+            )
+
+        report(
+            "initialize",
+            *await run_load(
+                lambda _: new_calendar().initialize(),
+                requests=args.requests,
+                concurrency=args.concurrency,
+            ),
+        )
+
+        cal = new_calendar()
+        await cal.initialize()
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        for days in (14, 30, 90):
+            end = now + datetime.timedelta(days=days)
+            report(
+                f"list_available_slots {days}d",
+                *await run_load(
+                    lambda _: cal.list_available_slots(start_time=now, end_time=end),
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                ),
+            )
+        # the streaming decoder stops after `limit` slots (uncached path)
+        report(
+            "list 90d, limit=20",
+            *await run_load(
+                lambda _: cal.list_available_slots(start_time=now, end_time=end, limit=20),
+                requests=args.requests,
+                concurrency=args.concurrency,
+            ),
+        )
+
+        # every other booking targets an already booked slot: exercises the conflict path
+        slots = []
+        while not slots:  # upstream errors may survive the retries under error injection
+            try:
+                slots = await cal.list_available_slots(
+                    start_time=now, end_time=now + datetime.timedelta(days=90)
+                )
+            except Exception:
+                pass
+        conflicts = 0
+
+        async def book(i: int) -> None:
+            nonlocal conflicts
+            slot = slots[(i // 2) % len(slots)]
+            try:
+                await cal.schedule_appointment(
+                    start_time=slot.start_time,
+                    attendee_email=f"bench_{i}@temp.zora24.ai",
+                    user_name=f"Bench {i}",
+                )
+            except SlotUnavailableError:
+                conflicts += 1
+
+        latencies, wall_s, errors = await run_load(
+            book, requests=args.requests, concurrency=args.concurrency
+        )
+        report("schedule_appointment", latencies, wall_s, errors)
+        print(f"{'':<24} slot conflicts={conflicts}")
+
+    await standin.aclose()
+    print(f"\nstand-in requests: {standin.requests}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
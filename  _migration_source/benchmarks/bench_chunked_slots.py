@@ -0,0 +1,92 @@
+"""Single-request vs chunked availability lookup for long ranges.
+
+    python benchmarks/bench_chunked_slots.py --days 90 --runs 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+from calcom_standin import CalComStandin, StandinConfig
+
+from calendar_api import CalComCalendar
+from range_planner import fetch_slots_chunked
+
+
+async def _timed(coro_fn, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        await coro_fn()
+        samples.append((time.perf_counter() - started_at) * 1000)
+    return samples
+
+
+def _report(name: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<28} p50={statistics.median(samples):7.1f} ms  p95={p95:7.1f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--latency-per-day-ms", type=float, default=3.0)
+    args = parser.parse_args()
+
+    standin = CalComStandin(
+        StandinConfig(latency_ms=args.latency_ms, latency_per_day_ms=args.latency_per_day_ms)
+    )
+    base_url = await standin.start()
+
+    async with aiohttp.ClientSession() as session:
+        cal = CalComCalendar(
+            api_key="bench",
+            timezone="Europe/Paris",
+            event_id=str(standin.config.event_type_id),
+            slot_cache=None,
+            registry=None,
+            base_url=base_url,
+            http_session=session,
+        )
+        await cal.initialize()
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        end = now + datetime.timedelta(days=args.days)
+
+        async def single() -> None:
+            slots = await cal.list_available_slots(start_time=now, end_time=end)
+            assert len(slots[: args.limit]) == args.limit
+
+        async def chunked() -> None:
+            slots = await fetch_slots_chunked(
+                cal.list_available_slots,
+                start_time=now,
+                end_time=end,
+                limit=args.limit,
+                concurrency=args.concurrency,
+            )
+            assert len(slots) == args.limit
+
+        print(f"range={args.days} days, first {args.limit} slots, {args.runs} runs")
+        _report("single request", await _timed(single, args.runs))
+        _report(f"chunked (x{args.concurrency})", await _timed(chunked, args.runs))
+
+    await standin.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""Availability of several Cal.com calendars: one after another vs `CompositeCalendar`.
+
+    python benchmarks/bench_composite_calendar.py --calendars 4 --days 14 --runs 20
+
+Each calendar is served by its own stand-in (same latency, a different number of slots per day).
+Compares asking them in turn and merging, with the concurrent fan-out and k-way merge of
+`CompositeCalendar`; then adds one calendar slower than `--backend-timeout` to the composite
+and shows the answer is not held up by it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+from calcom_standin import CalComStandin, StandinConfig
+
+from calendar_api import CalComCalendar
+from composite_calendar import CompositeCalendar
+
+
+async def _timed(coro_fn, runs: int) -> tuple[list[float], int]:
+    samples, count = [], 0
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        count = len(await coro_fn())
+        samples.append((time.perf_counter() - started_at) * 1000)
+    return samples, count
+
+
+def _report(name: str, samples: list[float], count: int) -> None:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(
+        f"{name:<34} p50={statistics.median(samples):7.1f} ms  p95={p95:7.1f} ms  slots={count}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calendars", type=int, default=4)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--slow-latency-ms", type=float, default=3000.0)
+    parser.add_argument("--backend-timeout", type=float, default=0.5)
+    args = parser.parse_args()
+
+    configs = [
+        StandinConfig(latency_ms=args.latency_ms, slots_per_day=16 - 2 * (i % 6))
+        for i in range(args.calendars)
+    ]
+    configs.append(StandinConfig(latency_ms=args.slow_latency_ms))
+    standins = [CalComStandin(config) for config in configs]
+    base_urls = [await standin.start() for standin in standins]
+
+    async with aiohttp.ClientSession() as session:
+        calendars = {}
+        for i, (standin, base_url) in enumerate(zip(standins, base_urls)):
+            calendars[f"calendar-{i}"] = CalComCalendar(
+                api_key=f"bench-{i}",
+                timezone="Europe/Paris",
+                event_id=str(standin.config.event_type_id),
+                slot_cache=None,
+                registry=None,
+                base_url=base_url,
+                http_session=session,
+            )
+        slow_name = f"calendar-{args.calendars}"
+        slow = calendars.pop(slow_name)
+        for calendar in (*calendars.values(), slow):
+            await calendar.initialize()
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        end = now + datetime.timedelta(days=args.days)
+        composite = CompositeCalendar(calendars, backend_timeout=args.backend_timeout)
+        with_slow = CompositeCalendar(
+            {**calendars, slow_name: slow}, backend_timeout=args.backend_timeout
+        )
+
+        async def sequential():
+            merged = {}
+            for calendar in calendars.values():
+                for slot in await calendar.list_available_slots(start_time=now, end_time=end):
+                    merged.setdefault(slot.start_time, slot)
+            return sorted(merged.values(), key=lambda s: s.start_time)
+
+        print(f"{args.calendars} calendars, {args.days} days, {args.runs} runs")
+        _report("one after another", *await _timed(sequential, args.runs))
+        _report("composite", *await _timed(
+            lambda: composite.list_available_slots(start_time=now, end_time=end), args.runs
+        ))
+        _report("composite, limit=20", *await _timed(
+            lambda: composite.list_available_slots(start_time=now, end_time=end, limit=20),
+            args.runs,
+        ))
+        _report(f"composite + 1 slow ({args.slow_latency_ms:.0f} ms)", *await _timed(
+            lambda: with_slow.list_available_slots(start_time=now, end_time=end), 3
+        ))
+        stats = with_slow.stats
+        print(
+            f"  slow calendar left out {stats.timeouts} times, "
+            f"{composite.stats.duplicates} duplicate start times merged"
+        )
+        # its lookups go on in the background: let them end before closing the session
+        await asyncio.sleep(args.slow_latency_ms / 1000)
+
+    for standin in standins:
+        await standin.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+"""Event-loop time spent logging one booking tool call: eager f-strings vs structured logging.
+
+    python benchmarks/bench_logging.py --calls 2000
+
+Replays the log calls of a `schedule_appointment` tool call (tool logs, Cal.com payload and
+response, transcript messages) with realistic bodies, and measures the CPU time of the calling
+thread, i.e. the time the event loop cannot spend on other sessions:
+
+- eager: the f-string calls (and `print` of the transcript) the calendar used before, written by a
+  synchronous handler;
+- lazy/sync: `structured_logging` loggers, still written by a synchronous handler;
+- lazy/queued: `structured_logging` behind `configure_logging` (formatting and writes happen on
+  the listener thread);
+- lazy/queued, cal.com=WARNING: same, with the calendar logs filtered by a per-module level.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import structured_logging
+
+BOOKING_PAYLOAD = {
+    "start": "2026-10-19T08:00:00+00:00",
+    "attendee": {
+        "name": "Marie Dupont",
+        "email": "marie_dupont_1760000000@temp.zora24.ai",
+        "timeZone": "Europe/Paris",
+    },
+    "eventTypeId": 1001,
+}
+# Cal.com answers a booking with the whole booking object (attendees, host, event type, responses)
+BOOKING_RESPONSE = {
+    "status": "success",
+    "data": {
+        "id": 123456,
+        "uid": "bk_" + "x" * 22,
+        "title": "LiveKit Front-Desk between Standin and Marie Dupont",
+        "hosts": [{"id": 1, "name": "Standin", "email": "host@example.com", "timeZone": "UTC"}],
+        "attendees": [{**BOOKING_PAYLOAD["attendee"], "language": "fr", "absent": False}],
+        "bookingFieldsResponses": {"name": "Marie Dupont", "guests": [], "notes": ""},
+        "eventType": {"id": 1001, "slug": "livekit-front-desk", "lengthInMinutes": 30},
+        "metadata": {f"key_{i}": "v" * 40 for i in range(20)},
+        "start": "2026-10-19T08:00:00.000Z",
+        "end": "2026-10-19T08:30:00.000Z",
+        "status": "accepted",
+    },
+}
+TRANSCRIPT = [
+    ("user", "Oui, lundi à dix heures ça me va très bien, c'est au nom de Marie Dupont."),
+    ("assistant", "Parfait Marie Dupont ! Votre rendez-vous est confirmé pour le lundi 19 octobre."),
+]
+
+
+def eager_booking(logger: logging.Logger, out: io.TextIOBase) -> None:
+    """The log calls of a booking before structured logging"""
+    payload, data = BOOKING_PAYLOAD, BOOKING_RESPONSE
+    response_text = json.dumps(data)
+    logger.info(f"📅 Tentative de réservation - Nom: Marie Dupont, Tél: 0600000000")
+    logger.info(f"📧 Email temporaire généré: {payload['attendee']['email']}")
+    logger.info(f"🚀 Attempting to create booking with payload: {payload}")
+    logger.info(f"📅 Booking URL: https://api.cal.com/v2/bookings")
+    logger.info(f"🔑 Using event type ID: {payload['eventTypeId']}")
+    logger.info(f"📡 HTTP Response Status: {200}")
+    logger.info(f"📄 Raw response: {response_text}")
+    logger.info(f"📋 Parsed Cal.com response: {data}")
+    logger.info("✅ Booking created successfully in Cal.com!")
+    logger.info(f"📋 Booking details: {data}")
+    logger.info(f"✅ Rendez-vous confirmé : lundi 19 octobre 2026 à 10:00")
+    for role, content in TRANSCRIPT:
+        print(f"[{role.upper()}]: {content}", file=out)
+
+
+def lazy_booking(tools, calendar, chat) -> None:
+    """The same booking with the structured calls of `calendar_api` and `zora_agent`"""
+    payload, data = BOOKING_PAYLOAD, BOOKING_RESPONSE
+    response_text = json.dumps(data)
+    tools.info(
+        "📅 Tentative de réservation",
+        user_name="Marie Dupont",
+        phone="0600000000",
+        email=payload["attendee"]["email"],
+    )
+    calendar.info(
+        "🚀 Attempting to create booking",
+        start=payload["start"],
+        event_type_id=payload["eventTypeId"],
+        payload=payload,
+    )
+    calendar.info("📡 Booking response", status=200, body=response_text)
+    calendar.debug("📋 Parsed Cal.com response", body=data)
+    calendar.info("✅ Booking created successfully in Cal.com", body=data)
+    tools.info("✅ Rendez-vous confirmé", start="lundi 19 octobre 2026 à 10:00")
+    for role, content in TRANSCRIPT:
+        chat.info("💬 Message", role=role, content=content)
+
+
+def _measure(calls: int, replay) -> list[float]:
+    """CPU time of this thread (µs) for each replayed tool call"""
+    samples = []
+    for _ in range(calls):
+        started_at = time.thread_time()
+        replay()
+        samples.append((time.thread_time() - started_at) * 1e6)
+    return samples
+
+
+def _report(name: str, samples: list[float], baseline: float | None) -> float:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    saved = f"  saved={baseline - p50:7.1f} µs/call" if baseline is not None else ""
+    print(f"{name:<32} p50={p50:7.1f} µs  p99={p99:7.1f} µs{saved}")
+    return p50
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # a real file: the writes cost what they cost on the worker's log output
+        handler = logging.FileHandler(os.path.join(tmp, "agent.log"))
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+
+        eager_logger = logging.getLogger("cal.com.eager")
+        tools = structured_logging.get_logger("zora-agent.tools")
+        calendar = structured_logging.get_logger("cal.com")
+        chat = structured_logging.get_logger("zora-agent.chat")
+
+        print(f"{args.calls} booking tool calls, event-loop thread CPU time per call")
+        with open(os.path.join(tmp, "stdout.log"), "w") as out:
+            samples = _measure(args.calls, lambda: eager_booking(eager_logger, out))
+        baseline = _report("eager, sync handler", samples, None)
+        replay = lambda: lazy_booking(tools, calendar, chat)  # noqa: E731
+        _report("lazy, sync handler", _measure(args.calls, replay), baseline)
+
+        structured_logging.configure_logging()
+        _report("lazy, queued", _measure(args.calls, replay), baseline)
+        structured_logging.configure_logging({"cal.com": "WARNING"})
+        _report("lazy, queued, cal.com=WARNING", _measure(args.calls, replay), baseline)
+
+        started_at = time.perf_counter()
+        structured_logging.shutdown_logging()
+        print(f"listener drained in {(time.perf_counter() - started_at) * 1000:.0f} ms")
+        handler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""List-of-dataclasses vs SlotStore for window queries and bookings.
+
+    python benchmarks/bench_slot_store.py --slots 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calendar_api import AvailableSlot
+from slot_store import SlotStore
+
+UTC = datetime.timezone.utc
+
+
+def _make_slots(n: int) -> list[AvailableSlot]:
+    # multi-staff practice: several slots per 30-min step, starting tomorrow
+    start = datetime.datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+    start += datetime.timedelta(days=1)
+    return [
+        AvailableSlot(start_time=start + datetime.timedelta(minutes=5 * i), duration_min=30)
+        for i in range(n)
+    ]
+
+
+def _bench(name: str, fn, runs: int) -> None:
+    started_at = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    per_call_us = (time.perf_counter() - started_at) / runs * 1e6
+    print(f"  {name:<34} {per_call_us:12.1f} µs/op")
+
+
+def _measure_memory(build) -> tuple[object, float]:
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slots", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    slots = _make_slots(args.slots)
+    first, last = slots[0].start_time, slots[-1].start_time
+    windows = []
+    for _ in range(args.runs):
+        lo = first + (last - first) * random.random()
+        windows.append((lo, lo + datetime.timedelta(days=14)))
+
+    as_list, list_mb = _measure_memory(lambda: list(_make_slots(args.slots)))
+    store, store_mb = _measure_memory(lambda: SlotStore(slots))
+    print(f"{args.slots} slots")
+    print(f"  memory: list of AvailableSlot {list_mb:.1f} MiB, SlotStore {store_mb:.1f} MiB")
+
+    it = iter(windows * 1000)
+
+    def list_window() -> None:
+        lo, hi = next(it)
+        [s for s in as_list if lo <= s.start_time < hi][:20]
+
+    def store_window() -> None:
+        lo, hi = next(it)
+        store.window(lo, hi, limit=20)
+
+    print("window query (first 20 slots of 14 days)")
+    _bench("list scan", list_window, args.runs)
+    _bench("SlotStore bisect", store_window, args.runs)
+
+    victims = iter(random.sample(slots, args.runs * 2))
+
+    def list_remove() -> None:
+        nonlocal as_list
+        start_time = next(victims).start_time
+        as_list = [s for s in as_list if s.start_time != start_time]
+
+    def store_remove() -> None:
+        store.remove(next(victims).start_time)
+
+    print("booking (remove one slot)")
+    _bench("list rebuild", list_remove, args.runs)
+    _bench("SlotStore tombstone", store_remove, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Decoding a Cal.com `slots/` response: buffered `json` vs the streaming `SlotsDecoder`.
+
+    python benchmarks/bench_slots_decode.py --days 90 --slots-per-day 16,96 --runs 20
+
+Builds synthetic bodies (every day of the window, `--slots-per-day` slots each, in Cal.com's
+`2026-10-19T08:00:00.000Z` format), split into network-sized chunks, and decodes them:
+
+- buffered: the previous path, i.e. the chunks joined (`resp.json()`), `json.loads`, then
+  `fromisoformat` and an `AvailableSlot` for every slot;
+- streaming: `SlotsDecoder` fed chunk by chunk, `AvailableSlot` built for the kept slots only;
+- streaming, limit: same, stopping after `--limit` slots (what a listing needs).
+
+Reports the parse time and the peak of Python allocations (tracemalloc) per decode.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calendar_api import EVENT_DURATION_MIN, AvailableSlot
+from slots_decoder import SLOTS_READ_CHUNK_BYTES, SlotsDecoder
+
+START = datetime.datetime(2026, 10, 19, tzinfo=datetime.timezone.utc)
+
+
+def build_body(days: int, slots_per_day: int) -> bytes:
+    step = datetime.timedelta(minutes=max(1, 24 * 60 // slots_per_day))
+    data = {}
+    for day in range(days):
+        day_start = START + datetime.timedelta(days=day)
+        data[day_start.date().isoformat()] = [
+            {"start": (day_start + i * step).strftime("%Y-%m-%dT%H:%M:%S.000Z")}
+            for i in range(slots_per_day)
+        ]
+    return json.dumps({"status": "success", "data": data}).encode()
+
+
+def decode_buffered(chunks: list[bytes], start_ts: float, end_ts: float) -> list[AvailableSlot]:
+    body = json.loads(b"".join(chunks).decode())
+    slots = []
+    for day in body["data"].values():
+        for slot in day:
+            start = datetime.datetime.fromisoformat(slot["start"].replace("Z", "+00:00"))
+            slots.append(AvailableSlot(start_time=start, duration_min=EVENT_DURATION_MIN))
+    return slots
+
+
+def decode_streaming(
+    chunks: list[bytes], start_ts: float, end_ts: float, limit: int | None = None
+) -> list[AvailableSlot]:
+    decoder = SlotsDecoder(start_ts=start_ts, end_ts=end_ts, limit=limit)
+    for chunk in chunks:
+        decoder.feed(chunk)
+        if decoder.done:
+            break
+    utc = datetime.timezone.utc
+    return [
+        AvailableSlot(
+            start_time=datetime.datetime.fromtimestamp(ts, utc), duration_min=EVENT_DURATION_MIN
+        )
+        for ts in decoder.close()
+    ]
+
+
+def _measure(decode, runs: int) -> tuple[list[float], int, int]:
+    """Parse times (ms), peak allocations (bytes) and number of slots of `decode()`"""
+    samples = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        slots = decode()
+        samples.append((time.perf_counter() - started_at) * 1000)
+        del slots
+
+    tracemalloc.start()
+    slots = decode()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return samples, peak, len(slots)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--slots-per-day", default="16,96", help="comma separated")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    start_ts = START.timestamp()
+    end_ts = (START + datetime.timedelta(days=args.days)).timestamp()
+    for slots_per_day in (int(n) for n in args.slots_per_day.split(",")):
+        body = build_body(args.days, slots_per_day)
+        chunks = [
+            body[i : i + SLOTS_READ_CHUNK_BYTES] for i in range(0, len(body), SLOTS_READ_CHUNK_BYTES)
+        ]
+        print(
+            f"=== {args.days} days x {slots_per_day} slots: "
+            f"{len(body) / 1024:.0f} KiB in {len(chunks)} chunks"
+        )
+        for name, decode in (
+            ("buffered json", lambda: decode_buffered(chunks, start_ts, end_ts)),
+            ("streaming", lambda: decode_streaming(chunks, start_ts, end_ts)),
+            (
+                f"streaming, limit={args.limit}",
+                lambda: decode_streaming(chunks, start_ts, end_ts, args.limit),
+            ),
+        ):
+            samples, peak, count = _measure(decode, args.runs)
+            samples.sort()
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            print(
+                f"{name:<22} p50={statistics.median(samples):7.2f} ms  p95={p95:7.2f} ms  "
+                f"peak={peak / 1024:8.0f} KiB  slots={count}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Local stand-in for the Cal.com v2 endpoints used by `CalComCalendar` (benchmarks only).
+
+Serves `me/`, `event-types`, `slots/` and `bookings` with configurable latency, jitter,
+error rate, payload size and booking conflicts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import random
+from dataclasses import dataclass
+
+from aiohttp import web
+
+SLOT_CONFLICT_MESSAGE = "User either already has booking at this time or is not available"
+
+
+@dataclass
+class StandinConfig:
+    # fixed latency of every request, plus a part proportional to the requested window
+    # (Cal.com computes availability day by day)
+    latency_ms: float = 40.0
+    jitter_ms: float = 0.0
+    latency_per_day_ms: float = 3.0
+    # share of requests answered with a 500
+    error_rate: float = 0.0
+    # payload size: slots offered per working day, every 30 minutes from 08:00 UTC
+    slots_per_day: int = 16
+    # share of bookings rejected as conflicting even when the slot looks free
+    conflict_rate: float = 0.0
+    username: str = "standin"
+    event_type_id: int = 1001
+    seed: int | None = None
+
+
+def _parse_ts(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _format_ts(value: datetime.datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class CalComStandin:
+    def __init__(self, config: StandinConfig | None = None) -> None:
+        self.config = config or StandinConfig()
+        self.requests: dict[str, int] = {}
+        self.booked: set[datetime.datetime] = set()
+        self._event_types: dict[int, dict] = {
+            self.config.event_type_id: {
+                "id": self.config.event_type_id,
+                "slug": "livekit-front-desk",
+                "lengthInMinutes": 30,
+            }
+        }
+        self._rng = random.Random(self.config.seed)
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application(middlewares=[self._simulate])
+        app.router.add_get("/v2/me/", self._me)
+        app.router.add_get("/v2/event-types/", self._list_event_types)
+        app.router.add_get("/v2/event-types/{event_id}", self._get_event_type)
+        app.router.add_post("/v2/event-types", self._create_event_type)
+        app.router.add_get("/v2/slots/", self._slots)
+        app.router.add_post("/v2/bookings", self._book)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sock = site._server.sockets[0]  # type: ignore[union-attr]
+        self.base_url = f"http://{host}:{sock.getsockname()[1]}/v2/"
+        return self.base_url
+
+    async def aclose(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _simulate(self, request: web.Request, handler) -> web.StreamResponse:
+        parts = request.path.strip("/").split("/")
+        name = parts[1] if len(parts) > 1 else parts[0]
+        self.requests[name] = self.requests.get(name, 0) + 1
+
+        delay = self.config.latency_ms + self._rng.uniform(0, self.config.jitter_ms)
+        if name == "slots":
+            window = _parse_ts(request.query["end"]) - _parse_ts(request.query["start"])
+            delay += self.config.latency_per_day_ms * max(window.total_seconds() / 86400, 0)
+        await asyncio.sleep(delay / 1000)
+
+        if self._rng.random() < self.config.error_rate:
+            return web.json_response(
+                {"status": "error", "error": {"message": "Internal server error"}}, status=500
+            )
+        return await handler(request)
+
+    async def _me(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"status": "success", "data": {"id": 1, "username": self.config.username}}
+        )
+
+    async def _list_event_types(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "success", "data": list(self._event_types.values())})
+
+    async def _get_event_type(self, request: web.Request) -> web.Response:
+        event_type = self._event_types.get(int(request.match_info["event_id"]))
+        if event_type is None:
+            return web.json_response({"status": "error", "error": {"message": "Not found"}}, status=404)
+        return web.json_response({"status": "success", "data": event_type})
+
+    async def _create_event_type(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        event_id = max(self._event_types) + 1
+        self._event_types[event_id] = {"id": event_id, **body}
+        return web.json_response({"status": "success", "data": self._event_types[event_id]})
+
+    async def _slots(self, request: web.Request) -> web.Response:
+        start = _parse_ts(request.query["start"])
+        end = _parse_ts(request.query["end"])
+
+        data: dict[str, list[dict[str, str]]] = {}
+        day = start.date()
+        while day <= end.date():
+            if day.weekday() < 5:
+                day_start = datetime.datetime.combine(
+                    day, datetime.time(8), tzinfo=datetime.timezone.utc
+                )
+                starts = [
+                    day_start + datetime.timedelta(minutes=30 * i)
+                    for i in range(self.config.slots_per_day)
+                ]
+                free = [s for s in starts if start <= s < end and s not in self.booked]
+                if free:
+                    data[day.isoformat()] = [{"start": _format_ts(s)} for s in free]
+            day += datetime.timedelta(days=1)
+
+        return web.json_response({"status": "success", "data": data})
+
+    async def _book(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        start = _parse_ts(body["start"])
+        if start in self.booked or self._rng.random() < self.config.conflict_rate:
+            return web.json_response(
+                {
+                    "status": "error",
+                    "error": {"code": "BadRequestException", "message": SLOT_CONFLICT_MESSAGE},
+                },
+                status=400,
+            )
+
+        self.booked.add(start)
+        return web.json_response(
+            {
+                "status": "success",
+                "data": {
+                    "id": len(self.booked),
+                    "start": _format_ts(start),
+                    "eventTypeId": body.get("eventTypeId"),
+                    "attendees": [body.get("attendee", {})],
+                },
+            },
+            status=201,
+        )
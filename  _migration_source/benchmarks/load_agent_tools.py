@@ -0,0 +1,354 @@
+"""Multi-session load test of the ZoraAgent tools, without audio, STT, LLM or TTS.
+
+    python benchmarks/load_agent_tools.py --backend standin --ramp 10,50,100,200
+    python benchmarks/load_agent_tools.py --backend fake --ramp 100,500 --tracemalloc
+
+Runs many `ZoraAgent` + `Userdata` sessions in one event loop, the way one worker process hosts
+concurrent calls. Each session follows a scripted conversation: list the default range, sometimes
+widen it to a month, pick one of the first slots (sessions of the same calendar compete for the
+same ones), book it, and on a conflict list again and book another slot (or, when the slot was
+held by another session, one of the nearby slots given with the conflict).
+
+For every concurrency step, reports per-tool latency histograms, event-loop lag (drift of a
+periodic probe) and the memory retained per session.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+from calcom_standin import CalComStandin, StandinConfig
+
+from calendar_api import Calendar, CalComCalendar, FakeCalendar, SlotUnavailableError
+from calendar_registry import shared_calendar_registry
+from circuit_breaker import shared_circuit_breakers
+from livekit.agents import ToolError
+from rate_limiter import CALCOM_RATE_LIMIT_PER_MIN, RateLimiters
+from slot_cache import shared_slot_cache
+from slot_coalescing import CoalescingCalendar
+from slot_holds import SlotHoldManager, shared_slot_holds
+from zora_agent import Userdata, ZoraAgent
+
+TIMEZONE = "Europe/Paris"
+# upper bounds of the latency histogram buckets, in ms
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+LAG_PROBE_INTERVAL_S = 0.01
+SLOT_ID = re.compile(r"\bST_[a-z0-9]+")
+
+
+class ConflictingFakeCalendar(FakeCalendar):
+    """`FakeCalendar` that rejects a booking of a slot it no longer offers, like Cal.com does"""
+
+    async def schedule_appointment(
+        self, *, start_time, attendee_email, user_name, calendar=None
+    ) -> None:
+        if not self._slots.remove(start_time):
+            raise SlotUnavailableError("slot already booked")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def _rss_mb() -> float:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return float("nan")
+
+
+@dataclass
+class StepResults:
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    outcomes: dict[str, int] = field(default_factory=dict)
+    loop_lag_ms: list[float] = field(default_factory=list)
+
+    def record(self, tool: str, elapsed_ms: float, outcome: str) -> None:
+        self.latencies.setdefault(tool, []).append(elapsed_ms)
+        key = f"{tool}:{outcome}"
+        self.outcomes[key] = self.outcomes.get(key, 0) + 1
+
+
+async def probe_loop_lag(results: StepResults, stop: asyncio.Event) -> None:
+    """Measures how late the event loop wakes up a task sleeping `LAG_PROBE_INTERVAL_S`"""
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL_S)
+        lag = time.perf_counter() - started_at - LAG_PROBE_INTERVAL_S
+        results.loop_lag_ms.append(max(lag, 0.0) * 1000)
+
+
+async def call_tool(results: StepResults, tool: str, call) -> tuple[str | None, str]:
+    """Output of the tool (or the message of its ToolError), and its outcome"""
+    started_at = time.perf_counter()
+    try:
+        output = await call
+        # a booking held back (calendar unavailable) answers without a confirmation
+        outcome = "queued" if output and "est enregistrée" in output else "ok"
+    except ToolError as e:
+        output = str(e)
+        if "plus disponible" in output:
+            outcome = "conflict"
+        elif "choisi par une autre personne" in output:
+            outcome = "held"  # settled by the slot holds, without calling the calendar
+        elif "beaucoup de demandes" in output:
+            outcome = "rate_limited"  # not sent: the same slot is tried again
+        else:
+            outcome = "tool_error"
+    results.record(tool, (time.perf_counter() - started_at) * 1000, outcome)
+    return output, outcome
+
+
+def listed_ids(output: str | None) -> list[str]:
+    # slot ids in the order the listing gives them (summary samples, or a drill-down)
+    return SLOT_ID.findall(output) if output else []
+
+
+async def run_session(
+    index: int,
+    agent: ZoraAgent,
+    ctx: SimpleNamespace,
+    results: StepResults,
+    args: argparse.Namespace,
+    rng: random.Random,
+) -> None:
+    await asyncio.sleep(rng.uniform(0, args.arrival_s))
+
+    try:
+        await _converse(index, agent, ctx, results, args, rng)
+    finally:
+        ctx.userdata.holds.release_all()  # hang-up
+
+
+async def _converse(
+    index: int,
+    agent: ZoraAgent,
+    ctx: SimpleNamespace,
+    results: StepResults,
+    args: argparse.Namespace,
+    rng: random.Random,
+) -> None:
+    output, _ = await call_tool(
+        results, "list_available_slots", agent.list_available_slots(ctx, range="default")
+    )
+    await asyncio.sleep(args.think_ms / 1000)
+    if rng.random() < args.widen_rate:
+        output, _ = await call_tool(
+            results, "list_available_slots", agent.list_available_slots(ctx, range="+1month")
+        )
+        await asyncio.sleep(args.think_ms / 1000)
+
+    slot_id = None
+    for attempt in range(args.max_attempts):
+        if slot_id is None:
+            if not (slot_ids := listed_ids(output)):
+                return
+            slot_id = rng.choice(slot_ids[: args.pick_from])
+        output, outcome = await call_tool(
+            results,
+            "schedule_appointment",
+            agent.schedule_appointment(
+                ctx,
+                slot_id=slot_id,
+                user_name=f"Client {index}",
+                user_phone_number=f"06{index:08d}",
+            ),
+        )
+        if outcome in ("ok", "queued"):
+            return
+
+        await asyncio.sleep(args.think_ms / 1000)
+        if outcome == "rate_limited":
+            continue
+        slot_id = None
+        if outcome == "held" and listed_ids(output):
+            continue  # the conflict came with nearby free slots: one of them is offered
+        # conflict: the agent lists again before offering alternatives
+        output, _ = await call_tool(
+            results, "list_available_slots", agent.list_available_slots(ctx, range="default")
+        )
+
+
+def print_histogram(tool: str, samples: list[float]) -> None:
+    print(
+        f"  {tool:<22} n={len(samples):<6} p50={percentile(samples, 50):7.1f} ms  "
+        f"p95={percentile(samples, 95):7.1f} ms  p99={percentile(samples, 99):7.1f} ms  "
+        f"max={max(samples):7.1f} ms"
+    )
+    counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+    for sample in samples:
+        counts[next((i for i, b in enumerate(HISTOGRAM_BUCKETS_MS) if sample <= b), -1)] += 1
+    width = max(counts)
+    labels = [f"<={b}" for b in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}"]
+    for label, count in zip(labels, counts):
+        if count:
+            print(f"    {label:>7} ms {count:6d} {'#' * max(1, round(40 * count / width))}")
+
+
+async def run_step(
+    sessions: int,
+    new_calendar,
+    args: argparse.Namespace,
+) -> None:
+    shared_slot_cache.clear()
+    shared_calendar_registry.clear()
+    shared_circuit_breakers.clear()
+    shared_slot_holds.clear()
+    rng = random.Random(sessions)
+    results = StepResults()
+
+    gc.collect()
+    rss_before = _rss_mb()
+    traced_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+    # sessions of the same practice share its calendar, like concurrent calls to one assistant
+    calendars = [new_calendar(k) for k in range(args.calendars)]
+    for cal in calendars:
+        await cal.initialize()
+
+    agents = [ZoraAgent(timezone=TIMEZONE) for _ in range(sessions)]
+    contexts = [
+        SimpleNamespace(
+            userdata=Userdata(
+                cal=CoalescingCalendar(calendars[i % len(calendars)]),
+                # without shared holds, each session only sees its own
+                holds=(shared_slot_holds if args.holds else SlotHoldManager()).session(),
+            ),
+            disallow_interruptions=lambda: None,
+        )
+        for i in range(sessions)
+    ]
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(results, stop))
+    started_at = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_session(i, agents[i], contexts[i], results, args, rng)
+            for i in range(sessions)
+        )
+    )
+    wall_s = time.perf_counter() - started_at
+    stop.set()
+    await probe
+
+    # sessions (agents, listed slots, availability indexes) are still referenced here
+    gc.collect()
+    rss_per_session = (_rss_mb() - rss_before) * 1024 / sessions
+    traced = ""
+    if tracemalloc.is_tracing():
+        traced_kib = (tracemalloc.get_traced_memory()[0] - traced_before) / 1024 / sessions
+        traced = f"  traced={traced_kib:.1f} KiB/session"
+
+    tool_calls = sum(len(samples) for samples in results.latencies.values())
+    print(
+        f"\n=== {sessions} sessions, {args.calendars} calendar(s): {wall_s:.2f} s, "
+        f"{tool_calls / wall_s:.1f} tool calls/s"
+    )
+    for tool, samples in sorted(results.latencies.items()):
+        print_histogram(tool, samples)
+    print(f"  outcomes: {dict(sorted(results.outcomes.items()))}")
+    lag = results.loop_lag_ms
+    print(
+        f"  event loop lag: p50={percentile(lag, 50):.2f} ms  p99={percentile(lag, 99):.2f} ms  "
+        f"max={max(lag, default=0.0):.2f} ms"
+    )
+    print(f"  memory: rss={rss_per_session:.1f} KiB/session{traced}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=("fake", "standin"), default="fake")
+    parser.add_argument("--ramp", default="10,50,100,200", help="comma separated session counts")
+    parser.add_argument("--calendars", type=int, default=1, help="distinct practices")
+    parser.add_argument("--arrival-s", type=float, default=1.0, help="spread of session starts")
+    parser.add_argument("--think-ms", type=float, default=50.0, help="pause between tool calls")
+    parser.add_argument("--widen-rate", type=float, default=0.3, help="share asking for +1month")
+    parser.add_argument("--pick-from", type=int, default=3, help="slots competed for")
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--conflict-rate", type=float, default=0.0)
+    parser.add_argument("--tracemalloc", action="store_true", help="also trace Python allocations")
+    parser.add_argument(
+        "--rate-limit-per-min",
+        type=float,
+        default=CALCOM_RATE_LIMIT_PER_MIN,
+        help="Cal.com requests per minute per API key (0: no limit)",
+    )
+    parser.add_argument(
+        "--no-holds", dest="holds", action="store_false", help="no slot holds across sessions"
+    )
+    parser.add_argument("--verbose", action="store_true", help="keep the agent and calendar logs")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for name in ("zora-agent", "cal.com", "calendar-registry"):
+            logging.getLogger(name).setLevel(logging.CRITICAL)
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    steps = [int(n) for n in args.ramp.split(",")]
+    print(f"backend={args.backend}  ramp={steps}  think={args.think_ms} ms")
+
+    if args.backend == "fake":
+        for sessions in steps:
+            await run_step(
+                sessions, lambda _: ConflictingFakeCalendar(timezone=TIMEZONE), args
+            )
+        return
+
+    standin = CalComStandin(
+        StandinConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            conflict_rate=args.conflict_rate,
+            seed=0,
+        )
+    )
+    base_url = await standin.start()
+    # 0 disables the limit (a rate no step can reach)
+    rate_limiters = RateLimiters(rate_per_min=args.rate_limit_per_min or 1e9)
+    async with aiohttp.ClientSession() as session:
+
+        def new_calendar(k: int) -> Calendar:
+            return CalComCalendar(
+                api_key=f"load-{k}",
+                timezone=TIMEZONE,
+                event_id=str(standin.config.event_type_id),
+                base_url=base_url,
+                http_session=session,
+                rate_limiters=rate_limiters,
+            )
+
+        for sessions in steps:
+            standin.booked.clear()
+            standin.requests.clear()
+            rate_limiters.clear()
+            await run_step(sessions, new_calendar, args)
+            print(f"  stand-in requests: {standin.requests}")
+
+    await standin.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
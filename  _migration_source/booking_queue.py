@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import fcntl
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+import observability
+from state_dir import state_path
+
+logger = logging.getLogger("cal.com.bookings")
+
+BOOKING_QUEUE_MAX_SIZE = 50
+# pause between two attempts while the calendar is still unavailable
+BOOKING_RETRY_INTERVAL_S = 15.0
+# last round of sends when the job ends; bookings not started by then wait for the next job
+BOOKING_SHUTDOWN_DRAIN_S = 5.0
+BOOKING_JOURNAL_FILE = "booking-queue.json"
+
+# outcomes returned by `PendingBooking.confirm`
+CONFIRMED = "confirmed"
+REJECTED = "rejected"
+FAILED = "failed"
+
+
+class BookingQueuedError(Exception):
+    """The calendar is unavailable: the booking was queued and will be sent once it answers"""
+
+    def __init__(self, message: str, *, position: int) -> None:
+        super().__init__(message)
+        self.position = position
+
+
+@dataclass
+class PendingBooking:
+    start_time: datetime.datetime
+    user_name: str
+    # sends the booking once; returns an outcome, or None if the calendar is still unavailable
+    confirm: Callable[[], Awaitable[str | None]] = field(repr=False)
+    queued_at: float = field(default_factory=time.time)
+    # written to the journal so another job can send the booking: the calendar's journal key
+    # and the request it sends (None: kept in memory only)
+    calendar: str | None = None
+    request: dict[str, Any] | None = field(default=None, repr=False)
+    journal_id: str | None = None
+
+
+T = TypeVar("T")
+
+
+class BookingJournal:
+    """Queued bookings kept on disk until they are sent, shared by the worker's processes.
+
+    Each job runs in its own process, which exits after the call: a booking still queued then
+    would be lost. Every queued booking is written here (JSON, mode 0600, in the worker's state
+    directory) and removed once sent. A row names the process sending it: rows released when a
+    job ends, or left by a process that died, are claimed by the next job of the same calendar.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self._path = path
+
+    @property
+    def path(self) -> str:
+        # resolved on first use: importing the module creates no directory
+        if self._path is None:
+            self._path = state_path(BOOKING_JOURNAL_FILE)
+        return self._path
+
+    def add(self, booking: PendingBooking) -> str:
+        booking_id = str(uuid.uuid4())
+        row = {
+            "calendar": booking.calendar,
+            "start": booking.start_time.isoformat(),
+            "user_name": booking.user_name,
+            "request": booking.request,
+            "queued_at": booking.queued_at,
+            "owner": os.getpid(),
+        }
+        self._update(lambda rows: rows.__setitem__(booking_id, row))
+        return booking_id
+
+    def remove(self, booking_id: str) -> None:
+        self._update(lambda rows: rows.pop(booking_id, None))
+
+    def release(self, booking_ids: Iterable[str]) -> None:
+        """Hand the rows over to the next job of their calendar"""
+
+        def _release(rows: dict[str, dict[str, Any]]) -> None:
+            for booking_id in booking_ids:
+                if (row := rows.get(booking_id)) is not None:
+                    row["owner"] = None
+
+        self._update(_release)
+
+    def claim(self, calendar: str) -> list[tuple[str, dict[str, Any]]]:
+        """Rows of `calendar` no running process is sending: they are now sent by this one"""
+
+        def _claim(rows: dict[str, dict[str, Any]]) -> list[tuple[str, dict[str, Any]]]:
+            claimed = []
+            for booking_id, row in rows.items():
+                if row["calendar"] == calendar and not _running(row["owner"]):
+                    row["owner"] = os.getpid()
+                    claimed.append((booking_id, row))
+            return claimed
+
+        return self._update(_claim)
+
+    def _update(self, change: Callable[[dict[str, dict[str, Any]]], T]) -> T:
+        path = self.path
+        lock_fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    rows = json.load(f)
+            except FileNotFoundError:
+                rows = {}
+            result = change(rows)
+            # rewritten then renamed: a crash never leaves a truncated journal
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(rows, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            return result
+        finally:
+            os.close(lock_fd)
+
+
+def _running(pid: int | None) -> bool:
+    if pid is None:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # running, as another user
+    return True
+
+
+@dataclass
+class BookingQueueStats:
+    queued: int = 0
+    confirmed: int = 0
+    rejected: int = 0
+    failed: int = 0
+    dropped: int = 0
+
+
+class BookingQueue:
+    """Bookings accepted while a calendar is unavailable, sent oldest first once it answers.
+
+    A booking is sent at most once: only a call rejected before being attempted (circuit still
+    open) is retried, any other failure is logged and dropped. With a `journal`, queued bookings
+    outlive the job: those not sent when it ends are sent by the next job of their calendar.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_size: int = BOOKING_QUEUE_MAX_SIZE,
+        retry_interval: float = BOOKING_RETRY_INTERVAL_S,
+        journal: BookingJournal | None = None,
+    ) -> None:
+        self.name = name
+        self._max_size = max_size
+        self._retry_interval = retry_interval
+        self._journal = journal
+        self._pending: deque[PendingBooking] = deque()
+        self._drain_task: asyncio.Task[None] | None = None
+        # one round of sends at a time: the shutdown round waits for the background one
+        self._sending = asyncio.Lock()
+        self.stats = BookingQueueStats()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, booking: PendingBooking) -> int:
+        """Queue `booking`, returns its position; raises OverflowError when the queue is full"""
+        if len(self._pending) >= self._max_size:
+            self.stats.dropped += 1
+            raise OverflowError(f"booking queue {self.name} is full")
+        if self._journal is not None and booking.request is not None and booking.journal_id is None:
+            try:
+                booking.journal_id = self._journal.add(booking)
+            except (OSError, ValueError) as e:
+                # only in memory, it would be lost when the job ends: not accepted
+                self.stats.dropped += 1
+                logger.error(f"❌ Booking for {booking.start_time} not queued (journal: {e})")
+                raise
+
+        self._pending.append(booking)
+        self.stats.queued += 1
+        observability.count("degraded", calendar=self.name, kind="queued_booking")
+        logger.warning(f"📥 Booking for {booking.start_time} queued ({len(self._pending)} pending)")
+
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain())
+        return len(self._pending)
+
+    def recover(
+        self,
+        calendar: str,
+        confirm: Callable[[datetime.datetime, dict[str, Any]], Callable[[], Awaitable[str | None]]],
+    ) -> int:
+        """Queue the bookings of `calendar` left in the journal by jobs that ended.
+
+        `confirm(start_time, request)` rebuilds the send of a booking; returns how many were queued.
+        """
+        if self._journal is None:
+            return 0
+        try:
+            rows = self._journal.claim(calendar)
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Booking journal unavailable, queued bookings not recovered: {e}")
+            return 0
+
+        recovered = 0
+        for booking_id, row in rows:
+            start_time = datetime.datetime.fromisoformat(row["start"])
+            try:
+                self.enqueue(
+                    PendingBooking(
+                        start_time=start_time,
+                        user_name=row["user_name"],
+                        confirm=confirm(start_time, row["request"]),
+                        queued_at=row["queued_at"],
+                        calendar=calendar,
+                        request=row["request"],
+                        journal_id=booking_id,
+                    )
+                )
+            except OverflowError:
+                self._release([booking_id])  # for a job with room in its queue
+                continue
+            recovered += 1
+        if recovered:
+            logger.warning(f"📥 {recovered} queued bookings recovered from ended jobs ({self.name})")
+        return recovered
+
+    async def aclose(self, *, timeout: float = BOOKING_SHUTDOWN_DRAIN_S) -> None:
+        """Last round of sends; bookings still queued are left to the next job of the calendar"""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+        if self._pending:
+            await self._send_pending(deadline=time.monotonic() + timeout)
+        if not self._pending:
+            return
+
+        journaled = [booking.journal_id for booking in self._pending if booking.journal_id]
+        if journaled:
+            self._release(journaled)
+            logger.warning(f"📤 {len(journaled)} queued bookings left to the next job ({self.name})")
+        if lost := len(self._pending) - len(journaled):
+            logger.error(f"❌ {lost} queued bookings never sent ({self.name})")
+        self._pending.clear()
+
+    async def _drain(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self._retry_interval)
+            # not cancelled mid-send by `aclose`: a booking interrupted after being posted
+            # would be sent again by the next job
+            await asyncio.shield(self._send_pending())
+
+    async def _send_pending(self, *, deadline: float | None = None) -> None:
+        async with self._sending:
+            while self._pending:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                booking = self._pending[0]
+                try:
+                    outcome = await booking.confirm()
+                except Exception as e:
+                    logger.error(f"❌ Queued booking for {booking.start_time} failed: {e}")
+                    outcome = FAILED
+                if outcome is None:
+                    return  # still unavailable: wait for the next round
+
+                self._pending.popleft()
+                if booking.journal_id is not None:
+                    self._forget(booking.journal_id)
+                if outcome == CONFIRMED:
+                    self.stats.confirmed += 1
+                elif outcome == REJECTED:
+                    self.stats.rejected += 1
+                else:
+                    self.stats.failed += 1
+                observability.count("degraded", calendar=self.name, kind=f"queued_{outcome}")
+
+    def _forget(self, booking_id: str) -> None:
+        try:
+            self._journal.remove(booking_id)
+        except (OSError, ValueError) as e:
+            # left in the journal: it would be sent again by another job
+            logger.error(f"❌ Sent booking {booking_id} not removed from the journal: {e}")
+
+    def _release(self, booking_ids: list[str]) -> None:
+        try:
+            self._journal.release(booking_ids)
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Queued bookings not released to the next job: {e}")
+
+
+class BookingQueues:
+    """One `BookingQueue` per calendar (API key fingerprint), sharing `journal`"""
+
+    def __init__(self, *, journal: BookingJournal | None = None) -> None:
+        self._journal = journal
+        self._queues: dict[str, BookingQueue] = {}
+
+    def get(self, name: str) -> BookingQueue:
+        if (queue := self._queues.get(name)) is None:
+            queue = self._queues[name] = BookingQueue(name, journal=self._journal)
+        return queue
+
+    def __iter__(self) -> Iterator[BookingQueue]:
+        return iter(self._queues.values())
+
+
+# a job's process exits after the call: its queued bookings are kept on disk for the next job
+shared_booking_queues = BookingQueues(journal=BookingJournal())
@@ -3,16 +3,49 @@ from __future__ import annotations
 import base64
 import datetime
 import hashlib
-import logging
 import random
-from dataclasses import dataclass
-from typing import Protocol
+from dataclasses import dataclass, field
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any, Protocol, TypeVar
 from urllib.parse import urlencode
 from zoneinfo import ZoneInfo
 
 import aiohttp
 
-from livekit.agents.utils import http_context
+import observability
+import structured_logging
+from booking_queue import (
+    CONFIRMED,
+    FAILED,
+    REJECTED,
+    BookingQueue,
+    BookingQueuedError,
+    BookingQueues,
+    PendingBooking,
+    shared_booking_queues,
+)
+from calendar_registry import CalendarRegistry, CalendarSetup, shared_calendar_registry
+from circuit_breaker import (
+    CalendarUnavailableError,
+    CircuitBreaker,
+    CircuitBreakers,
+    LastKnownAvailability,
+    shared_circuit_breakers,
+)
+from http_pool import HttpPool, shared_http_pool
+from rate_limiter import RateLimitedError, RateLimiters, retry_after_s, shared_rate_limiters
+from request_executor import (
+    CalendarTimeoutError,
+    RequestExecutor,
+    is_retryable,
+    shared_request_executor,
+)
+from slot_cache import SlotCache, shared_slot_cache
+from slot_store import SlotStore
+from slots_decoder import SLOTS_READ_CHUNK_BYTES, SlotsDecoder
+
+
+T = TypeVar("T")
 
 
 class SlotUnavailableError(Exception):
@@ -20,42 +53,74 @@ class SlotUnavailableError(Exception):
         super().__init__(message)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AvailableSlot:
     start_time: datetime.datetime
     duration_min: int
+    # owning calendar, when several are offered together (see CompositeCalendar)
+    calendar: str | None = None
+    _hash: str | None = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def unique_hash(self) -> str:
-        # unique id based on the start_time & duration_min
-        raw = f"{self.start_time.isoformat()}|{self.duration_min}".encode()
-        digest = hashlib.blake2s(raw, digest_size=5).digest()
-        return f"ST_{base64.b32encode(digest).decode().rstrip('=').lower()}"
+        if self._hash is None:
+            # unique id based on the start_time & duration_min (& owning calendar), computed
+            # once per slot; the same instant has the same id in any timezone
+            raw = f"{int(self.start_time.timestamp())}|{self.duration_min}"
+            if self.calendar is not None:
+                raw = f"{raw}|{self.calendar}"
+            raw = raw.encode()
+            digest = hashlib.blake2s(raw, digest_size=5).digest()
+            object.__setattr__(
+                self, "_hash", f"ST_{base64.b32encode(digest).decode().rstrip('=').lower()}"
+            )
+        return self._hash
+
+
+class PartialSlots(list[AvailableSlot]):
+    """Answer of a lookup some calendars left out (`missing`, see `CompositeCalendar`).
+
+    The slots are right, but the window may have more: not to be kept as its full availability.
+    """
+
+    def __init__(self, slots: Iterable[AvailableSlot] = (), *, missing: Iterable[str] = ()) -> None:
+        super().__init__(slots)
+        self.missing = tuple(missing)
 
 
 class Calendar(Protocol):
     async def initialize(self) -> None: ...
+    # `calendar` is the owner of the slot being booked (`AvailableSlot.calendar`); a calendar
+    # serving a single event type ignores it
     async def schedule_appointment(
         self,
         *,
         start_time: datetime.datetime,
         attendee_email: str,
         user_name: str,
+        calendar: str | None = None,
     ) -> None: ...
+    # with `limit`, a calendar may stop after the first `limit` slots of the window (it may
+    # also return them all)
     async def list_available_slots(
-        self, *, start_time: datetime.datetime, end_time: datetime.datetime
+        self,
+        *,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int | None = None,
     ) -> list[AvailableSlot]: ...
 
 
 class FakeCalendar(Calendar):
     def __init__(self, *, timezone: str, slots: list[AvailableSlot] | None = None) -> None:
         self.tz = ZoneInfo(timezone)
-        self._slots: list[AvailableSlot] = []
 
         if slots is not None:
-            self._slots.extend(slots)
+            self._slots = SlotStore(slots, tz=self.tz)
             return
 
+        generated: list[AvailableSlot] = []
+
         today = datetime.datetime.now(self.tz).date()
         for day_offset in range(1, 90):  # generate slots for the next 90 days
             current_day = today + datetime.timedelta(days=day_offset)
@@ -73,21 +138,65 @@ class FakeCalendar(Calendar):
             chosen = random.sample(slots_in_day, num_slots)
 
             for slot_start in sorted(chosen):
-                self._slots.append(AvailableSlot(start_time=slot_start, duration_min=30))
+                generated.append(AvailableSlot(start_time=slot_start, duration_min=30))
+
+        self._slots = SlotStore(generated, tz=self.tz)
 
     async def initialize(self) -> None:
         pass
 
     async def schedule_appointment(
-        self, *, start_time: datetime.datetime, attendee_email: str, user_name: str
+        self,
+        *,
+        start_time: datetime.datetime,
+        attendee_email: str,
+        user_name: str,
+        calendar: str | None = None,
     ) -> None:
         # fake it by just removing it from our slots list
-        self._slots = [slot for slot in self._slots if slot.start_time != start_time]
+        self._slots.remove(start_time)
 
     async def list_available_slots(
-        self, *, start_time: datetime.datetime, end_time: datetime.datetime
+        self,
+        *,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int | None = None,
     ) -> list[AvailableSlot]:
-        return [slot for slot in self._slots if start_time <= slot.start_time < end_time]
+        return self._slots.window(start_time, end_time, limit=limit)
+
+
+class UnavailableCalendar(Calendar):
+    """Stands for a practice whose calendar configuration could not be loaded.
+
+    Never serves slots nor takes bookings: the practice's real calendar is unknown, and fake
+    slots would be offered (and "booked") to its callers.
+    """
+
+    def __init__(self, reason: str) -> None:
+        self._reason = reason
+
+    async def initialize(self) -> None:
+        pass
+
+    async def schedule_appointment(
+        self,
+        *,
+        start_time: datetime.datetime,
+        attendee_email: str,
+        user_name: str,
+        calendar: str | None = None,
+    ) -> None:
+        raise CalendarUnavailableError(f"Calendar not configured: {self._reason}")
+
+    async def list_available_slots(
+        self,
+        *,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int | None = None,
+    ) -> list[AvailableSlot]:
+        raise CalendarUnavailableError(f"Calendar not configured: {self._reason}")
 
 
 # --- cal.com impl ---
@@ -98,106 +207,181 @@ BASE_URL = "https://api.cal.com/v2/"
 
 
 class CalComCalendar(Calendar):
-    def __init__(self, *, api_key: str, timezone: str, event_id: str | None = None) -> None:
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        timezone: str,
+        event_id: str | None = None,
+        slot_cache: SlotCache | None = shared_slot_cache,
+        registry: CalendarRegistry | None = shared_calendar_registry,
+        base_url: str = BASE_URL,
+        http_session: aiohttp.ClientSession | None = None,
+        http_pool: HttpPool = shared_http_pool,
+        requests: RequestExecutor = shared_request_executor,
+        breakers: CircuitBreakers = shared_circuit_breakers,
+        booking_queues: BookingQueues = shared_booking_queues,
+        rate_limiters: RateLimiters = shared_rate_limiters,
+    ) -> None:
         self.tz = ZoneInfo(timezone)
+        self._base_url = base_url
         self._api_key = api_key
         self._configured_event_id = event_id  # Event ID fourni par la config UI
+        self.slot_cache = slot_cache
+        self._registry = registry
+        self._requests = requests
+        # shared by every calendar using this api key: an outage is detected once per worker
+        self._breaker = breakers.get(api_key)
+        self._booking_queue = booking_queues.get(self._breaker.name)
+        # identifies the calendar's queued bookings on disk, without writing the api key there
+        self._journal_key = hashlib.blake2s(
+            f"{base_url}\0{api_key}".encode(), digest_size=16
+        ).hexdigest()
+        # Cal.com limits requests per api key: sessions sharing a key share its bucket
+        self._rate_limiter = rate_limiters.get(api_key)
+        self.username: str | None = None
+        self._lk_event_id: str | int | None = None
+
+        self._own_http_session = http_session
+        self._http_pool = http_pool
+
+        self._logger = structured_logging.get_logger("cal.com")
 
-        try:
-            self._http_session = http_context.http_session()
-        except RuntimeError:
-            self._http_session = aiohttp.ClientSession()
-
-        self._logger = logging.getLogger("cal.com")
+    @property
+    def _http_session(self) -> aiohttp.ClientSession:
+        # resolved per request: a booking queued during a call may be sent after the job ended
+        return self._own_http_session or self._http_pool.session()
 
     async def initialize(self) -> None:
-        self._logger.info("🔧 Initializing Cal.com calendar integration...")
-        self._logger.info(f"🌐 Base URL: {BASE_URL}")
-        self._logger.info(f"🔑 API Key present: {bool(self._api_key)}")
-        self._logger.info(f"🔑 API Key prefix: {self._api_key[:10] if self._api_key else 'None'}...")
+        if self._registry is None:
+            setup = await self._resolve_setup()
+        else:
+            # the api key & event id are the same for every call to an assistant: only the first
+            # job of the worker pays for the setup round trips
+            setup = await self._registry.get_or_resolve(
+                (self._api_key, self._configured_event_id), self._resolve_setup
+            )
+
+        self.username = setup.username
+        self._lk_event_id = setup.event_type_id
+        # bookings queued by jobs that ended before Cal.com answered again
+        self._booking_queue.recover(self._journal_key, self._queued_confirmation)
+
+    async def _ensure_initialized(self) -> None:
+        # initialize() failed at the start of the call: try again rather than serve fake data
+        if self._lk_event_id is not None:
+            return
+        try:
+            await self.initialize()
+        except Exception as e:
+            raise CalendarUnavailableError(f"Cal.com calendar not initialized: {e}") from e
+
+    async def _resolve_setup(self) -> CalendarSetup:
+        self._logger.info(
+            "🔧 Initializing Cal.com calendar integration",
+            base_url=self._base_url,
+            calendar=self._breaker.name,
+        )
         
         try:
             # Test API connection and get user info
-            self._logger.info("👤 Fetching user information...")
-            async with self._http_session.get(
-                headers=self._build_headers(api_version="2024-06-14"), url=f"{BASE_URL}me/"
-            ) as resp:
-                self._logger.info(f"📡 /me/ response status: {resp.status}")
-                resp.raise_for_status()
-                user_data = await resp.json()
-                self._logger.info(f"👤 User data received: {user_data}")
-                username = user_data["data"]["username"]
-                self._logger.info(f"✅ Using cal.com username: {username}")
+            user_data = await self._get_json("me", "me/", api_version="2024-06-14")
+            self._logger.debug("👤 User data received", body=user_data)
+            username = user_data["data"]["username"]
+            self._logger.info("✅ Using cal.com username", username=username)
 
             # Get or create event type
             if self._configured_event_id:
                 # Use the configured Event ID from UI
-                self._logger.info(f"📅 Using configured Event ID: {self._configured_event_id}")
+                self._logger.info("📅 Using configured Event ID", event_id=self._configured_event_id)
 
                 # Validate that the configured Event ID exists and is accessible
-                async with self._http_session.get(
-                    headers=self._build_headers(api_version="2024-06-14"),
-                    url=f"{BASE_URL}event-types/{self._configured_event_id}",
-                ) as resp:
-                    self._logger.info(f"📡 Event type validation response status: {resp.status}")
-                    if resp.status == 404:
+                try:
+                    event_data = await self._get_json(
+                        "event_type",
+                        f"event-types/{self._configured_event_id}",
+                        api_version="2024-06-14",
+                    )
+                except aiohttp.ClientResponseError as e:
+                    if e.status == 404:
                         raise Exception(f"Configured Event ID {self._configured_event_id} not found or not accessible")
-                    resp.raise_for_status()
-                    event_data = await resp.json()
-                    self._logger.info(f"✅ Configured Event ID validated: {event_data}")
-                    self._lk_event_id = self._configured_event_id
+                    raise
+                self._logger.info("✅ Configured Event ID validated", event_id=self._configured_event_id)
+                self._logger.debug("📅 Event type data", body=event_data)
+                event_type_id = self._configured_event_id
             else:
                 # Fallback to default behavior: find or create "livekit-front-desk"
-                self._logger.info(f"📅 Looking for event type: {CAL_COM_EVENT_TYPE}")
+                self._logger.info("📅 Looking for event type", slug=CAL_COM_EVENT_TYPE)
                 query = urlencode({"username": username})
-                async with self._http_session.get(
-                    headers=self._build_headers(api_version="2024-06-14"),
-                    url=f"{BASE_URL}event-types/?{query}",
-                ) as resp:
-                    self._logger.info(f"📡 /event-types/ response status: {resp.status}")
-                    resp.raise_for_status()
-                    event_types_data = await resp.json()
-                    self._logger.info(f"📅 Event types data: {event_types_data}")
-                    data = event_types_data["data"]
-                    lk_event_type = next(
-                        (event for event in data if event.get("slug") == CAL_COM_EVENT_TYPE), None
+                event_types_data = await self._get_json(
+                    "event_types", f"event-types/?{query}", api_version="2024-06-14"
+                )
+                self._logger.debug("📅 Event types data", body=event_types_data)
+                data = event_types_data["data"]
+                lk_event_type = next(
+                    (event for event in data if event.get("slug") == CAL_COM_EVENT_TYPE), None
+                )
+
+                if lk_event_type:
+                    event_type_id = lk_event_type["id"]
+                    self._logger.info("✅ Found existing event type", event_type_id=event_type_id)
+                else:
+                    create_payload = {
+                        "lengthInMinutes": EVENT_DURATION_MIN,
+                        "title": "LiveKit Front-Desk",
+                        "slug": CAL_COM_EVENT_TYPE,
+                    }
+                    self._logger.info(
+                        "🆕 Creating new event type", slug=CAL_COM_EVENT_TYPE, payload=create_payload
                     )
 
-                    if lk_event_type:
-                        self._lk_event_id = lk_event_type["id"]
-                        self._logger.info(f"✅ Found existing event type: {lk_event_type}")
-                    else:
-                        self._logger.info(f"🆕 Creating new event type: {CAL_COM_EVENT_TYPE}")
-                        create_payload = {
-                            "lengthInMinutes": EVENT_DURATION_MIN,
-                            "title": "LiveKit Front-Desk",
-                            "slug": CAL_COM_EVENT_TYPE,
-                        }
-                        self._logger.info(f"📋 Create event type payload: {create_payload}")
-
-                        async with self._http_session.post(
-                            headers=self._build_headers(api_version="2024-06-14"),
-                            url=f"{BASE_URL}event-types",
-                            json=create_payload,
-                        ) as resp:
-                            self._logger.info(f"📡 Create event type response status: {resp.status}")
-                            resp.raise_for_status()
-                            create_response = await resp.json()
-                            self._logger.info(f"🆕 Event type created: {create_response}")
-                            self._logger.info(f"✅ Successfully added {CAL_COM_EVENT_TYPE} event type")
-                            data = create_response["data"]
-                            self._lk_event_id = data["id"]
-
-                self._logger.info(f"🎯 Final event type ID: {self._lk_event_id}")
-                self._logger.info("✅ Cal.com calendar initialization completed successfully!")
+                    async def _create() -> dict:
+                        with observability.calcom_request("create_event_type") as timings:
+                            async with self._http_session.post(
+                                headers=self._build_headers(api_version="2024-06-14"),
+                                url=f"{self._base_url}event-types",
+                                json=create_payload,
+                                trace_request_ctx=timings,
+                            ) as resp:
+                                timings.response_started()
+                                self._logger.info(
+                                    "📡 Create event type response", status=resp.status
+                                )
+                                resp.raise_for_status()
+                                create_response = await resp.json()
+                                timings.body_parsed()
+                                return create_response
+
+                    # a POST is never sent twice: a retry could create a duplicate event type
+                    create_response = await self._call(
+                        "create_event_type", _create, idempotent=False
+                    )
+                    data = create_response["data"]
+                    event_type_id = data["id"]
+                    self._logger.info("🆕 Event type created", event_type_id=event_type_id)
+                    self._logger.debug("🆕 Created event type", body=create_response)
+
+                self._logger.info(
+                    "✅ Cal.com calendar initialization completed", event_type_id=event_type_id
+                )
                 
         except Exception as e:
-            self._logger.error(f"💥 Cal.com initialization failed: {type(e).__name__}: {e}")
+            self._logger.error(
+                "💥 Cal.com initialization failed", error_type=type(e).__name__, error=str(e)
+            )
             raise
 
+        return CalendarSetup(username=username, event_type_id=event_type_id)
+
     async def schedule_appointment(
-        self, *, start_time: datetime.datetime, attendee_email: str, user_name: str
+        self,
+        *,
+        start_time: datetime.datetime,
+        attendee_email: str,
+        user_name: str,
+        calendar: str | None = None,
     ) -> None:
+        await self._ensure_initialized()
         start_time = start_time.astimezone(datetime.timezone.utc)
         
         payload = {
@@ -210,35 +394,80 @@ class CalComCalendar(Calendar):
             "eventTypeId": self._lk_event_id,
         }
         
-        self._logger.info(f"🚀 Attempting to create booking with payload: {payload}")
-        self._logger.info(f"📅 Booking URL: {BASE_URL}bookings")
-        self._logger.info(f"🔑 Using event type ID: {self._lk_event_id}")
+        # attendee name and email only at debug level
+        self._logger.info(
+            "🚀 Attempting to create booking", start=payload["start"], event_type_id=self._lk_event_id
+        )
+        self._logger.debug("🚀 Booking payload", payload=payload)
 
         try:
+            # never duplicated nor retried: Cal.com could end up with two bookings
+            await self._call("booking", lambda: self._send_booking(payload), idempotent=False)
+        except CalendarUnavailableError:
+            # not attempted: queued, sent once Cal.com answers again
+            position = self._booking_queue.enqueue(
+                PendingBooking(
+                    start_time=start_time,
+                    user_name=user_name,
+                    confirm=self._queued_confirmation(start_time, payload),
+                    calendar=self._journal_key,
+                    request=payload,
+                )
+            )
+            raise BookingQueuedError(
+                "Cal.com unavailable, booking queued for confirmation", position=position
+            ) from None
+        except RateLimitedError:
+            # not sent, and Cal.com is not down: the caller can simply try again
+            self._logger.warning("🚦 Booking not sent: rate limit still reached", start=start_time)
+            raise
+        except CalendarTimeoutError:
+            # the booking may or may not exist: don't offer this slot again from the cache
+            self._logger.error("⏱️ No answer from Cal.com for the booking", start=start_time)
+            self._invalidate_cached_slots(start_time)
+            raise
+        except SlotUnavailableError:
+            # our cached view of this slot is wrong, drop it before anyone else is offered it
+            self._invalidate_cached_slots(start_time)
+            raise
+        except Exception as e:
+            self._logger.error(
+                "💥 Exception during booking creation", error_type=type(e).__name__, error=str(e)
+            )
+            raise
+
+        self._invalidate_cached_slots(start_time)
+
+    async def _send_booking(self, payload: dict[str, Any]) -> None:
+        with observability.calcom_request("booking") as timings:
             async with self._http_session.post(
                 headers=self._build_headers(api_version="2024-08-13"),
-                url=f"{BASE_URL}bookings",
+                url=f"{self._base_url}bookings",
                 json=payload,
+                trace_request_ctx=timings,
             ) as resp:
-                self._logger.info(f"📡 HTTP Response Status: {resp.status}")
-                
+                timings.response_started()
                 # Lire la réponse
                 response_text = await resp.text()
-                self._logger.info(f"📄 Raw response: {response_text}")
-                
+                self._logger.info("📡 Booking response", start=payload["start"], status=resp.status)
+                self._logger.debug("📡 Booking response body", body=response_text)
+            
                 try:
                     data = await resp.json() if response_text else {}
                 except Exception as json_error:
-                    self._logger.error(f"❌ Failed to parse JSON response: {json_error}")
-                    self._logger.error(f"Raw response was: {response_text}")
+                    self._logger.error(
+                        "❌ Failed to parse JSON response",
+                        status=resp.status,
+                        error=str(json_error),
+                    )
                     raise
-                
-                self._logger.info(f"📋 Parsed Cal.com response: {data}")
-                
+                timings.body_parsed()
+            
+                self._logger.debug("📋 Parsed Cal.com response", body=data)
+            
                 if error := data.get("error"):
                     message = error["message"]
-                    self._logger.error(f"❌ Cal.com API error: {message}")
-                    self._logger.error(f"Full error details: {error}")
+                    self._logger.error("❌ Cal.com API error", message=message, details=error)
                     if "User either already has booking at this time or is not available" in message:
                         raise SlotUnavailableError(error["message"])
                     # Raise other errors too
@@ -246,63 +475,221 @@ class CalComCalendar(Calendar):
 
                 # Check HTTP status
                 if resp.status >= 400:
-                    self._logger.error(f"❌ HTTP Error {resp.status}: {response_text}")
+                    self._logger.error("❌ HTTP error", status=resp.status)
                     resp.raise_for_status()
-                
-                self._logger.info("✅ Booking created successfully in Cal.com!")
-                self._logger.info(f"📋 Booking details: {data}")
-                
+            
+                self._logger.info(
+                    "✅ Booking created successfully in Cal.com",
+                    start=payload["start"],
+                    event_type_id=payload["eventTypeId"],
+                    status=resp.status,
+                )
+
+    def _queued_confirmation(
+        self, start_time: datetime.datetime, payload: dict[str, Any]
+    ) -> Callable[[], Awaitable[str | None]]:
+        return lambda: self._confirm_queued(start_time, lambda: self._send_booking(payload))
+
+    async def _confirm_queued(
+        self, start_time: datetime.datetime, book: Callable[[], Awaitable[None]]
+    ) -> str | None:
+        try:
+            await self._call("booking", book, idempotent=False)
+        except (CalendarUnavailableError, RateLimitedError):
+            return None
+        except SlotUnavailableError:
+            self._logger.error("❌ Queued booking rejected: slot taken", start=start_time)
+            self._invalidate_cached_slots(start_time)
+            return REJECTED
         except Exception as e:
-            self._logger.error(f"💥 Exception during booking creation: {type(e).__name__}: {e}")
-            raise
+            # attempted once: never sent again, the booking may exist
+            self._logger.error(
+                "❌ Queued booking failed",
+                start=start_time,
+                error_type=type(e).__name__,
+                error=str(e),
+            )
+            self._invalidate_cached_slots(start_time)
+            return FAILED
+
+        self._logger.info("✅ Queued booking confirmed", start=start_time)
+        self._invalidate_cached_slots(start_time)
+        return CONFIRMED
 
     async def list_available_slots(
-        self, *, start_time: datetime.datetime, end_time: datetime.datetime
+        self,
+        *,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int | None = None,
+    ) -> list[AvailableSlot]:
+        await self._ensure_initialized()
+        fetch_start, fetch_end = start_time, end_time
+        # a cache entry holds a whole window: a lookup stopping after `limit` slots isn't cached
+        cache = self.slot_cache
+        if cache is not None:
+            scope = self.availability_scope
+            if (cached := cache.get(scope, start_time, end_time)) is not None:
+                return cached[:limit] if limit is not None else cached
+            if limit is None:
+                fetch_start, fetch_end = cache.fetch_window(start_time, end_time)
+            else:
+                cache = None
+
+        try:
+            slots = await self._fetch_slots(start_time=fetch_start, end_time=fetch_end, limit=limit)
+        except CalendarUnavailableError as e:
+            # circuit open: the caller may offer the last known availability as provisional
+            raise CalendarUnavailableError(str(e), last_known=self.last_known_availability) from None
+        except CalendarTimeoutError:
+            self._logger.error("⏱️ Cal.com slots lookup timed out")
+            raise
+        except RateLimitedError:
+            self._logger.warning("🚦 Cal.com slots lookup not sent: rate limit reached")
+            raise
+        except Exception as e:
+            # surfaced to the caller: an empty list would read as "no availability"
+            self._logger.error("Error fetching available slots", error=str(e))
+            raise
+
+        if cache is not None:
+            cache.put(scope, fetch_start, fetch_end, slots)
+        return [slot for slot in slots if start_time <= slot.start_time < end_time]
+
+    async def _fetch_slots(
+        self,
+        *,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int | None = None,
     ) -> list[AvailableSlot]:
+        start_time = start_time.astimezone(datetime.timezone.utc)
+        end_time = end_time.astimezone(datetime.timezone.utc)
+        query = urlencode(
+            {
+                "eventTypeId": self._lk_event_id,
+                "start": start_time.isoformat(),
+                "end": end_time.isoformat(),
+            }
+        )
+
+        async def _attempt() -> list[int]:
+            # decoded as it arrives: no whole body, no dict tree, no slot outside the window
+            decoder = SlotsDecoder(
+                start_ts=start_time.timestamp(), end_ts=end_time.timestamp(), limit=limit
+            )
+            with observability.calcom_request("slots") as timings:
+                async with self._http_session.get(
+                    headers=self._build_headers(api_version="2024-09-04"),
+                    url=f"{self._base_url}slots/?{query}",
+                    trace_request_ctx=timings,
+                ) as resp:
+                    timings.response_started()
+                    resp.raise_for_status()
+                    async for chunk in resp.content.iter_chunked(SLOTS_READ_CHUNK_BYTES):
+                        decoder.feed(chunk)
+                        if decoder.done:
+                            break
+                    starts = decoder.close()
+                    timings.body_parsed()
+                    # the rest is read without being decoded: the connection goes back to the pool
+                    async for _ in resp.content.iter_chunked(SLOTS_READ_CHUNK_BYTES):
+                        pass
+            if decoder.invalid:
+                self._logger.error("Error parsing slot start times", count=decoder.invalid)
+            return starts
+
+        starts = await self._call("slots", _attempt, idempotent=True)
+        utc = datetime.timezone.utc
+        return [
+            AvailableSlot(
+                start_time=datetime.datetime.fromtimestamp(ts, utc), duration_min=EVENT_DURATION_MIN
+            )
+            for ts in starts
+        ]
+
+    async def _get_json(self, operation: str, path: str, *, api_version: str) -> dict:
+        """GET through the request executor: hedged and retried within the turn deadline"""
+
+        async def _attempt() -> dict:
+            with observability.calcom_request(operation) as timings:
+                async with self._http_session.get(
+                    headers=self._build_headers(api_version=api_version),
+                    url=f"{self._base_url}{path}",
+                    trace_request_ctx=timings,
+                ) as resp:
+                    timings.response_started()
+                    resp.raise_for_status()
+                    data = await resp.json()
+                    timings.body_parsed()
+                    return data
+
+        return await self._call(operation, _attempt, idempotent=True)
+
+    async def _call(
+        self, operation: str, attempt: Callable[[], Awaitable[T]], *, idempotent: bool
+    ) -> T:
+        """Run `attempt` through the request executor, behind the api key's circuit breaker and
+        rate limiter (every attempt, retries and hedges included, takes a token; the wait for it
+        is not timed as Cal.com latency)"""
+        if not self._breaker.allow():
+            observability.count("circuit_rejections", calendar=self._breaker.name, operation=operation)
+            raise CalendarUnavailableError(f"Cal.com circuit open, {operation} not attempted")
+
+        async def _admit(timeout: float) -> None:
+            await self._rate_limiter.acquire(operation, timeout=timeout)
+
+        async def _attempt() -> T:
+            try:
+                return await attempt()
+            except aiohttp.ClientResponseError as e:
+                if e.status == 429:
+                    self._rate_limiter.pause(retry_after_s((e.headers or {}).get("Retry-After")))
+                raise
+
         try:
-            start_time = start_time.astimezone(datetime.timezone.utc)
-            end_time = end_time.astimezone(datetime.timezone.utc)
-            query = urlencode(
-                {
-                    "eventTypeId": self._lk_event_id,
-                    "start": start_time.isoformat(),
-                    "end": end_time.isoformat(),
-                }
+            result = await self._requests.run(
+                operation, _attempt, idempotent=idempotent, admit=_admit
             )
-            async with self._http_session.get(
-                headers=self._build_headers(api_version="2024-09-04"), url=f"{BASE_URL}slots/?{query}"
-            ) as resp:
-                resp.raise_for_status()
-                response_json = await resp.json()
-                
-                if "data" not in response_json:
-                    self._logger.error(f"Unexpected API response format: {response_json}")
-                    return []
-                    
-                raw_data = response_json["data"]
-                
-                available_slots = []
-                for _, slots in raw_data.items():
-                    if not isinstance(slots, list):
-                        continue
-                        
-                    for slot in slots:
-                        if not isinstance(slot, dict) or "start" not in slot:
-                            continue
-                            
-                        try:
-                            start_dt = datetime.datetime.fromisoformat(slot["start"].replace("Z", "+00:00"))
-                            available_slots.append(
-                                AvailableSlot(start_time=start_dt, duration_min=EVENT_DURATION_MIN)
-                            )
-                        except (ValueError, AttributeError) as e:
-                            self._logger.error(f"Error parsing slot start time: {e}")
-                            continue
-                            
-                return available_slots
+        except RateLimitedError:
+            raise  # not sent: says nothing about the health of Cal.com
         except Exception as e:
-            self._logger.error(f"Error fetching available slots: {e}")
-            return []
+            # only an unhealthy Cal.com opens the circuit, not a rejected request (4xx)
+            if isinstance(e, CalendarTimeoutError) or is_retryable(e):
+                self._breaker.record_failure()
+            else:
+                self._breaker.record_success()
+            raise
+        self._breaker.record_success()
+        return result
+
+    def last_known_availability(
+        self, start_time: datetime.datetime, end_time: datetime.datetime
+    ) -> LastKnownAvailability | None:
+        """Most recent cached availability of the window, even expired (degraded mode)"""
+        if self.slot_cache is None or self._lk_event_id is None:
+            return None
+        if (known := self.slot_cache.last_known(self.availability_scope, start_time, end_time)) is None:
+            return None
+        slots, age_s = known
+        observability.count("degraded", calendar=self._breaker.name, kind="provisional_slots")
+        return LastKnownAvailability(slots=slots, age_s=age_s)
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def booking_queue(self) -> BookingQueue:
+        return self._booking_queue
+
+    @property
+    def availability_scope(self) -> tuple[str, str]:
+        return (self._api_key, str(self._lk_event_id))
+
+    def _invalidate_cached_slots(self, start_time: datetime.datetime) -> None:
+        if self.slot_cache is not None:
+            self.slot_cache.invalidate(self.availability_scope, at=start_time)
 
     def _build_headers(self, *, api_version: str | None = None) -> dict[str, str]:
         h = {"Authorization": f"Bearer {self._api_key}"}
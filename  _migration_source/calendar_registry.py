@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+
+from availability_snapshot import AvailabilitySnapshot, shared_availability_snapshot
+
+# an initialized calendar is reused for this long without any request to the backend
+CALENDAR_SETUP_TTL_S = 15 * 60
+# past this age, the setup is still served but re-resolved in the background
+CALENDAR_SETUP_REVALIDATE_AFTER_S = 5 * 60
+
+logger = logging.getLogger("calendar-registry")
+
+
+@dataclass(frozen=True)
+class CalendarSetup:
+    """What a calendar backend resolves during `initialize()`"""
+
+    username: str
+    event_type_id: str | int
+
+
+@dataclass
+class CalendarRegistryStats:
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    revalidation_failures: int = 0
+    # setups resolved by another process of the host (counted in `hits` too)
+    shared_hits: int = 0
+
+
+@dataclass
+class _Entry:
+    setup: CalendarSetup
+    resolved_at: float
+
+
+class CalendarRegistry:
+    """Per-process registry of resolved calendar setups, keyed by e.g. (api_key, event_id).
+
+    The first job for a key pays for the setup round trips, later jobs get the setup without
+    touching the network. Concurrent first calls share the same resolution. With a `snapshot`,
+    a setup resolved by another process of the host is used as well.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = CALENDAR_SETUP_TTL_S,
+        revalidate_after: float = CALENDAR_SETUP_REVALIDATE_AFTER_S,
+        clock: Callable[[], float] = time.monotonic,
+        snapshot: AvailabilitySnapshot | None = None,
+    ) -> None:
+        self._ttl = ttl
+        self._revalidate_after = revalidate_after
+        self._clock = clock
+        self._snapshot = snapshot
+        self._entries: dict[Hashable, _Entry] = {}
+        self._pending: dict[Hashable, asyncio.Future[CalendarSetup]] = {}
+        self._revalidating: set[Hashable] = set()
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.stats = CalendarRegistryStats()
+
+    def get(self, key: Hashable) -> CalendarSetup | None:
+        entry = self._entries.get(key)
+        if entry is None or self._clock() - entry.resolved_at >= self._ttl:
+            return None
+        return entry.setup
+
+    async def get_or_resolve(
+        self, key: Hashable, resolver: Callable[[], Awaitable[CalendarSetup]]
+    ) -> CalendarSetup:
+        entry = self._entries.get(key)
+        if (entry is None or self._clock() - entry.resolved_at >= self._ttl) and (
+            shared := self._from_snapshot(key)
+        ) is not None:
+            entry = shared
+            self.stats.shared_hits += 1
+        if entry is not None:
+            age = self._clock() - entry.resolved_at
+            if age < self._ttl:
+                self.stats.hits += 1
+                if age >= self._revalidate_after:
+                    self._revalidate(key, resolver)
+                return entry.setup
+
+        self.stats.misses += 1
+        if (pending := self._pending.get(key)) is None:
+            pending = asyncio.ensure_future(self._resolve(key, resolver))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        return await asyncio.shield(pending)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        if self._snapshot is not None:
+            self._snapshot.invalidate_setup(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def _resolve(
+        self, key: Hashable, resolver: Callable[[], Awaitable[CalendarSetup]]
+    ) -> CalendarSetup:
+        setup = await resolver()
+        self._entries[key] = _Entry(setup=setup, resolved_at=self._clock())
+        if self._snapshot is not None:
+            self._snapshot.put_setup(key, setup.username, setup.event_type_id)
+        return setup
+
+    def _from_snapshot(self, key: Hashable) -> _Entry | None:
+        if self._snapshot is None:
+            return None
+        if (shared := self._snapshot.get_setup(key, max_age=self._ttl)) is None:
+            return None
+        username, event_type_id, age = shared
+        entry = _Entry(
+            setup=CalendarSetup(username=username, event_type_id=event_type_id),
+            resolved_at=self._clock() - age,
+        )
+        self._entries[key] = entry
+        return entry
+
+    def _revalidate(
+        self, key: Hashable, resolver: Callable[[], Awaitable[CalendarSetup]]
+    ) -> None:
+        if key in self._revalidating or key in self._pending:
+            return
+
+        async def _run() -> None:
+            self.stats.revalidations += 1
+            try:
+                await self._resolve(key, resolver)
+            except Exception as e:
+                # keep serving the current setup, it expires with the TTL anyway
+                self.stats.revalidation_failures += 1
+                logger.warning(f"⚠️ Background calendar revalidation failed: {type(e).__name__}: {e}")
+            finally:
+                self._revalidating.discard(key)
+
+        self._revalidating.add(key)
+        task = asyncio.create_task(_run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+# shared by every job of the worker process
+shared_calendar_registry = CalendarRegistry(snapshot=shared_availability_snapshot)
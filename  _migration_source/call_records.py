@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import datetime
+import fcntl
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    from supabase import AsyncClient, acreate_client
+except ImportError:
+    AsyncClient = None  # type: ignore[assignment,misc]
+    acreate_client = None
+
+from state_dir import state_path
+
+logger = logging.getLogger("zora-agent.records")
+
+CALL_RECORDS_TABLE = "call_records"
+# records kept in memory per worker process; beyond this, new records are dropped (and counted)
+CALL_RECORDS_QUEUE_MAX = 10_000
+# a batch is written as soon as this many records are waiting, or after the interval
+CALL_RECORDS_BATCH_SIZE = 200
+CALL_RECORDS_FLUSH_INTERVAL_S = 2.0
+CALL_RECORDS_WRITE_TIMEOUT_S = 5.0
+# after a failed write, batches go straight to the spill file for this long
+CALL_RECORDS_RETRY_AFTER_S = 30.0
+# spill file name in the worker's state directory (it holds callers' transcripts: never in /tmp)
+CALL_RECORDS_SPILL_FILE = "call-records.jsonl"
+
+# record kinds
+TRANSCRIPT = "transcript"
+TOOL = "tool"
+BOOKING = "booking"
+USAGE = "usage"
+
+Writer = Callable[[list[dict[str, Any]]], Awaitable[None]]
+
+
+@dataclass
+class CallRecordStats:
+    emitted: int = 0
+    written: int = 0
+    batches: int = 0
+    spilled: int = 0
+    replayed: int = 0
+    dropped: int = 0
+    write_failures: int = 0
+
+
+class CallRecordSink:
+    """Per-call records (transcript, tool calls, bookings, usage) written to Supabase in batches.
+
+    `emit` only appends to a bounded in-memory queue: a background task writes batches when
+    `batch_size` records are waiting or every `flush_interval`. While Supabase is unreachable,
+    batches are appended to a local JSON-lines file, replayed after the next successful write.
+    Jobs call `flush` from a shutdown callback.
+    """
+
+    def __init__(
+        self,
+        *,
+        writer: Writer | None = None,
+        supabase_url: str | None = None,
+        supabase_key: str | None = None,
+        spill_path: str | None = None,
+        max_queued: int = CALL_RECORDS_QUEUE_MAX,
+        batch_size: int = CALL_RECORDS_BATCH_SIZE,
+        flush_interval: float = CALL_RECORDS_FLUSH_INTERVAL_S,
+        write_timeout: float = CALL_RECORDS_WRITE_TIMEOUT_S,
+        retry_after: float = CALL_RECORDS_RETRY_AFTER_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._writer = writer
+        self._supabase_url = supabase_url
+        self._supabase_key = supabase_key
+        self._spill_file = spill_path
+        self._max_queued = max_queued
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._write_timeout = write_timeout
+        self._retry_after = retry_after
+        self._clock = clock
+
+        self._client: AsyncClient | None = None
+        self._client_lock = asyncio.Lock()
+        self._queue: deque[dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._down_until = 0.0
+        self._disabled = False
+        self.stats = CallRecordStats()
+
+    @property
+    def _spill_path(self) -> str:
+        # resolved on first use: importing the module creates no directory
+        if self._spill_file is None:
+            self._spill_file = state_path(CALL_RECORDS_SPILL_FILE)
+        return self._spill_file
+
+    @property
+    def _replay_path(self) -> str:
+        return f"{self._spill_path}.replay"
+
+    @property
+    def _replay_lock_path(self) -> str:
+        return f"{self._spill_path}.lock"
+
+    def emit(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        *,
+        call_id: str,
+        assistant_id: str | None = None,
+    ) -> None:
+        """Queue one record (never blocks, never raises)"""
+        if self._disabled:
+            return
+        if len(self._queue) >= self._max_queued:
+            self.stats.dropped += 1
+            return
+
+        self._queue.append(
+            {
+                # written at least once: a batch replayed after a timed-out write is deduplicated
+                "id": str(uuid.uuid4()),
+                "call_id": call_id,
+                "assistant_id": assistant_id,
+                "kind": kind,
+                "payload": payload,
+                "occurred_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            }
+        )
+        self.stats.emitted += 1
+        if len(self._queue) >= self._batch_size:
+            self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def for_call(self, call_id: str, *, assistant_id: str | None = None) -> CallRecorder:
+        return CallRecorder(self, call_id=call_id, assistant_id=assistant_id)
+
+    async def flush(self, *, timeout: float = CALL_RECORDS_WRITE_TIMEOUT_S) -> None:
+        """Write every queued record; what is still queued after `timeout` is spilled to disk"""
+        try:
+            await asyncio.wait_for(self._flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ Enregistrements d'appel non envoyés à temps, écrits sur disque")
+            if self._task is not None and not self._task.done():
+                # a batch the background task is still writing goes back to the queue
+                self._task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self._task
+        if self._queue:
+            rows = list(self._queue)
+            self._queue.clear()
+            await self._spill(rows)
+
+    async def aclose(self) -> None:
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        while self._queue:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush()
+
+    async def _flush(self) -> None:
+        async with self._flush_lock:
+            while self._queue:
+                size = min(self._batch_size, len(self._queue))
+                batch = [self._queue.popleft() for _ in range(size)]
+                if self._clock() < self._down_until:
+                    await self._spill(batch)
+                    continue
+                try:
+                    written = await self._write(batch)
+                except asyncio.CancelledError:
+                    # flush() timed out: the batch is spilled with the rest of the queue
+                    self._queue.extendleft(reversed(batch))
+                    raise
+                if not written:
+                    await self._spill(batch)
+                    continue
+                if os.path.exists(self._spill_path) or os.path.exists(self._replay_path):
+                    await self._replay_spill()
+
+    async def _write(self, rows: list[dict[str, Any]]) -> bool:
+        try:
+            writer = self._writer or await self._supabase_writer()
+            if writer is None:
+                return True  # records disabled (no Supabase configured)
+            await asyncio.wait_for(writer(rows), self._write_timeout)
+        except Exception as e:
+            self.stats.write_failures += 1
+            self._down_until = self._clock() + self._retry_after
+            logger.warning(f"⚠️ Écriture des enregistrements d'appel impossible: {e!r}")
+            return False
+
+        self.stats.batches += 1
+        self.stats.written += len(rows)
+        return True
+
+    async def _spill(self, rows: list[dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(row, default=str) + "\n" for row in rows)
+
+        def _append() -> None:
+            # created readable by the service only: the records hold callers' contact details
+            fd = os.open(self._spill_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            with os.fdopen(fd, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+        try:
+            await asyncio.to_thread(_append)
+            self.stats.spilled += len(rows)
+        except OSError as e:
+            self.stats.dropped += len(rows)
+            logger.error(f"❌ {len(rows)} enregistrements d'appel perdus: {e}")
+
+    async def _replay_spill(self) -> None:
+        # the spill file is renamed first (records spilled meanwhile go to a new one) and removed
+        # once fully written: an interrupted replay resumes, duplicates are ignored by id
+        replay_path = self._replay_path
+
+        def _take() -> list[dict[str, Any]]:
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self._spill_path):
+                    return []  # replayed meanwhile by another sink
+                os.replace(self._spill_path, replay_path)
+            with open(replay_path, encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+
+        try:
+            lock_fd = await asyncio.to_thread(self._lock_replay)
+        except OSError as e:
+            logger.error(f"❌ Relecture du fichier {replay_path} impossible: {e}")
+            return
+        if lock_fd is None:
+            return  # another worker process is replaying the same file
+        try:
+            try:
+                rows = await asyncio.to_thread(_take)
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ Relecture du fichier {replay_path} impossible: {e}")
+                return
+            if rows:
+                logger.info(f"📤 {len(rows)} enregistrements d'appel relus depuis le disque")
+            for start in range(0, len(rows), self._batch_size):
+                batch = rows[start : start + self._batch_size]
+                if not await self._write(batch):
+                    return
+                self.stats.replayed += len(batch)
+            with contextlib.suppress(FileNotFoundError):
+                await asyncio.to_thread(os.remove, replay_path)
+        finally:
+            os.close(lock_fd)
+
+    def _lock_replay(self) -> int | None:
+        """Descriptor holding the replay lock, or None if another sink holds it.
+
+        The spill file is shared by the worker processes of a host: one replays it at a time.
+        """
+        fd = os.open(self._replay_lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    async def _supabase_writer(self) -> Writer | None:
+        client = await self._get_client()
+        if client is None:
+            return None
+
+        async def _insert(rows: list[dict[str, Any]]) -> None:
+            await (
+                client.table(CALL_RECORDS_TABLE)
+                .upsert(rows, on_conflict="id", ignore_duplicates=True, returning="minimal")
+                .execute()
+            )
+
+        return _insert
+
+    async def _get_client(self) -> AsyncClient | None:
+        if self._client is not None:
+            return self._client
+
+        async with self._client_lock:
+            if self._client is not None or self._disabled:
+                return self._client
+
+            # le worker écrit pour tous les assistants : clé service, jamais la clé anon
+            supabase_url = self._supabase_url or os.getenv("SUPABASE_URL")
+            supabase_key = self._supabase_key or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+            if acreate_client is None or not supabase_url or not supabase_key:
+                logger.warning("⚠️ Enregistrement des appels désactivé (Supabase non configuré)")
+                self._disabled = True
+                self._queue.clear()
+                return None
+
+            self._client = await acreate_client(supabase_url, supabase_key)
+            return self._client
+
+
+class CallRecorder:
+    """Records of one call, tagged with its call and assistant IDs"""
+
+    def __init__(self, sink: CallRecordSink, *, call_id: str, assistant_id: str | None) -> None:
+        self._sink = sink
+        self.call_id = call_id
+        self.assistant_id = assistant_id
+
+    def transcript(self, role: str, text: str) -> None:
+        self._emit(TRANSCRIPT, {"role": role, "text": text})
+
+    def tool(self, name: str, *, arguments: str, output: str, is_error: bool) -> None:
+        self._emit(
+            TOOL, {"name": name, "arguments": arguments, "output": output, "is_error": is_error}
+        )
+
+    def booking(self, start_time: datetime.datetime, outcome: str, **details: Any) -> None:
+        self._emit(BOOKING, {"start_time": start_time.isoformat(), "outcome": outcome, **details})
+
+    def usage(self, summary: dict[str, Any]) -> None:
+        self._emit(USAGE, summary)
+
+    def _emit(self, kind: str, payload: dict[str, Any]) -> None:
+        self._sink.emit(kind, payload, call_id=self.call_id, assistant_id=self.assistant_id)
+
+
+# une file (et un client Supabase) par processus worker, vidée par lots
+shared_call_records = CallRecordSink()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import observability
+
+if TYPE_CHECKING:
+    from calendar_api import AvailableSlot
+
+logger = logging.getLogger("cal.com.breaker")
+
+# consecutive failed calls (after retries) that open the circuit
+CIRCUIT_FAILURE_THRESHOLD = 5
+# time the circuit stays open before one probe call is let through
+CIRCUIT_RESET_TIMEOUT_S = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class LastKnownAvailability:
+    slots: list[AvailableSlot]
+    age_s: float
+
+
+class CalendarUnavailableError(Exception):
+    """The calendar's circuit breaker is open: the call was not attempted.
+
+    `last_known`, when set, returns the most recent availability known for a window (marked
+    provisional by the caller), or None.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        last_known: Callable[
+            [datetime.datetime, datetime.datetime], LastKnownAvailability | None
+        ]
+        | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.last_known = last_known
+
+
+@dataclass
+class CircuitBreakerStats:
+    failures: int = 0
+    opened: int = 0
+    rejected: int = 0
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures; after `reset_timeout` a
+    single probe call goes through (half-open): its success closes the circuit, its failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: float | None = None
+        self.stats = CircuitBreakerStats()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now (in half-open state, claims the probe)"""
+        if self._state == CLOSED:
+            return True
+
+        now = self._clock()
+        if self._state == OPEN and now - self._opened_at >= self._reset_timeout:
+            self._transition(HALF_OPEN)
+
+        # a probe abandoned without an outcome (caller hung up) is replaced after a while
+        if self._state == HALF_OPEN and (
+            self._probe_started_at is None or now - self._probe_started_at >= self._reset_timeout
+        ):
+            self._probe_started_at = now
+            return True
+
+        self.stats.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._probe_started_at = None
+        if self._state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self.stats.failures += 1
+        self._consecutive_failures += 1
+        self._probe_started_at = None
+        if self._state == HALF_OPEN or (
+            self._state == CLOSED and self._consecutive_failures >= self._failure_threshold
+        ):
+            self._opened_at = self._clock()
+            self.stats.opened += 1
+            self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        observability.record_circuit_state(self.name, state)
+        if state == OPEN:
+            logger.error(f"🔌 Circuit {self.name} open: calls rejected for {self._reset_timeout}s")
+        else:
+            logger.info(f"🔌 Circuit {self.name} {state}")
+
+
+def calendar_fingerprint(api_key: str) -> str:
+    """Non-secret label for an API key, for logs and metrics"""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:8]
+
+
+class CircuitBreakers:
+    """One `CircuitBreaker` per API key"""
+
+    def __init__(self, **breaker_options: float) -> None:
+        self._breaker_options = breaker_options
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, api_key: str) -> CircuitBreaker:
+        if (breaker := self._breakers.get(api_key)) is None:
+            breaker = CircuitBreaker(calendar_fingerprint(api_key), **self._breaker_options)
+            self._breakers[api_key] = breaker
+        return breaker
+
+    def clear(self) -> None:
+        self._breakers.clear()
+
+
+# shared by every session of the worker process: one outage is detected once
+shared_circuit_breakers = CircuitBreakers()
@@ -0,0 +1,222 @@
+"""Several calendars (event types, staff members) offered as one.
+
+    cal = CompositeCalendar({"Dr Martin": martin_calendar, "Dr Petit": petit_calendar})
+
+A lookup is sent to every calendar at once. Their answers are merged lazily in time order (k-way
+`heapq.merge`), one slot per start time: on a tie, the calendar listed first keeps it. Every
+slot carries the name of its calendar (`AvailableSlot.calendar`), the one
+`schedule_appointment` books on.
+
+A calendar still silent after `backend_timeout` is left out of the answer rather than holding it
+up; its request goes on in the background, so its slot cache is warm for the next lookup. Such an
+answer is a `PartialSlots`, only kept briefly by its callers. A lookup only fails when no calendar
+answered.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import heapq
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from dataclasses import dataclass, replace
+
+import structured_logging
+from calendar_api import AvailableSlot, Calendar, PartialSlots
+from circuit_breaker import CalendarUnavailableError, LastKnownAvailability
+from request_executor import CalendarTimeoutError, time_remaining
+
+# a calendar slower than this is left out of the merged answer (within the turn deadline)
+COMPOSITE_BACKEND_TIMEOUT_S = 1.5
+
+_logger = structured_logging.get_logger("calendar.composite")
+
+
+@dataclass
+class CompositeCalendarStats:
+    lookups: int = 0
+    # answered without every calendar
+    partial: int = 0
+    timeouts: int = 0
+    failures: int = 0
+    duplicates: int = 0
+
+
+class CompositeCalendar(Calendar):
+    """Availability of several calendars by name, merged; bookings go to the slot's owner"""
+
+    def __init__(
+        self,
+        calendars: Mapping[str, Calendar],
+        *,
+        backend_timeout: float = COMPOSITE_BACKEND_TIMEOUT_S,
+    ) -> None:
+        if not calendars:
+            raise ValueError("CompositeCalendar needs at least one calendar")
+        self._calendars = dict(calendars)
+        self._backend_timeout = backend_timeout
+        self._background: set[asyncio.Future[list[AvailableSlot]]] = set()
+        self.stats = CompositeCalendarStats()
+
+    @property
+    def calendars(self) -> Mapping[str, Calendar]:
+        return self._calendars
+
+    @property
+    def availability_scope(self) -> tuple[Hashable, ...]:
+        # sessions offering the same calendars share their lookups (see CoalescingCalendar)
+        return tuple(
+            (name, getattr(calendar, "availability_scope", None) or id(calendar))
+            for name, calendar in self._calendars.items()
+        )
+
+    async def initialize(self) -> None:
+        results = await asyncio.gather(
+            *(calendar.initialize() for calendar in self._calendars.values()),
+            return_exceptions=True,
+        )
+        errors = []
+        for name, result in zip(self._calendars, results):
+            if isinstance(result, BaseException):
+                _logger.error("❌ Calendar not initialized", calendar=name, error=str(result))
+                errors.append(result)
+        # the others are initialized again on their first use
+        if len(errors) == len(self._calendars):
+            raise errors[0]
+
+    async def schedule_appointment(
+        self,
+        *,
+        start_time: datetime.datetime,
+        attendee_email: str,
+        user_name: str,
+        calendar: str | None = None,
+    ) -> None:
+        if calendar is None and len(self._calendars) == 1:
+            calendar = next(iter(self._calendars))
+        if calendar not in self._calendars:
+            raise ValueError(f"No calendar {calendar!r} to book the slot of {start_time} on")
+        await self._calendars[calendar].schedule_appointment(
+            start_time=start_time, attendee_email=attendee_email, user_name=user_name
+        )
+
+    async def list_available_slots(
+        self,
+        *,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int | None = None,
+    ) -> list[AvailableSlot]:
+        self.stats.lookups += 1
+        lookups = {
+            name: asyncio.ensure_future(
+                calendar.list_available_slots(start_time=start_time, end_time=end_time, limit=limit)
+            )
+            for name, calendar in self._calendars.items()
+        }
+        timeout = self._backend_timeout
+        if (remaining := time_remaining()) is not None:
+            timeout = min(timeout, remaining)
+
+        try:
+            _, pending = await asyncio.wait(lookups.values(), timeout=timeout)
+        except asyncio.CancelledError:
+            for lookup in lookups.values():
+                lookup.cancel()
+            raise
+
+        answers: dict[str, list[AvailableSlot]] = {}
+        errors: dict[str, Exception] = {}
+        for name, lookup in lookups.items():
+            if lookup in pending:
+                self.stats.timeouts += 1
+                self._finish_in_background(lookup)
+                errors[name] = CalendarTimeoutError(f"calendar {name} did not answer in time")
+            elif (error := lookup.exception()) is not None:
+                self.stats.failures += 1
+                errors[name] = error
+            else:
+                answers[name] = lookup.result()
+
+        for name, error in errors.items():
+            _logger.warning(
+                "⚠️ Calendar left out of the availability",
+                calendar=name,
+                error_type=type(error).__name__,
+                error=str(error),
+            )
+        if not answers:
+            raise self._no_answer(errors)
+        if errors:
+            self.stats.partial += 1
+            return PartialSlots(self._merge(answers, limit), missing=errors)
+        return self._merge(answers, limit)
+
+    def _merge(
+        self, answers: Mapping[str, Iterable[AvailableSlot]], limit: int | None
+    ) -> list[AvailableSlot]:
+        """k-way merge of the calendars' slots, one per start time (the first calendar's)"""
+        merged: list[AvailableSlot] = []
+        last_start = None
+        for slot in heapq.merge(
+            *(_owned(name, slots) for name, slots in answers.items()), key=_start_time
+        ):
+            if slot.start_time == last_start:
+                self.stats.duplicates += 1
+                continue
+            last_start = slot.start_time
+            merged.append(slot)
+            if limit is not None and len(merged) >= limit:
+                break
+        return merged
+
+    def _no_answer(self, errors: Mapping[str, Exception]) -> Exception:
+        unavailable = {
+            name: error
+            for name, error in errors.items()
+            if isinstance(error, CalendarUnavailableError)
+        }
+        if not unavailable:
+            return next(iter(errors.values()))
+
+        def last_known(
+            start_time: datetime.datetime, end_time: datetime.datetime
+        ) -> LastKnownAvailability | None:
+            # what is known of each unavailable calendar, merged like a live answer
+            known = {
+                name: found
+                for name, error in unavailable.items()
+                if error.last_known is not None
+                and (found := error.last_known(start_time, end_time)) is not None
+            }
+            if not known:
+                return None
+            return LastKnownAvailability(
+                slots=self._merge({name: k.slots for name, k in known.items()}, None),
+                age_s=max(k.age_s for k in known.values()),
+            )
+
+        return CalendarUnavailableError(
+            f"No calendar answered: {'; '.join(map(str, errors.values()))}",
+            last_known=last_known,
+        )
+
+    def _finish_in_background(self, lookup: asyncio.Future[list[AvailableSlot]]) -> None:
+        self._background.add(lookup)
+
+        def _on_done(fut: asyncio.Future[list[AvailableSlot]]) -> None:
+            self._background.discard(fut)
+            if not fut.cancelled():
+                fut.exception()  # retrieved here: nobody awaits it anymore
+
+        lookup.add_done_callback(_on_done)
+
+
+def _owned(name: str, slots: Iterable[AvailableSlot]) -> Iterator[AvailableSlot]:
+    # built as the merge consumes them: slots past `limit` are never copied
+    for slot in sorted(slots, key=_start_time):
+        yield replace(slot, calendar=name)
+
+
+def _start_time(slot: AvailableSlot) -> datetime.datetime:
+    return slot.start_time
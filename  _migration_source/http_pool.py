@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import aiohttp
+
+import observability
+
+logger = logging.getLogger("cal.com.http")
+
+# connections to one host (Cal.com) shared by every session of the worker process
+HTTP_POOL_LIMIT = 100
+HTTP_POOL_LIMIT_PER_HOST = 20
+DNS_CACHE_TTL_S = 300
+# idle connections are kept this long: a job arriving shortly after the previous one reuses them
+KEEPALIVE_TIMEOUT_S = 60.0
+# sockets opened when a job starts, enough for `initialize` and the first slots lookups
+WARM_CONNECTIONS = 2
+WARMUP_TIMEOUT_S = 3.0
+
+
+@dataclass
+class HttpPoolStats:
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    queued: int = 0
+    queued_s: float = 0.0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+
+class HttpPool:
+    """Pooled `aiohttp.ClientSession` for the calendar backends of one worker process.
+
+    Bounded per host, with a DNS cache and long-lived keep-alive connections. `warm` opens
+    connections ahead of the first calendar call; every job holding the pool (`acquire`) releases
+    it from a shutdown callback, and the last one closes it.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = HTTP_POOL_LIMIT,
+        limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+        dns_cache_ttl: int = DNS_CACHE_TTL_S,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT_S,
+    ) -> None:
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._dns_cache_ttl = dns_cache_ttl
+        self._keepalive_timeout = keepalive_timeout
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._holders = 0
+        self.stats = HttpPoolStats()
+
+    def session(self) -> aiohttp.ClientSession:
+        """The pooled session, created on first use in the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # a session is bound to its event loop: one closed with its loop is not reused
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self._dns_cache_ttl,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[observability.http_trace_config(), self._trace_config()],
+            )
+            self._loop = loop
+        return self._session
+
+    def acquire(self) -> aiohttp.ClientSession:
+        """Hold the pool for one job, to be paired with `release` (a shutdown callback)"""
+        self._holders += 1
+        return self.session()
+
+    async def release(self) -> None:
+        self._holders = max(self._holders - 1, 0)
+        if self._holders == 0:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._session is not None and not self._session.closed:
+            stats = self.stats
+            logger.info(
+                f"🔌 HTTP pool closed: {stats.requests} requests, "
+                f"{stats.connections_created} connections opened, "
+                f"{stats.reuse_ratio:.0%} reused, peak {stats.peak_in_flight} in flight"
+            )
+            await self._session.close()
+        self._session = None
+
+    async def warm(self, url: str, *, connections: int = WARM_CONNECTIONS) -> None:
+        """Open `connections` keep-alive connections to the host of `url` (DNS, TCP and TLS)
+
+        Any HTTP answer leaves a reusable socket in the pool; failures are only logged, the
+        calendar calls will connect on their own.
+        """
+        session = self.session()
+        started_at = time.perf_counter()
+
+        async def _open() -> None:
+            async with session.head(
+                url, timeout=aiohttp.ClientTimeout(total=WARMUP_TIMEOUT_S)
+            ) as resp:
+                await resp.read()
+
+        results = await asyncio.gather(
+            *(_open() for _ in range(connections)), return_exceptions=True
+        )
+        if errors := [r for r in results if isinstance(r, BaseException)]:
+            logger.warning(f"⚠️ HTTP pool warmup of {url} failed: {errors[0]!r}")
+        else:
+            logger.info(
+                f"🔥 {connections} connections to {url} opened in "
+                f"{(time.perf_counter() - started_at) * 1000:.0f} ms"
+            )
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        stats = self.stats
+
+        async def _on_request_start(session: Any, ctx: Any, params: Any) -> None:
+            stats.requests += 1
+            stats.in_flight += 1
+            stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+            observability.record_http_in_flight(stats.in_flight)
+
+        async def _on_request_done(session: Any, ctx: Any, params: Any) -> None:
+            stats.in_flight -= 1
+            observability.record_http_in_flight(stats.in_flight)
+
+        async def _on_connection_created(session: Any, ctx: Any, params: Any) -> None:
+            stats.connections_created += 1
+            observability.count("http_connections", kind="created")
+
+        async def _on_connection_reused(session: Any, ctx: Any, params: Any) -> None:
+            stats.connections_reused += 1
+            observability.count("http_connections", kind="reused")
+
+        async def _on_queued_start(session: Any, ctx: Any, params: Any) -> None:
+            ctx.queued_at = time.perf_counter()
+
+        async def _on_queued_end(session: Any, ctx: Any, params: Any) -> None:
+            # every connection of the host was busy: the request waited for one
+            waited = time.perf_counter() - ctx.queued_at
+            stats.queued += 1
+            stats.queued_s += waited
+            observability.record("http_pool_wait", waited * 1000)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(_on_request_start)
+        trace_config.on_request_end.append(_on_request_done)
+        trace_config.on_request_exception.append(_on_request_done)
+        trace_config.on_connection_create_end.append(_on_connection_created)
+        trace_config.on_connection_reuseconn.append(_on_connection_reused)
+        trace_config.on_connection_queued_start.append(_on_queued_start)
+        trace_config.on_connection_queued_end.append(_on_queued_end)
+        return trace_config
+
+
+# one pool per worker process, shared by the calendars of every job it runs
+shared_http_pool = HttpPool()
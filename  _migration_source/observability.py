@@ -0,0 +1,429 @@
+"""Per-turn latency instrumentation: OpenTelemetry spans and latency histograms.
+
+A turn is split into STT endpointing, LLM time-to-first-token, tool execution (with the DNS /
+connect / TTFB / body-parse phases of every Cal.com request), TTS time-to-first-byte and the
+total user-silence gap. Everything is tagged with the assistant ID.
+
+Spans go through the LiveKit tracer provider (Langfuse, or a plain OTLP exporter, see
+`setup_telemetry`). Histograms are exported over OTLP when `OTEL_EXPORTER_OTLP_ENDPOINT` is set,
+and are always recorded with `prometheus_client`. Calls run in the job processes, not in the one
+serving `/metrics` (`WorkerOptions.prometheus_port`): their samples only reach it through
+Prometheus' multiprocess mode, i.e. with `WorkerOptions.prometheus_multiproc_dir` (or
+`PROMETHEUS_MULTIPROC_DIR`) set before the job processes start, as `zora_agent` does. Without it,
+`/metrics` shows the main process alone.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+import aiohttp
+import prometheus_client
+from opentelemetry import metrics as metrics_api
+
+from livekit.agents import AgentSession, MetricsCollectedEvent, ToolError, metrics
+from livekit.agents.telemetry import set_tracer_provider, tracer
+
+logger = logging.getLogger("zora-agent.telemetry")
+
+ASSISTANT_ID_ATTR = "zora.assistant_id"
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+# phase name -> (OpenTelemetry histogram, description, extra label names)
+_PHASES: dict[str, tuple[str, str, tuple[str, ...]]] = {
+    "stt_endpointing": ("zora.stt.endpointing", "End of speech to end of turn decision", ()),
+    "llm_ttft": ("zora.llm.ttft", "LLM time to first token", ()),
+    "tool": ("zora.tool.duration", "Function tool execution", ("tool", "outcome")),
+    "calcom_http": (
+        "zora.calcom.http.duration",
+        "Cal.com request phases (dns, connect, ttfb, body, total)",
+        ("operation", "phase"),
+    ),
+    "http_pool_wait": (
+        "zora.http.pool_wait",
+        "Wait for a free connection of the calendar HTTP pool",
+        (),
+    ),
+    "rate_limit_wait": (
+        "zora.calcom.rate_limit.wait",
+        "Wait for a Cal.com rate-limit token, until admission or rejection",
+        ("operation",),
+    ),
+    "tts_ttfb": ("zora.tts.ttfb", "TTS time to first byte", ()),
+    "silence_gap": ("zora.turn.silence_gap", "End of user speech to agent speech", ()),
+}
+
+# counter name -> (OpenTelemetry counter, description, label names)
+_COUNTERS: dict[str, tuple[str, str, tuple[str, ...]]] = {
+    "circuit_transitions": (
+        "zora.calcom.circuit.transitions",
+        "Cal.com circuit breaker state changes",
+        ("calendar", "state"),
+    ),
+    "circuit_rejections": (
+        "zora.calcom.circuit.rejections",
+        "Cal.com calls not attempted because the circuit was open",
+        ("calendar", "operation"),
+    ),
+    "degraded": (
+        "zora.calcom.degraded",
+        "Degraded-mode outcomes (provisional slots, queued bookings and their confirmation)",
+        ("calendar", "kind"),
+    ),
+    "rate_limited": (
+        "zora.calcom.rate_limited",
+        "Cal.com requests not sent: no rate-limit token within the allowed wait",
+        ("calendar", "operation"),
+    ),
+    "http_connections": (
+        "zora.http.connections",
+        "Connections of the calendar HTTP pool, newly opened or reused (keep-alive)",
+        ("kind",),
+    ),
+}
+
+_assistant_id: ContextVar[str | None] = ContextVar("zora_assistant_id", default=None)
+
+# served by the worker's prometheus endpoint (multiprocess mode covers the job processes)
+_prometheus_histograms = {
+    phase: prometheus_client.Histogram(
+        name.replace(".", "_") + "_seconds",
+        description,
+        ["assistant_id", *labels],
+        buckets=[b / 1000 for b in LATENCY_BUCKETS_MS],
+    )
+    for phase, (name, description, labels) in _PHASES.items()
+}
+_prometheus_counters = {
+    counter: prometheus_client.Counter(name.replace(".", "_"), description, list(labels))
+    for counter, (name, description, labels) in _COUNTERS.items()
+}
+_circuit_open = prometheus_client.Gauge(
+    "zora_calcom_circuit_open",
+    "1 while the Cal.com circuit breaker of a calendar is open or half-open",
+    ["calendar"],
+    multiprocess_mode="max",
+)
+_http_in_flight = prometheus_client.Gauge(
+    "zora_http_pool_requests_in_flight",
+    "Requests of the calendar HTTP pool waiting for their response",
+    multiprocess_mode="livesum",
+)
+_rate_limit_queue = prometheus_client.Gauge(
+    "zora_calcom_rate_limit_queue_depth",
+    "Cal.com requests waiting for a rate-limit token",
+    ["calendar"],
+    multiprocess_mode="livesum",
+)
+_otel_histograms: dict[str, metrics_api.Histogram] = {}
+_otel_counters: dict[str, metrics_api.Counter] = {}
+_meter_provider: Any = None
+_span_provider: Any = None
+
+
+def set_assistant_id(assistant_id: str | None) -> None:
+    """Tag everything recorded from the current context (and the tasks it creates)"""
+    _assistant_id.set(assistant_id)
+
+
+def setup_telemetry(
+    *,
+    tracer_provider: Any = None,
+    metric_readers: Sequence[Any] | None = None,
+) -> None:
+    """Install the histogram exporters once per process.
+
+    Histograms are exported over OTLP when an OTLP endpoint is configured (standard
+    `OTEL_EXPORTER_OTLP_*` variables), or to `metric_readers` when given. Without a
+    `tracer_provider` (Langfuse not configured), spans are exported over OTLP as well.
+    """
+    global _meter_provider, _span_provider
+
+    otlp_configured = bool(
+        os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or os.getenv("OTEL_EXPORTER_OTLP_METRICS_ENDPOINT")
+    )
+
+    try:
+        if tracer_provider is None and _span_provider is None and otlp_configured:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+            _span_provider = TracerProvider()
+            _span_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            set_tracer_provider(_span_provider)
+
+        if _meter_provider is not None:
+            return
+
+        readers = list(metric_readers or ())
+        if not readers and otlp_configured:
+            from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+            from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+
+            readers.append(PeriodicExportingMetricReader(OTLPMetricExporter()))
+        if not readers:
+            return
+
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
+
+        _meter_provider = MeterProvider(
+            metric_readers=readers,
+            views=[
+                View(
+                    instrument_name="zora.*",
+                    aggregation=ExplicitBucketHistogramAggregation(LATENCY_BUCKETS_MS),
+                )
+            ],
+        )
+        meter = _meter_provider.get_meter("zora-agent")
+        for phase, (name, description, _) in _PHASES.items():
+            _otel_histograms[phase] = meter.create_histogram(
+                name, unit="ms", description=description
+            )
+        for counter, (name, description, _) in _COUNTERS.items():
+            _otel_counters[counter] = meter.create_counter(name, description=description)
+        logger.info("✅ Export OTLP des métriques de latence configuré")
+    except ImportError:
+        logger.warning("⚠️ Export OTLP non disponible (packages manquants)")
+    except Exception as e:
+        logger.error(f"❌ Erreur configuration télémétrie: {e}")
+
+
+def record(
+    metric: str, duration_ms: float, *, assistant_id: str | None = None, **labels: str
+) -> None:
+    """Record one latency sample of `metric` (a `_PHASES` key) on every configured exporter"""
+    if duration_ms < 0:
+        return
+    assistant_id = assistant_id or _assistant_id.get() or "unknown"
+    _prometheus_histograms[metric].labels(assistant_id=assistant_id, **labels).observe(
+        duration_ms / 1000
+    )
+    if (histogram := _otel_histograms.get(metric)) is not None:
+        histogram.record(duration_ms, {ASSISTANT_ID_ATTR: assistant_id, **labels})
+
+
+def count(counter: str, **labels: str) -> None:
+    """Increment `counter` (a `_COUNTERS` key) on every configured exporter"""
+    _prometheus_counters[counter].labels(**labels).inc()
+    if (otel_counter := _otel_counters.get(counter)) is not None:
+        otel_counter.add(1, labels)
+
+
+def record_circuit_state(calendar: str, state: str) -> None:
+    _circuit_open.labels(calendar=calendar).set(0 if state == "closed" else 1)
+    count("circuit_transitions", calendar=calendar, state=state)
+
+
+def record_http_in_flight(requests: int) -> None:
+    _http_in_flight.set(requests)
+
+
+def record_rate_limit_queue(calendar: str, depth: int) -> None:
+    _rate_limit_queue.labels(calendar=calendar).set(depth)
+
+
+def _attributes(assistant_id: str | None = None, **extra: Any) -> dict[str, Any]:
+    return {ASSISTANT_ID_ATTR: assistant_id or _assistant_id.get() or "unknown", **extra}
+
+
+def _record_span(
+    name: str, start_ns: int, end_ns: int, *, assistant_id: str | None = None, **attributes: Any
+) -> None:
+    # span of a phase only known after the fact (from a metrics event or request timestamps)
+    span = tracer.start_span(
+        name, start_time=start_ns, attributes=_attributes(assistant_id, **attributes)
+    )
+    span.end(end_time=end_ns)
+
+
+# --- tools ---
+
+_Tool = TypeVar("_Tool", bound=Callable[..., Awaitable[Any]])
+
+
+@contextmanager
+def tool_span(tool: str) -> Iterator[None]:
+    outcome = "ok"
+    started_at = time.perf_counter()
+    with tracer.start_as_current_span(f"zora.tool.{tool}", attributes=_attributes(tool=tool)):
+        try:
+            yield
+        except ToolError:
+            outcome = "tool_error"
+            raise
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            record("tool", (time.perf_counter() - started_at) * 1000, tool=tool, outcome=outcome)
+
+
+def traced_tool(fn: _Tool) -> _Tool:
+    """Wraps a tool method in `tool_span` (to be placed under `@function_tool`)"""
+
+    @functools.wraps(fn)
+    async def _traced(*args: Any, **kwargs: Any) -> Any:
+        with tool_span(fn.__name__):
+            return await fn(*args, **kwargs)
+
+    return _traced  # type: ignore[return-value]
+
+
+# --- Cal.com requests ---
+
+
+class HttpTimings:
+    """Phase timestamps (`time.perf_counter()`) of one HTTP request.
+
+    TTFB and body parsing are marked by the caller; DNS and connect are only known when the
+    session carries `http_trace_config()`. Pass the instance as `trace_request_ctx`.
+    """
+
+    __slots__ = (
+        "started_at",
+        "dns_start",
+        "dns_end",
+        "connect_start",
+        "connect_end",
+        "headers_at",
+        "parsed_at",
+        "_epoch_ns",
+    )
+
+    def __init__(self) -> None:
+        self._epoch_ns = time.time_ns()
+        self.started_at = time.perf_counter()
+        self.dns_start: float | None = None
+        self.dns_end: float | None = None
+        self.connect_start: float | None = None
+        self.connect_end: float | None = None
+        self.headers_at: float | None = None
+        self.parsed_at: float | None = None
+
+    def response_started(self) -> None:
+        if self.headers_at is None:
+            self.headers_at = time.perf_counter()
+
+    def body_parsed(self) -> None:
+        self.parsed_at = time.perf_counter()
+
+    def phases(self) -> dict[str, tuple[float, float]]:
+        phases: dict[str, tuple[float, float]] = {}
+        if self.dns_start is not None and self.dns_end is not None:
+            phases["dns"] = (self.dns_start, self.dns_end)
+        if self.connect_start is not None and self.connect_end is not None:
+            phases["connect"] = (self.connect_start, self.connect_end)
+        if self.headers_at is not None:
+            phases["ttfb"] = (self.started_at, self.headers_at)
+            if self.parsed_at is not None:
+                phases["body"] = (self.headers_at, self.parsed_at)
+        return phases
+
+    def to_ns(self, mark: float) -> int:
+        return self._epoch_ns + int((mark - self.started_at) * 1e9)
+
+
+def http_trace_config() -> aiohttp.TraceConfig:
+    """aiohttp hooks filling the `HttpTimings` passed as `trace_request_ctx`"""
+
+    def _mark(attr: str) -> Callable[..., Awaitable[None]]:
+        async def _on_event(session: Any, trace_config_ctx: Any, params: Any) -> None:
+            timings = trace_config_ctx.trace_request_ctx
+            if isinstance(timings, HttpTimings):
+                setattr(timings, attr, time.perf_counter())
+
+        return _on_event
+
+    async def _on_request_end(session: Any, trace_config_ctx: Any, params: Any) -> None:
+        if isinstance(timings := trace_config_ctx.trace_request_ctx, HttpTimings):
+            timings.response_started()
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(_mark("dns_start"))
+    trace_config.on_dns_resolvehost_end.append(_mark("dns_end"))
+    trace_config.on_connection_create_start.append(_mark("connect_start"))
+    trace_config.on_connection_create_end.append(_mark("connect_end"))
+    trace_config.on_request_end.append(_on_request_end)
+    return trace_config
+
+
+@contextmanager
+def calcom_request(operation: str) -> Iterator[HttpTimings]:
+    """Span and phase histograms of one Cal.com request"""
+    timings = HttpTimings()
+    with tracer.start_as_current_span(
+        f"calcom.{operation}", attributes=_attributes(operation=operation)
+    ):
+        try:
+            yield timings
+        finally:
+            ended_at = time.perf_counter()
+            for phase, (start, end) in timings.phases().items():
+                record("calcom_http", (end - start) * 1000, operation=operation, phase=phase)
+                _record_span(
+                    f"calcom.{operation}.{phase}",
+                    timings.to_ns(start),
+                    timings.to_ns(end),
+                    operation=operation,
+                )
+            record(
+                "calcom_http",
+                (ended_at - timings.started_at) * 1000,
+                operation=operation,
+                phase="total",
+            )
+
+
+# --- session phases (STT, LLM, TTS, silence gap) ---
+
+
+def instrument_session(session: AgentSession, *, assistant_id: str | None) -> None:
+    """Record the STT / LLM / TTS phases and the user-silence gap of every turn of `session`"""
+    silence_started_at: float | None = None
+
+    @session.on("metrics_collected")
+    def _on_metrics(ev: MetricsCollectedEvent) -> None:
+        m = ev.metrics
+        if isinstance(m, metrics.EOUMetrics):
+            delay = m.end_of_utterance_delay
+            _record_phase("stt_endpointing", m.timestamp - delay, delay, assistant_id)
+        elif isinstance(m, metrics.LLMMetrics) and m.ttft >= 0:
+            _record_phase("llm_ttft", m.timestamp - m.duration, m.ttft, assistant_id)
+        elif isinstance(m, metrics.TTSMetrics) and m.ttfb >= 0:
+            _record_phase("tts_ttfb", m.timestamp - m.duration, m.ttfb, assistant_id)
+
+    @session.on("user_state_changed")
+    def _on_user_state(ev: Any) -> None:
+        nonlocal silence_started_at
+        if ev.new_state == "speaking":
+            silence_started_at = None
+        elif ev.old_state == "speaking" and ev.new_state == "listening":
+            silence_started_at = ev.created_at
+
+    @session.on("agent_state_changed")
+    def _on_agent_state(ev: Any) -> None:
+        nonlocal silence_started_at
+        if ev.new_state == "speaking" and silence_started_at is not None:
+            gap = ev.created_at - silence_started_at
+            _record_phase("silence_gap", silence_started_at, gap, assistant_id)
+            silence_started_at = None
+
+
+def _record_phase(
+    phase: str, started_at: float, duration_s: float, assistant_id: str | None
+) -> None:
+    record(phase, duration_s * 1000, assistant_id=assistant_id)
+    start_ns = int(started_at * 1e9)
+    _record_span(
+        _PHASES[phase][0], start_ns, start_ns + int(duration_s * 1e9), assistant_id=assistant_id
+    )
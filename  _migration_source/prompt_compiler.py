@@ -0,0 +1,130 @@
+"""Agent instructions compiled into a stable prefix and a small dynamic suffix.
+
+LLM providers cache the longest request prefix they have recently seen (OpenAI: from 1024 tokens,
+by increments of 128). With the date near the top of the instructions, the prompts of two days,
+or of two tenants sharing a template, differed from the first lines and never hit that cache.
+
+A template is compiled once per worker:
+
+- placeholders (`{today}`, tenant variables) found only in its last lines stay there: those lines
+  are the dynamic suffix;
+- placeholders found earlier are replaced in place by a reference (`[DATE DU JOUR]`) whose value
+  is given in the suffix.
+
+Everything before the suffix is identical for every call using the template.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+logger = logging.getLogger("zora-agent.prompt")
+
+TODAY = "today"
+# label of a variable referenced from the prefix (the variable name, in capitals, otherwise)
+VARIABLE_LABELS = {TODAY: "DATE DU JOUR"}
+# placeholders within this many characters of the end of a template stay in place
+DYNAMIC_TAIL_MAX_CHARS = 300
+# rough average of OpenAI tokenizers on French text
+CHARS_PER_TOKEN = 4
+PROMPT_CACHE_MIN_TOKENS = 1024
+INSTRUCTION_CACHE_MAX_ENTRIES = 256
+
+
+@dataclass(frozen=True)
+class CompiledInstructions:
+    prefix: str
+    # `{name}` placeholders of `variables`, filled by `render`
+    suffix: str
+    variables: tuple[str, ...]
+
+    @property
+    def prefix_tokens(self) -> int:
+        """Estimated length (tokens) of the prefix shared by every call using this template"""
+        return len(self.prefix) // CHARS_PER_TOKEN
+
+    def render(self, values: Mapping[str, str]) -> str:
+        suffix = self.suffix
+        for name in self.variables:
+            suffix = suffix.replace(f"{{{name}}}", values[name])
+        return self.prefix + suffix
+
+
+@dataclass
+class InstructionCompilerStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class InstructionCompiler:
+    """Compiled templates of the worker, by template text and variable names (LRU)"""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = INSTRUCTION_CACHE_MAX_ENTRIES,
+        tail_max_chars: int = DYNAMIC_TAIL_MAX_CHARS,
+    ) -> None:
+        self._max_entries = max_entries
+        self._tail_max_chars = tail_max_chars
+        self._compiled: OrderedDict[tuple[str, tuple[str, ...]], CompiledInstructions] = (
+            OrderedDict()
+        )
+        self.stats = InstructionCompilerStats()
+
+    def compile(
+        self, template: str, variables: Iterable[str] = (TODAY,)
+    ) -> CompiledInstructions:
+        key = (template, tuple(variables))
+        if (compiled := self._compiled.get(key)) is not None:
+            self._compiled.move_to_end(key)
+            self.stats.hits += 1
+            return compiled
+
+        self.stats.misses += 1
+        compiled = self._compile(template, key[1])
+        self._compiled[key] = compiled
+        while len(self._compiled) > self._max_entries:
+            self._compiled.popitem(last=False)
+
+        logger.info(
+            f"🧩 Instructions compiled: stable prefix of {len(compiled.prefix)} chars "
+            f"(~{compiled.prefix_tokens} tokens, provider cache from {PROMPT_CACHE_MIN_TOKENS} "
+            f"with the tools and conversation), dynamic suffix of {len(compiled.suffix)} chars"
+        )
+        return compiled
+
+    def clear(self) -> None:
+        self._compiled.clear()
+
+    def _compile(self, template: str, variables: tuple[str, ...]) -> CompiledInstructions:
+        if not variables:
+            return CompiledInstructions(prefix=template, suffix="", variables=())
+        placeholder = re.compile("|".join(re.escape(f"{{{name}}}") for name in variables))
+        matches = list(placeholder.finditer(template))
+        if not matches:
+            return CompiledInstructions(prefix=template, suffix="", variables=())
+
+        used = tuple(dict.fromkeys(m.group()[1:-1] for m in matches))
+        # the suffix starts with the first line holding a placeholder, if it is short enough
+        cut = template.rfind("\n", 0, matches[0].start()) + 1
+        if len(template) - cut <= self._tail_max_chars:
+            return CompiledInstructions(prefix=template[:cut], suffix=template[cut:], variables=used)
+
+        prefix = placeholder.sub(lambda m: f"[{_label(m.group()[1:-1])}]", template)
+        values = "\n".join(f"[{_label(name)}] : {{{name}}}" for name in used)
+        return CompiledInstructions(
+            prefix=prefix, suffix=f"\n\nVALEURS À UTILISER :\n{values}", variables=used
+        )
+
+
+def _label(name: str) -> str:
+    return VARIABLE_LABELS.get(name, name.upper())
+
+
+# per worker process: tenants sharing a template share its compiled form
+shared_instruction_compiler = InstructionCompiler()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+from collections.abc import Awaitable, Callable
+
+from calendar_api import AvailableSlot
+
+# windows longer than this are split into chunks
+CHUNK_THRESHOLD = datetime.timedelta(days=14)
+CHUNK_SIZE = datetime.timedelta(days=7)
+CHUNK_CONCURRENCY = 4
+
+FetchSlots = Callable[..., Awaitable[list[AvailableSlot]]]
+
+
+def plan_windows(
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    *,
+    chunk_size: datetime.timedelta = CHUNK_SIZE,
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Split [start_time, end_time) into consecutive sub-windows of at most `chunk_size`.
+
+    Boundaries after the first one are aligned on UTC midnight, so that lookups started at
+    different times (or by different sessions) produce the same chunks and share cache entries.
+    """
+    utc_start = start_time.astimezone(datetime.timezone.utc)
+    boundary = datetime.datetime.combine(
+        utc_start.date(), datetime.time(0), tzinfo=datetime.timezone.utc
+    ) + chunk_size
+
+    windows: list[tuple[datetime.datetime, datetime.datetime]] = []
+    current = start_time
+    while current < end_time:
+        upper = min(boundary, end_time)
+        windows.append((current, upper))
+        current = upper
+        boundary += chunk_size
+    return windows
+
+
+async def fetch_slots_chunked(
+    fetch: FetchSlots,
+    *,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    limit: int | None = None,
+    threshold: datetime.timedelta = CHUNK_THRESHOLD,
+    chunk_size: datetime.timedelta = CHUNK_SIZE,
+    concurrency: int = CHUNK_CONCURRENCY,
+) -> list[AvailableSlot]:
+    """Fetch [start_time, end_time) as concurrent chunks, merged in time order.
+
+    `fetch` is a `Calendar.list_available_slots`. With `limit`, returns as soon as the earliest
+    completed chunks hold `limit` slots; later chunks are not requested (or are abandoned).
+    """
+    slots, _ = await fetch_slots_prefix(
+        fetch,
+        start_time=start_time,
+        end_time=end_time,
+        limit=limit,
+        threshold=threshold,
+        chunk_size=chunk_size,
+        concurrency=concurrency,
+    )
+    return slots[:limit] if limit is not None else slots
+
+
+async def fetch_slots_prefix(
+    fetch: FetchSlots,
+    *,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    limit: int | None = None,
+    threshold: datetime.timedelta = CHUNK_THRESHOLD,
+    chunk_size: datetime.timedelta = CHUNK_SIZE,
+    concurrency: int = CHUNK_CONCURRENCY,
+) -> tuple[list[AvailableSlot], datetime.datetime]:
+    """Like `fetch_slots_chunked`, but returns every slot of the completed chunks along with
+    the end of the window they cover, i.e. [start_time, covered_until) is fully known.
+    """
+    windows = plan_windows(start_time, end_time, chunk_size=chunk_size)
+    if end_time - start_time <= threshold or len(windows) <= 1:
+        # a single request may stop after `limit` slots: the window is then known up to the last
+        slots = await fetch(start_time=start_time, end_time=end_time, limit=limit)
+        if limit is not None and slots and len(slots) == limit:
+            last = max(slot.start_time for slot in slots)
+            return slots, last + datetime.timedelta(microseconds=1)
+        return slots, end_time
+
+    results: list[list[AvailableSlot] | None] = [None] * len(windows)
+    running: dict[asyncio.Task[list[AvailableSlot]], int] = {}
+    next_index = 0
+    merged: list[AvailableSlot] = []
+    merged_upto = 0  # chunks [0, merged_upto) are already in `merged`
+
+    def _launch() -> None:
+        nonlocal next_index
+        while len(running) < concurrency and next_index < len(windows):
+            lo, hi = windows[next_index]
+            running[asyncio.create_task(fetch(start_time=lo, end_time=hi))] = next_index
+            next_index += 1
+
+    try:
+        _launch()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                results[running.pop(task)] = task.result()
+
+            # merge the contiguous prefix of completed chunks
+            while merged_upto < len(windows) and results[merged_upto] is not None:
+                merged.extend(sorted(results[merged_upto], key=lambda s: s.start_time))
+                merged_upto += 1
+
+            if limit is not None and len(merged) >= limit:
+                return merged, windows[merged_upto - 1][1]
+
+            _launch()
+    finally:
+        for task in running:
+            task.cancel()
+
+    return merged, end_time
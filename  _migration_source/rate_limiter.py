@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import heapq
+import itertools
+import logging
+import os
+import struct
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Protocol
+
+import observability
+from circuit_breaker import calendar_fingerprint
+
+logger = logging.getLogger("cal.com.ratelimit")
+
+# Cal.com API v2 allows 120 requests per minute per API key
+CALCOM_RATE_LIMIT_PER_MIN = 120
+RATE_LIMIT_BURST = 20
+# a request never waits longer than this for its turn (nor past the turn deadline)
+RATE_LIMIT_MAX_WAIT_S = 1.5
+# except a booking: the caller is waiting on it, it waits until the turn deadline (this long
+# outside of a turn), minus the time kept for Cal.com to answer it once sent
+RATE_LIMIT_BOOKING_MAX_WAIT_S = 10.0
+RATE_LIMIT_BOOKING_SEND_RESERVE_S = 2.0
+# pause applied after a 429 without a usable Retry-After header
+RATE_LIMIT_PAUSE_S = 2.0
+# directory of the buckets shared by the worker processes of a host (tmpfs preferably)
+RATE_LIMIT_DIR_ENV = "ZORA_RATE_LIMIT_DIR"
+
+# lower runs first: a caller waiting for a booking goes before availability lookups
+PRIORITY_BOOKING = 0
+PRIORITY_SETUP = 1
+PRIORITY_AVAILABILITY = 2
+OPERATION_PRIORITIES = {
+    "booking": PRIORITY_BOOKING,
+    "create_event_type": PRIORITY_SETUP,
+    "me": PRIORITY_SETUP,
+    "event_type": PRIORITY_SETUP,
+    "event_types": PRIORITY_SETUP,
+    "slots": PRIORITY_AVAILABILITY,
+}
+
+
+class RateLimitedError(Exception):
+    """The request was not sent: no rate-limit token within the allowed wait"""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class Bucket(Protocol):
+    def take(self) -> float:
+        """Take a token; returns 0, or the seconds until one is available (nothing taken)"""
+        ...
+
+    def pause(self, seconds: float) -> None:
+        """No token for `seconds` (the upstream answered 429)"""
+        ...
+
+
+class TokenBucket:
+    """Token bucket of one worker process"""
+
+    def __init__(
+        self,
+        *,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated_at = clock()
+
+    def take(self) -> float:
+        now = self._clock()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self._rate
+
+    def pause(self, seconds: float) -> None:
+        # negative balance: refilled to one token after `seconds`
+        self._tokens = min(self._tokens, 1 - seconds * self._rate)
+
+
+class FileTokenBucket:
+    """Token bucket shared by the processes of a host through a small locked file.
+
+    The state (tokens, wall-clock update time) is read and written under `flock`: a few
+    microseconds on a local file, done inline.
+    """
+
+    _STATE = struct.Struct("dd")
+
+    def __init__(self, path: str, *, rate: float, burst: int) -> None:
+        self._path = path
+        self._rate = rate
+        self._burst = burst
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def take(self) -> float:
+        return self._update(lambda tokens: (tokens - 1, 0.0) if tokens >= 1 else (tokens, -1.0))
+
+    def pause(self, seconds: float) -> None:
+        self._update(lambda tokens: (min(tokens, 1 - seconds * self._rate), 0.0))
+
+    def _update(self, change: Callable[[float], tuple[float, float]]) -> float:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            now = time.time()
+            raw = os.pread(self._fd, self._STATE.size, 0)
+            if len(raw) == self._STATE.size:
+                tokens, updated_at = self._STATE.unpack(raw)
+                tokens = min(self._burst, tokens + max(now - updated_at, 0.0) * self._rate)
+            else:
+                tokens = float(self._burst)
+            tokens, wait = change(tokens)
+            os.pwrite(self._fd, self._STATE.pack(tokens, now), 0)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return wait if wait >= 0 else (1 - tokens) / self._rate
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+@dataclass
+class RateLimiterStats:
+    admitted: int = 0
+    waited: int = 0
+    rejected: int = 0
+    paused: int = 0
+    max_queue_depth: int = 0
+
+
+class RateLimiter:
+    """Admission to one API key's bucket: immediate when a token is free, otherwise in priority
+    order (then arrival order), waiting at most `max_wait` (`booking_max_wait` for bookings) or
+    the turn deadline."""
+
+    def __init__(
+        self,
+        name: str,
+        bucket: Bucket,
+        *,
+        max_wait: float = RATE_LIMIT_MAX_WAIT_S,
+        booking_max_wait: float = RATE_LIMIT_BOOKING_MAX_WAIT_S,
+        booking_send_reserve: float = RATE_LIMIT_BOOKING_SEND_RESERVE_S,
+    ) -> None:
+        self.name = name
+        self._bucket = bucket
+        self._max_wait = max_wait
+        self._booking_max_wait = booking_max_wait
+        self._booking_send_reserve = booking_send_reserve
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._dispatcher: asyncio.Task[None] | None = None
+        self.stats = RateLimiterStats()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def acquire(self, operation: str, *, timeout: float | None = None) -> None:
+        """Wait for a token for `operation`; raises `RateLimitedError` after the bounded wait"""
+        priority = OPERATION_PRIORITIES.get(operation, PRIORITY_AVAILABILITY)
+        if not self._waiters and self._bucket.take() == 0:
+            self.stats.admitted += 1
+            return
+
+        if priority == PRIORITY_BOOKING:
+            # a booking still waiting at the deadline would be sent without time to be answered
+            wait = self._booking_max_wait
+            if timeout is not None:
+                wait = min(wait, max(timeout - self._booking_send_reserve, 0.0))
+        else:
+            wait = self._max_wait if timeout is None else min(self._max_wait, timeout)
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        self._record_depth()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        started_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), wait)
+        except asyncio.TimeoutError:
+            # not cancellable: the token was granted just as the wait ran out
+            if fut.cancel():
+                self.stats.rejected += 1
+                observability.count("rate_limited", calendar=self.name, operation=operation)
+                raise RateLimitedError(
+                    f"Cal.com {operation} not sent: rate limit of {self.name} reached"
+                ) from None
+        finally:
+            fut.cancel()  # caller cancelled: the dispatcher skips this place
+            self._record_depth()
+            observability.record(
+                "rate_limit_wait", (time.perf_counter() - started_at) * 1000, operation=operation
+            )
+
+        self.stats.admitted += 1
+        self.stats.waited += 1
+
+    def pause(self, seconds: float | None = None) -> None:
+        """The upstream answered 429: stop sending for `seconds` (Retry-After)"""
+        self.stats.paused += 1
+        self._bucket.pause(RATE_LIMIT_PAUSE_S if seconds is None else seconds)
+        logger.warning(f"🚦 Cal.com rate limit hit for {self.name}, pausing requests")
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            # abandoned waiters (timed out, caller gone) release their place
+            while self._waiters and self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+            if not self._waiters:
+                break
+            if (wait := self._bucket.take()) > 0:
+                await asyncio.sleep(wait)
+                continue
+            _, _, fut = heapq.heappop(self._waiters)
+            fut.set_result(None)
+
+    def _record_depth(self) -> None:
+        depth = self.queue_depth
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, depth)
+        observability.record_rate_limit_queue(self.name, depth)
+
+
+def retry_after_s(value: str | None) -> float | None:
+    """Seconds of a `Retry-After` header (delay form only)"""
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    return seconds if seconds >= 0 else None
+
+
+class RateLimiters:
+    """One `RateLimiter` per API key, backed by a file bucket when `ZORA_RATE_LIMIT_DIR` is set"""
+
+    def __init__(
+        self,
+        *,
+        rate_per_min: float = CALCOM_RATE_LIMIT_PER_MIN,
+        burst: int = RATE_LIMIT_BURST,
+        shared_dir: str | None = None,
+        **limiter_options: float,
+    ) -> None:
+        self._rate = rate_per_min / 60
+        self._burst = burst
+        self._shared_dir = shared_dir
+        self._limiter_options = limiter_options
+        self._limiters: dict[str, RateLimiter] = {}
+
+    def get(self, api_key: str) -> RateLimiter:
+        if (limiter := self._limiters.get(api_key)) is None:
+            name = calendar_fingerprint(api_key)
+            limiter = RateLimiter(name, self._bucket(name), **self._limiter_options)
+            self._limiters[api_key] = limiter
+        return limiter
+
+    def clear(self) -> None:
+        self._limiters.clear()
+
+    def _bucket(self, name: str) -> Bucket:
+        shared_dir = self._shared_dir or os.getenv(RATE_LIMIT_DIR_ENV)
+        if shared_dir:
+            try:
+                path = os.path.join(shared_dir, f"zora-calcom-{name}.bucket")
+                return FileTokenBucket(path, rate=self._rate, burst=self._burst)
+            except OSError as e:
+                logger.warning(f"⚠️ Shared rate limit bucket unavailable ({e}), using a local one")
+        return TokenBucket(rate=self._rate, burst=self._burst)
+
+
+# per worker process; the bucket itself is shared across processes with ZORA_RATE_LIMIT_DIR
+shared_rate_limiters = RateLimiters()
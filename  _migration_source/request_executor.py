@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TypeVar
+
+import aiohttp
+
+logger = logging.getLogger("cal.com.requests")
+
+# silence a caller tolerates in one turn, and the part of it kept for the LLM answer and TTS
+TURN_LATENCY_BUDGET_S = 3.0
+RESPONSE_RESERVE_S = 1.0
+# calls made outside of any turn (prefetch, setup) still never hang longer than this
+DEFAULT_REQUEST_TIMEOUT_S = 10.0
+
+# an idempotent request still running past this percentile of recent latencies is hedged
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY_S = 0.8
+LATENCY_WINDOW = 200
+
+MAX_RETRIES = 2
+RETRY_BASE_DELAY_S = 0.1
+RETRY_MAX_DELAY_S = 1.0
+
+T = TypeVar("T")
+# waits for the permission to send a request (a rate limit token), at most the given seconds
+Admission = Callable[[float], Awaitable[None]]
+
+_deadline: ContextVar[float | None] = ContextVar("calendar_deadline", default=None)
+
+
+class CalendarTimeoutError(Exception):
+    """The calendar did not answer within the deadline of the call.
+
+    Unlike an empty result, the availability (or the outcome of a booking) is unknown.
+    """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+@contextmanager
+def turn_deadline(
+    budget: float = TURN_LATENCY_BUDGET_S, *, reserve: float = RESPONSE_RESERVE_S
+) -> Iterator[float]:
+    """Calendar calls made in this block (and the tasks it creates) end before the deadline.
+
+    The deadline is `budget - reserve` seconds from now; an enclosing, earlier deadline wins.
+    """
+    deadline = time.monotonic() + max(budget - reserve, 0.0)
+    if (current := _deadline.get()) is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def time_remaining() -> float | None:
+    """Seconds left before the current deadline, None outside of `turn_deadline`"""
+    if (deadline := _deadline.get()) is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+
+
+@dataclass
+class RequestExecutorStats:
+    attempts: int = 0
+    retries: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    timeouts: int = 0
+
+
+class LatencyTracker:
+    """Recent successful latencies per operation"""
+
+    def __init__(self, *, window: int = LATENCY_WINDOW) -> None:
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def observe(self, operation: str, latency: float) -> None:
+        if (samples := self._samples.get(operation)) is None:
+            samples = self._samples[operation] = deque(maxlen=self._window)
+        samples.append(latency)
+
+    def percentile(self, operation: str, pct: float, *, min_samples: int = 1) -> float | None:
+        samples = self._samples.get(operation)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class RequestExecutor:
+    """Runs calendar HTTP calls within the deadline of the current turn.
+
+    Idempotent calls are hedged (a duplicate is sent once the first attempt is slower than the
+    recent `hedge_percentile` latency) and retried with jittered exponential backoff on
+    transient errors. Non-idempotent calls (bookings) are sent exactly once. Running out of
+    time raises `CalendarTimeoutError`. Time spent waiting for admission (rate limit) neither
+    triggers a hedge nor counts as latency.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_retries: int = MAX_RETRIES,
+        retry_base_delay: float = RETRY_BASE_DELAY_S,
+        retry_max_delay: float = RETRY_MAX_DELAY_S,
+        hedge_percentile: float = HEDGE_PERCENTILE,
+        hedge_min_samples: int = HEDGE_MIN_SAMPLES,
+        hedge_default_delay: float = HEDGE_DEFAULT_DELAY_S,
+        default_timeout: float = DEFAULT_REQUEST_TIMEOUT_S,
+    ) -> None:
+        self._max_retries = max_retries
+        self._retry_base_delay = retry_base_delay
+        self._retry_max_delay = retry_max_delay
+        self._hedge_percentile = hedge_percentile
+        self._hedge_min_samples = hedge_min_samples
+        self._hedge_default_delay = hedge_default_delay
+        self._default_timeout = default_timeout
+        self.latencies = LatencyTracker()
+        self.stats = RequestExecutorStats()
+
+    async def run(
+        self,
+        operation: str,
+        attempt: Callable[[], Awaitable[T]],
+        *,
+        idempotent: bool,
+        admit: Admission | None = None,
+    ) -> T:
+        """Run `attempt` (one HTTP call, safe to call again when `idempotent`) under the deadline.
+
+        `admit` is awaited before each attempt, hedges and retries included.
+        """
+        remaining = time_remaining()
+        deadline = time.monotonic() + (self._default_timeout if remaining is None else remaining)
+        retries = self._max_retries if idempotent else 0
+
+        for retry in range(retries + 1):
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                if idempotent:
+                    return await self._hedged(operation, attempt, remaining, admit)
+                return await asyncio.wait_for(
+                    self._admitted(operation, attempt, admit, deadline), remaining
+                )
+            except asyncio.TimeoutError:
+                self.stats.timeouts += 1
+                raise CalendarTimeoutError(
+                    f"Cal.com {operation} did not answer within the deadline"
+                ) from None
+            except Exception as e:
+                if retry == retries or not is_retryable(e):
+                    raise
+                # full jitter: concurrent sessions hitting the same failure don't retry in step
+                backoff = random.uniform(
+                    0, min(self._retry_max_delay, self._retry_base_delay * 2**retry)
+                )
+                if time.monotonic() + backoff >= deadline:
+                    raise
+                logger.warning(f"Cal.com {operation} failed ({e}), retrying in {backoff:.2f}s")
+                self.stats.retries += 1
+                await asyncio.sleep(backoff)
+
+        raise AssertionError("unreachable")
+
+    async def _hedged(
+        self,
+        operation: str,
+        attempt: Callable[[], Awaitable[T]],
+        timeout: float,
+        admit: Admission | None,
+    ) -> T:
+        hedge_after = self.latencies.percentile(
+            operation, self._hedge_percentile, min_samples=self._hedge_min_samples
+        )
+        if hedge_after is None:
+            hedge_after = self._hedge_default_delay
+
+        deadline = time.monotonic() + timeout
+        if admit is not None:
+            # queued behind the rate limit: not a slow answer, the hedge delay starts once sent
+            await admit(timeout)
+        primary = asyncio.ensure_future(self._timed(operation, attempt))
+        running = {primary}
+        try:
+            done, _ = await asyncio.wait(
+                running, timeout=min(hedge_after, max(deadline - time.monotonic(), 0.0))
+            )
+            if not done and time.monotonic() < deadline:
+                self.stats.hedges += 1
+                running.add(
+                    asyncio.ensure_future(self._admitted(operation, attempt, admit, deadline))
+                )
+
+            error: BaseException | None = None
+            while running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                done, running = await asyncio.wait(
+                    running, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.stats.hedge_wins += 1
+                        return task.result()
+                    # a hedge refused admission says nothing of the primary's failure
+                    if error is None or task is primary:
+                        error = task.exception()
+
+            assert error is not None
+            raise error
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def _admitted(
+        self,
+        operation: str,
+        attempt: Callable[[], Awaitable[T]],
+        admit: Admission | None,
+        deadline: float,
+    ) -> T:
+        if admit is not None:
+            await admit(max(deadline - time.monotonic(), 0.0))
+        return await self._timed(operation, attempt)
+
+    async def _timed(self, operation: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        self.stats.attempts += 1
+        started_at = time.monotonic()
+        result = await attempt()
+        self.latencies.observe(operation, time.monotonic() - started_at)
+        return result
+
+
+# latency percentiles are learned across every session of the worker process
+shared_request_executor = RequestExecutor()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import datetime
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from availability_snapshot import AvailabilitySnapshot, shared_availability_snapshot
+
+if TYPE_CHECKING:
+    from calendar_api import AvailableSlot
+
+
+SLOT_CACHE_TTL_S = 30.0
+# expired entries are kept this long as last-known availability for degraded mode
+SLOT_CACHE_STALE_TTL_S = 15 * 60.0
+SLOT_CACHE_MAX_ENTRIES = 512
+# requested windows are widened to this granularity so that calls made a few
+# seconds apart (start = "now") land on the same cache entry
+SLOT_CACHE_WINDOW_GRANULARITY_S = 300
+
+
+@dataclass
+class SlotCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    # hits served from the snapshot shared with the other processes (counted in `hits` too)
+    shared_hits: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class _Entry:
+    start_ts: int
+    end_ts: int
+    slots: list[AvailableSlot]
+    fetched_at: float
+    expires_at: float
+
+
+class SlotCache:
+    """In-process LRU cache of availability windows, keyed by (scope, window).
+
+    `scope` identifies one availability source, e.g. (api_key, event_type_id) for Cal.com.
+    With a `snapshot`, windows are also written to it, and a window missing here is looked up
+    there before being fetched: the worker processes of a host fetch it once.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = SLOT_CACHE_TTL_S,
+        stale_ttl: float = SLOT_CACHE_STALE_TTL_S,
+        max_entries: int = SLOT_CACHE_MAX_ENTRIES,
+        granularity: int = SLOT_CACHE_WINDOW_GRANULARITY_S,
+        clock: Callable[[], float] = time.monotonic,
+        snapshot: AvailabilitySnapshot | None = None,
+    ) -> None:
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._max_entries = max_entries
+        self._granularity = granularity
+        self._clock = clock
+        self._snapshot = snapshot
+        self._entries: OrderedDict[tuple[Hashable, int, int], _Entry] = OrderedDict()
+        self.stats = SlotCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def fetch_window(
+        self, start_time: datetime.datetime, end_time: datetime.datetime
+    ) -> tuple[datetime.datetime, datetime.datetime]:
+        """Window that should be requested upstream (and cached) to serve [start_time, end_time)"""
+        start_ts, end_ts = self._quantize(start_time, end_time)
+        utc = datetime.timezone.utc
+        return (
+            datetime.datetime.fromtimestamp(start_ts, utc),
+            datetime.datetime.fromtimestamp(end_ts, utc),
+        )
+
+    def get(
+        self, scope: Hashable, start_time: datetime.datetime, end_time: datetime.datetime
+    ) -> list[AvailableSlot] | None:
+        key = (scope, *self._quantize(start_time, end_time))
+        entry = self._entries.get(key)
+        now = self._clock()
+        if entry is None or entry.expires_at <= now:
+            if entry is not None and now - entry.fetched_at >= self._stale_ttl:
+                del self._entries[key]
+            if (entry := self._from_snapshot(key)) is None:
+                self.stats.misses += 1
+                return None
+            self.stats.shared_hits += 1
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return [slot for slot in entry.slots if start_time <= slot.start_time < end_time]
+
+    def put(
+        self,
+        scope: Hashable,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        slots: list[AvailableSlot],
+    ) -> None:
+        start_ts, end_ts = self._quantize(start_time, end_time)
+        self._store((scope, start_ts, end_ts), list(slots), fetched_at=self._clock())
+        if self._snapshot is not None:
+            self._snapshot.put_window(scope, start_ts, end_ts, slots)
+
+    def last_known(
+        self, scope: Hashable, start_time: datetime.datetime, end_time: datetime.datetime
+    ) -> tuple[list[AvailableSlot], float] | None:
+        """Slots of [start_time, end_time) from every entry of `scope`, expired ones included,
+        along with the age in seconds of the oldest entry used. None if nothing is known.
+        """
+        now = self._clock()
+        start_ts, end_ts = start_time.timestamp(), end_time.timestamp()
+        by_start: dict[datetime.datetime, AvailableSlot] = {}
+        oldest: float | None = None
+        for key, entry in self._entries.items():
+            if key[0] != scope or entry.end_ts <= start_ts or entry.start_ts >= end_ts:
+                continue
+            if now - entry.fetched_at >= self._stale_ttl:
+                continue
+            oldest = entry.fetched_at if oldest is None else min(oldest, entry.fetched_at)
+            for slot in entry.slots:
+                if start_time <= slot.start_time < end_time:
+                    by_start.setdefault(slot.start_time, slot)
+
+        if oldest is None and self._snapshot is not None:
+            # nothing in this process: what another process fetched, if recent enough
+            windows = self._snapshot.windows(scope, start_ts, end_ts, max_age=self._stale_ttl)
+            for window in windows:
+                fetched_at = now - window.age_s
+                oldest = fetched_at if oldest is None else min(oldest, fetched_at)
+                for slot in window.slots(start_time, end_time):
+                    by_start.setdefault(slot.start_time, slot)
+
+        if oldest is None:
+            return None
+        return sorted(by_start.values(), key=lambda s: s.start_time), now - oldest
+
+    def invalidate(self, scope: Hashable, at: datetime.datetime | None = None) -> int:
+        """Drop the entries of `scope` whose window contains `at` (all of them if `at` is None)"""
+        ts = at.timestamp() if at is not None else None
+        stale = [
+            key
+            for key, entry in self._entries.items()
+            if key[0] == scope and (ts is None or entry.start_ts <= ts < entry.end_ts)
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.stats.invalidations += len(stale)
+        if self._snapshot is not None:
+            self._snapshot.invalidate_windows(scope, ts)
+        return len(stale)
+
+    def clear(self) -> None:
+        """Forget the windows of this process (the shared snapshot is left as is)"""
+        self._entries.clear()
+
+    def _store(
+        self, key: tuple[Hashable, int, int], slots: list[AvailableSlot], *, fetched_at: float
+    ) -> _Entry:
+        entry = _Entry(
+            start_ts=key[1],
+            end_ts=key[2],
+            slots=slots,
+            fetched_at=fetched_at,
+            expires_at=fetched_at + self._ttl,
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        return entry
+
+    def _from_snapshot(self, key: tuple[Hashable, int, int]) -> _Entry | None:
+        """The window fetched (less than `ttl` ago) by another process, kept here as well"""
+        if self._snapshot is None:
+            return None
+        scope, start_ts, end_ts = key
+        window = self._snapshot.get_window(scope, start_ts, end_ts, max_age=self._ttl)
+        if window is None:
+            return None
+        return self._store(key, window.slots(), fetched_at=self._clock() - window.age_s)
+
+    def _quantize(
+        self, start_time: datetime.datetime, end_time: datetime.datetime
+    ) -> tuple[int, int]:
+        g = self._granularity
+        start_ts = int(start_time.timestamp()) // g * g
+        end_ts = -(-math.ceil(end_time.timestamp()) // g) * g
+        return start_ts, end_ts
+
+
+# shared by every calendar of the worker process
+shared_slot_cache = SlotCache(snapshot=shared_availability_snapshot)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import math
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+from calendar_api import AvailableSlot, Calendar, PartialSlots
+from request_executor import CalendarTimeoutError, time_remaining
+
+
+# same granularity as the slot cache: windows starting "now" a few seconds apart
+# are widened to the same upstream request
+COALESCE_WINDOW_GRANULARITY_S = 300
+
+
+@dataclass
+class CoalescerStats:
+    upstream_fetches: int = 0
+    joined: int = 0
+
+
+@dataclass
+class _Flight:
+    start_time: datetime.datetime
+    end_time: datetime.datetime
+    future: asyncio.Future[list[AvailableSlot]]
+    # the request stops after this many slots (from `start_time`)
+    limit: int | None = None
+
+    def covers(
+        self, start_time: datetime.datetime, end_time: datetime.datetime, limit: int | None
+    ) -> bool:
+        if self.limit is None:
+            return self.start_time <= start_time and end_time <= self.end_time
+        # the first `limit` slots from the same start hold the first ones of any shorter lookup
+        return (
+            limit is not None
+            and limit <= self.limit
+            and self.start_time == start_time
+            and end_time <= self.end_time
+        )
+
+
+class SlotLookupCoalescer:
+    """Single-flight for `Calendar.list_available_slots`.
+
+    Concurrent lookups with the same key whose window is covered by an in-flight request
+    wait for that request instead of sending their own. A lookup with a `limit` sends its own
+    (exact) window with the limit, unless a covering request is in flight.
+    """
+
+    def __init__(self, *, granularity: int = COALESCE_WINDOW_GRANULARITY_S) -> None:
+        self._granularity = granularity
+        self._flights: dict[Hashable, list[_Flight]] = {}
+        self.stats = CoalescerStats()
+
+    def in_flight(self, key: Hashable) -> int:
+        return len(self._flights.get(key, ()))
+
+    async def list_available_slots(
+        self,
+        key: Hashable,
+        calendar: Calendar,
+        *,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int | None = None,
+    ) -> list[AvailableSlot]:
+        flight = next(
+            (f for f in self._flights.get(key, ()) if f.covers(start_time, end_time, limit)),
+            None,
+        )
+        if flight is not None:
+            self.stats.joined += 1
+        else:
+            flight = self._start_flight(key, calendar, start_time, end_time, limit)
+
+        # shield: a caller hanging up (or running out of time) must not cancel the request the
+        # others are waiting on; a joined flight started by someone else has no deadline of ours
+        try:
+            slots = await asyncio.wait_for(asyncio.shield(flight.future), time_remaining())
+        except asyncio.TimeoutError:
+            raise CalendarTimeoutError("availability lookup did not complete in time") from None
+        window = [slot for slot in slots if start_time <= slot.start_time < end_time]
+        window = window[:limit] if limit is not None else window
+        if isinstance(slots, PartialSlots):
+            # every waiter learns that some calendars are missing from the shared answer
+            return PartialSlots(window, missing=slots.missing)
+        return window
+
+    def _start_flight(
+        self,
+        key: Hashable,
+        calendar: Calendar,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int | None,
+    ) -> _Flight:
+        if limit is None:
+            g = self._granularity
+            utc = datetime.timezone.utc
+            fetch_start = datetime.datetime.fromtimestamp(int(start_time.timestamp()) // g * g, utc)
+            fetch_end = datetime.datetime.fromtimestamp(
+                -(-math.ceil(end_time.timestamp()) // g) * g, utc
+            )
+        else:
+            # not widened: slots before `start_time` would count toward the limit
+            fetch_start, fetch_end = start_time, end_time
+
+        future = asyncio.ensure_future(
+            calendar.list_available_slots(start_time=fetch_start, end_time=fetch_end, limit=limit)
+        )
+        flight = _Flight(start_time=fetch_start, end_time=fetch_end, future=future, limit=limit)
+        self._flights.setdefault(key, []).append(flight)
+        self.stats.upstream_fetches += 1
+
+        def _on_done(fut: asyncio.Future[list[AvailableSlot]]) -> None:
+            flights = self._flights.get(key, [])
+            if flight in flights:
+                flights.remove(flight)
+            if not flights:
+                self._flights.pop(key, None)
+            if not fut.cancelled():
+                fut.exception()  # retrieved here in case every waiter went away
+
+        future.add_done_callback(_on_done)
+        return flight
+
+
+# shared by every session of the worker process
+shared_slot_coalescer = SlotLookupCoalescer()
+
+
+class CoalescingCalendar(Calendar):
+    """Wraps any `Calendar` so its availability lookups go through a `SlotLookupCoalescer`.
+
+    `key` must identify the upstream availability (e.g. api key + event type); it defaults to the
+    wrapped calendar's `availability_scope` when it has one, otherwise to the instance itself.
+    """
+
+    def __init__(
+        self,
+        calendar: Calendar,
+        *,
+        key: Hashable | None = None,
+        coalescer: SlotLookupCoalescer = shared_slot_coalescer,
+    ) -> None:
+        self._calendar = calendar
+        self._key = key
+        self._coalescer = coalescer
+
+    @property
+    def calendar(self) -> Calendar:
+        return self._calendar
+
+    @property
+    def availability_scope(self) -> Hashable:
+        return self._resolve_key()
+
+    async def initialize(self) -> None:
+        await self._calendar.initialize()
+
+    async def schedule_appointment(
+        self,
+        *,
+        start_time: datetime.datetime,
+        attendee_email: str,
+        user_name: str,
+        calendar: str | None = None,
+    ) -> None:
+        await self._calendar.schedule_appointment(
+            start_time=start_time,
+            attendee_email=attendee_email,
+            user_name=user_name,
+            calendar=calendar,
+        )
+
+    async def list_available_slots(
+        self,
+        *,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int | None = None,
+    ) -> list[AvailableSlot]:
+        return await self._coalescer.list_available_slots(
+            self._resolve_key(),
+            self._calendar,
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit,
+        )
+
+    def _resolve_key(self) -> Hashable:
+        if self._key is not None:
+            return self._key
+        # resolved lazily: Cal.com only knows its event type after initialize()
+        return getattr(self._calendar, "availability_scope", None) or id(self._calendar)
@@ -0,0 +1,313 @@
+"""Short-lived holds on slots, shared by the sessions of a worker.
+
+Two callers of the same practice used to be offered the same slots, and when both chose the
+same one, both bookings went to Cal.com: the second caller waited for the round trip, an
+apology, then a new listing. Holds are placed per upstream availability (`scope`, e.g. the api
+key and event type) and slot:
+
+- OFFERED: the slot is among the first ones of a listing given to a session's LLM (those the
+  caller hears about); other sessions don't list it while the hold lasts (`HOLD_OFFER_TTL_S`),
+  but may still book it from an older listing (first to choose wins);
+- CHOSEN: a booking is in flight; any other session choosing it gets a conflict at once,
+  without calling Cal.com;
+- BOOKED: booked (or known taken) upstream; hidden from every session until the availability
+  they may have fetched earlier is refreshed.
+
+Holds expire on their own, and the offered and chosen holds of a session are released when it
+ends (`SessionHolds.release_all`). LiveKit runs each call in its own process: the worker's holds
+are kept in a SQLite database every process reads and writes (`AvailabilitySnapshot`).
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+import uuid
+from collections.abc import Callable, Hashable, Iterable
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
+from typing import Protocol
+
+from availability_index import AVAILABILITY_MAX_AGE_S
+from availability_snapshot import AvailabilitySnapshot, shared_availability_snapshot
+from calendar_api import AvailableSlot
+from state_dir import state_path
+
+OFFERED = "offered"
+CHOSEN = "chosen"
+BOOKED = "booked"
+
+# about one exchange with the caller after a listing
+HOLD_OFFER_TTL_S = 45.0
+# longer than any booking (see zora_agent.BOOKING_LATENCY_BUDGET_S)
+HOLD_CHOICE_TTL_S = 30.0
+# until other sessions refetch what they knew of this slot
+HOLD_BOOKED_TTL_S = AVAILABILITY_MAX_AGE_S
+# slots held per listing (the earliest ones), and per session (its most recent listings, older
+# holds released first): holding every listed slot would soon hide a practice's whole week
+HOLD_OFFERED_PER_LISTING = 3
+HOLD_MAX_OFFERED_PER_SESSION = 6
+# database of the holds when no availability snapshot is configured
+SLOT_HOLDS_FILE = "slot-holds.db"
+
+_HoldKey = tuple[Hashable, str | None, int]
+
+
+class HoldStore(Protocol):
+    """Where the holds live: one process (`MemoryHoldStore`), or every process of the host
+    (`AvailabilitySnapshot`). A hold is (session, kind, expires_at) by (scope, calendar, start)."""
+
+    def transaction(self) -> AbstractContextManager[None]: ...
+    def purge_holds(self, now: float) -> int: ...
+    def get_hold(
+        self, scope: Hashable, calendar: str | None, start_ts: int
+    ) -> tuple[str, str] | None: ...
+    def put_hold(
+        self,
+        scope: Hashable,
+        calendar: str | None,
+        start_ts: int,
+        session: str,
+        kind: str,
+        expires_at: float,
+    ) -> None: ...
+    def delete_hold(self, scope: Hashable, calendar: str | None, start_ts: int) -> None: ...
+    # the session's holds of these kinds, but its `keep_newest` most recent ones
+    def delete_session_holds(
+        self, session: str, kinds: tuple[str, ...], *, keep_newest: int = 0
+    ) -> int: ...
+    def count_holds(self) -> int: ...
+    def clear_holds(self) -> None: ...
+
+
+@dataclass
+class SlotHoldStats:
+    offered: int = 0
+    hidden: int = 0
+    # a choice refused locally: another session is booking (or booked) the slot
+    conflicts: int = 0
+    # a slot offered to another session, booked first by this one
+    taken_over: int = 0
+    expired: int = 0
+
+
+@dataclass
+class _Hold:
+    session: str
+    kind: str
+    expires_at: float
+    seq: int
+
+
+class MemoryHoldStore:
+    """Holds of the sessions of this process only"""
+
+    def __init__(self) -> None:
+        self._holds: dict[_HoldKey, _Hold] = {}
+        # (expires_at, seq, key): stale entries are skipped when popped
+        self._expiries: list[tuple[float, int, _HoldKey]] = []
+        self._seq = itertools.count()
+
+    def transaction(self) -> AbstractContextManager[None]:
+        # nothing is awaited while holds are read and written
+        return nullcontext()
+
+    def purge_holds(self, now: float) -> int:
+        expired = 0
+        while self._expiries and self._expiries[0][0] <= now:
+            _, seq, key = heapq.heappop(self._expiries)
+            hold = self._holds.get(key)
+            # replaced or refreshed since: a later entry of the heap covers it
+            if hold is not None and hold.seq == seq:
+                del self._holds[key]
+                expired += 1
+        return expired
+
+    def get_hold(
+        self, scope: Hashable, calendar: str | None, start_ts: int
+    ) -> tuple[str, str] | None:
+        if (hold := self._holds.get((scope, calendar, start_ts))) is None:
+            return None
+        return hold.session, hold.kind
+
+    def put_hold(
+        self,
+        scope: Hashable,
+        calendar: str | None,
+        start_ts: int,
+        session: str,
+        kind: str,
+        expires_at: float,
+    ) -> None:
+        key, seq = (scope, calendar, start_ts), next(self._seq)
+        self._holds[key] = _Hold(session=session, kind=kind, expires_at=expires_at, seq=seq)
+        heapq.heappush(self._expiries, (expires_at, seq, key))
+
+    def delete_hold(self, scope: Hashable, calendar: str | None, start_ts: int) -> None:
+        self._holds.pop((scope, calendar, start_ts), None)
+
+    def delete_session_holds(
+        self, session: str, kinds: tuple[str, ...], *, keep_newest: int = 0
+    ) -> int:
+        keys = sorted(
+            (
+                (hold.seq, key)
+                for key, hold in self._holds.items()
+                if hold.session == session and hold.kind in kinds
+            ),
+        )
+        dropped = keys[: max(len(keys) - keep_newest, 0)]
+        for _, key in dropped:
+            del self._holds[key]
+        return len(dropped)
+
+    def count_holds(self) -> int:
+        return len(self._holds)
+
+    def clear_holds(self) -> None:
+        self._holds.clear()
+        self._expiries.clear()
+
+
+class SlotHoldManager:
+    """Holds of every session, by (scope, owning calendar, start time), kept in `store`"""
+
+    def __init__(
+        self,
+        *,
+        store: HoldStore | None = None,
+        offer_ttl: float = HOLD_OFFER_TTL_S,
+        choice_ttl: float = HOLD_CHOICE_TTL_S,
+        booked_ttl: float = HOLD_BOOKED_TTL_S,
+        offered_per_listing: int = HOLD_OFFERED_PER_LISTING,
+        max_offered_per_session: int = HOLD_MAX_OFFERED_PER_SESSION,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._store = store if store is not None else MemoryHoldStore()
+        self._ttls = {OFFERED: offer_ttl, CHOSEN: choice_ttl, BOOKED: booked_ttl}
+        self._per_listing = offered_per_listing
+        self._max_offered = max_offered_per_session
+        # wall clock: expiry times are compared by other processes
+        self._clock = clock
+        self.stats = SlotHoldStats()
+
+    def __len__(self) -> int:
+        with self._store.transaction():
+            self._expire()
+            return self._store.count_holds()
+
+    def session(self) -> SessionHolds:
+        return SessionHolds(self, uuid.uuid4().hex)
+
+    def offer(self, scope: Hashable, session: str, slots: Iterable[AvailableSlot]) -> None:
+        """Hold the first slots of a listing (in the order they were listed)"""
+        with self._store.transaction():
+            self._expire()
+            for slot in itertools.islice(slots, self._per_listing):
+                key = _key(scope, slot)
+                hold = self._store.get_hold(*key)
+                if hold is not None and hold != (session, OFFERED):
+                    continue  # someone else's hold, or already chosen by this session
+                self._set(key, session, OFFERED)
+                self.stats.offered += 1
+            # the session's oldest listings are released first
+            self._store.delete_session_holds(session, (OFFERED,), keep_newest=self._max_offered)
+
+    def visible(
+        self, scope: Hashable, session: str, slots: Iterable[AvailableSlot]
+    ) -> list[AvailableSlot]:
+        """`slots` minus those held by other sessions (and those booked)"""
+        with self._store.transaction():
+            self._expire()
+            if not self._store.count_holds():
+                return list(slots)
+            kept = []
+            for slot in slots:
+                hold = self._store.get_hold(*_key(scope, slot))
+                if hold is not None and (hold[0] != session or hold[1] == BOOKED):
+                    self.stats.hidden += 1
+                    continue
+                kept.append(slot)
+            return kept
+
+    def choose(self, scope: Hashable, session: str, slot: AvailableSlot) -> str | None:
+        """Hold `slot` for a booking by `session`; returns None, or the kind of the hold that
+        prevents it (CHOSEN: another booking in flight, BOOKED: already taken)"""
+        key = _key(scope, slot)
+        # read and written at once: two processes never both get the slot
+        with self._store.transaction():
+            self._expire()
+            if (hold := self._store.get_hold(*key)) is not None:
+                holder, kind = hold
+                if kind == BOOKED or (holder != session and kind == CHOSEN):
+                    self.stats.conflicts += 1
+                    return kind
+                if holder != session:
+                    self.stats.taken_over += 1
+            self._set(key, session, CHOSEN)
+        return None
+
+    def booked(self, scope: Hashable, session: str, slot: AvailableSlot) -> None:
+        """The slot is taken upstream (booked, queued, or reported unavailable)"""
+        with self._store.transaction():
+            self._set(_key(scope, slot), session, BOOKED)
+
+    def release(self, scope: Hashable, session: str, slot: AvailableSlot) -> None:
+        """Drop the session's offered or chosen hold on `slot` (a booking that failed)"""
+        key = _key(scope, slot)
+        with self._store.transaction():
+            if (hold := self._store.get_hold(*key)) is not None and hold[0] == session:
+                if hold[1] != BOOKED:
+                    self._store.delete_hold(*key)
+
+    def release_session(self, session: str) -> int:
+        """Drop the offered and chosen holds of a session that ended; BOOKED holds stay"""
+        with self._store.transaction():
+            return self._store.delete_session_holds(session, (OFFERED, CHOSEN))
+
+    def clear(self) -> None:
+        self._store.clear_holds()
+
+    def _set(self, key: _HoldKey, session: str, kind: str) -> None:
+        self._store.put_hold(*key, session, kind, self._clock() + self._ttls[kind])
+
+    def _expire(self) -> None:
+        self.stats.expired += self._store.purge_holds(self._clock())
+
+
+class SessionHolds:
+    """The holds of one session (call)"""
+
+    def __init__(self, manager: SlotHoldManager, session: str) -> None:
+        self._manager = manager
+        self.session = session
+
+    def offer(self, scope: Hashable, slots: Iterable[AvailableSlot]) -> None:
+        self._manager.offer(scope, self.session, slots)
+
+    def visible(self, scope: Hashable, slots: Iterable[AvailableSlot]) -> list[AvailableSlot]:
+        return self._manager.visible(scope, self.session, slots)
+
+    def choose(self, scope: Hashable, slot: AvailableSlot) -> str | None:
+        return self._manager.choose(scope, self.session, slot)
+
+    def booked(self, scope: Hashable, slot: AvailableSlot) -> None:
+        self._manager.booked(scope, self.session, slot)
+
+    def release(self, scope: Hashable, slot: AvailableSlot) -> None:
+        self._manager.release(scope, self.session, slot)
+
+    def release_all(self) -> int:
+        return self._manager.release_session(self.session)
+
+
+def _key(scope: Hashable, slot: AvailableSlot) -> _HoldKey:
+    return (scope, slot.calendar, int(slot.start_time.timestamp()))
+
+
+# shared by every session of the host: LiveKit runs each call in its own process, so the holds
+# live in the availability snapshot when there is one, in the worker's state directory otherwise
+shared_slot_holds = SlotHoldManager(
+    store=shared_availability_snapshot or AvailabilitySnapshot(state_path(SLOT_HOLDS_FILE))
+)
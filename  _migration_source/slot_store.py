@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import bisect
+import datetime
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from calendar_api import AvailableSlot
+
+# compact the arrays once this share of the entries are tombstones
+_COMPACT_RATIO = 0.5
+
+
+class SlotStore:
+    """Sorted availability kept as parallel arrays of epoch seconds and durations.
+
+    Window queries are O(log n) bisects, removal is an O(log n) tombstone, and `AvailableSlot`
+    objects are only built for the slots actually returned. The owning calendar of a slot, if
+    any, is kept as an index into the few distinct names seen.
+    """
+
+    def __init__(
+        self,
+        slots: Iterable[AvailableSlot] = (),
+        *,
+        tz: datetime.tzinfo = datetime.timezone.utc,
+    ) -> None:
+        # imported here: calendar_api itself builds its FakeCalendar on top of this store
+        from calendar_api import AvailableSlot
+
+        self._slot_cls = AvailableSlot
+        self.tz = tz
+        self._starts = array("q")
+        self._durations = array("H")
+        self._owners = array("H")
+        self._calendars: list[str | None] = [None]
+        self._calendar_index: dict[str | None, int] = {None: 0}
+        self._dead = bytearray()
+        self._dead_count = 0
+
+        for ts, duration, owner in sorted(self._rows(slots)):
+            self._starts.append(ts)
+            self._durations.append(duration)
+            self._owners.append(owner)
+        self._dead = bytearray(len(self._starts))
+
+    def __len__(self) -> int:
+        return len(self._starts) - self._dead_count
+
+    def __iter__(self) -> Iterator[AvailableSlot]:
+        for i in range(len(self._starts)):
+            if not self._dead[i]:
+                yield self._build(i)
+
+    def window(
+        self,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        *,
+        limit: int | None = None,
+    ) -> list[AvailableSlot]:
+        lo, hi = self._bounds(start_time, end_time)
+        slots: list[AvailableSlot] = []
+        for i in range(lo, hi):
+            if self._dead[i]:
+                continue
+            slots.append(self._build(i))
+            if limit is not None and len(slots) >= limit:
+                break
+        return slots
+
+    def count(self, start_time: datetime.datetime, end_time: datetime.datetime) -> int:
+        lo, hi = self._bounds(start_time, end_time)
+        if hi <= lo:
+            return 0
+        return (hi - lo) - (self._dead.count(1, lo, hi) if self._dead_count else 0)
+
+    def remove(self, start_time: datetime.datetime) -> bool:
+        """Tombstone the slot starting at `start_time`, returns False if there is none"""
+        ts = int(start_time.timestamp())
+        i = bisect.bisect_left(self._starts, ts)
+        removed = False
+        while i < len(self._starts) and self._starts[i] == ts:
+            if not self._dead[i]:
+                self._dead[i] = 1
+                self._dead_count += 1
+                removed = True
+            i += 1
+
+        if self._dead_count > len(self._starts) * _COMPACT_RATIO:
+            self.compact()
+        return removed
+
+    def replace(
+        self,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        slots: Iterable[AvailableSlot],
+    ) -> None:
+        """Replace the content of [start_time, end_time) with `slots` (outside ones are ignored)"""
+        lo, hi = self._bounds(start_time, end_time)
+        start_ts, end_ts = start_time.timestamp(), end_time.timestamp()
+        fresh = sorted(
+            self._rows(slot for slot in slots if start_ts <= slot.start_time.timestamp() < end_ts)
+        )
+
+        self._dead_count -= self._dead.count(1, lo, hi)
+        self._starts[lo:hi] = array("q", (ts for ts, _, _ in fresh))
+        self._durations[lo:hi] = array("H", (duration for _, duration, _ in fresh))
+        self._owners[lo:hi] = array("H", (owner for _, _, owner in fresh))
+        self._dead[lo:hi] = bytearray(len(fresh))
+
+    def compact(self) -> None:
+        if not self._dead_count:
+            return
+        live = [i for i, dead in enumerate(self._dead) if not dead]
+        self._starts = array("q", (self._starts[i] for i in live))
+        self._durations = array("H", (self._durations[i] for i in live))
+        self._owners = array("H", (self._owners[i] for i in live))
+        self._dead = bytearray(len(live))
+        self._dead_count = 0
+
+    def _bounds(
+        self, start_time: datetime.datetime, end_time: datetime.datetime
+    ) -> tuple[int, int]:
+        # slots start on whole seconds: [start, end) in float seconds maps to these int bounds
+        lo = bisect.bisect_left(self._starts, _ceil(start_time.timestamp()))
+        hi = bisect.bisect_left(self._starts, _ceil(end_time.timestamp()))
+        return lo, hi
+
+    def _rows(self, slots: Iterable[AvailableSlot]) -> Iterator[tuple[int, int, int]]:
+        for slot in slots:
+            if (owner := self._calendar_index.get(slot.calendar)) is None:
+                owner = self._calendar_index[slot.calendar] = len(self._calendars)
+                self._calendars.append(slot.calendar)
+            yield int(slot.start_time.timestamp()), slot.duration_min, owner
+
+    def _build(self, i: int) -> AvailableSlot:
+        return self._slot_cls(
+            start_time=datetime.datetime.fromtimestamp(self._starts[i], self.tz),
+            duration_min=self._durations[i],
+            calendar=self._calendars[self._owners[i]],
+        )
+
+
+def _ceil(ts: float) -> int:
+    return -int(-ts // 1)
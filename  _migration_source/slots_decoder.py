@@ -0,0 +1,273 @@
+"""Streaming decoder of Cal.com `slots/` responses.
+
+    decoder = SlotsDecoder(start_ts=start.timestamp(), end_ts=end.timestamp(), limit=20)
+    async for chunk in resp.content.iter_chunked(SLOTS_READ_CHUNK_BYTES):
+        decoder.feed(chunk)
+        if decoder.done:
+            break
+    starts = decoder.close()
+
+The body (`{"data": {"<day>": [{"start": "<timestamp>"}, ...], ...}, "status": ...}`) is decoded
+as it arrives: only the start times of the requested window are kept, as epoch seconds, and
+neither the whole body nor a dict-of-lists tree is ever held in memory. A day whose slots are flat
+objects (the usual case) is handed to `json.loads` as soon as it has fully arrived.
+"""
+
+from __future__ import annotations
+
+import codecs
+import datetime
+import json
+import re
+from array import array
+
+SLOTS_READ_CHUNK_BYTES = 16 * 1024
+
+_WS = r"[ \t\r\n]*"
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_PUNCT = re.compile(_WS + r"([{}\[\],])")
+_KEY = re.compile(_WS + "(" + _STRING + ")" + _WS + ":")
+# a lone quote is a string cut at the end of what was received
+_NESTING = re.compile(_STRING + r'|"|[{}\[\]]')
+_SCALAR = re.compile(_STRING + r'|[^ \t\r\n"{}\[\],:]+')
+_BLANK = re.compile(_WS)
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+# distinct days and times of day seen (bounded: cleared when full)
+_PARSE_CACHE_MAX = 4096
+
+# parser states
+_TOP_OPEN, _TOP_KEY, _TOP_NEXT, _DATA_OPEN, _DAY_KEY, _DAY_NEXT, _END = range(7)
+
+# "YYYY-MM-DD" -> epoch seconds of its UTC midnight, "THH:MM:SS[.fff]<zone>" -> seconds from it
+_day_epochs: dict[str, int] = {}
+_day_offsets: dict[str, int] = {}
+
+
+def parse_utc_timestamp(value: str) -> int:
+    """Epoch seconds of an ISO 8601 timestamp with an offset, e.g. `2026-10-19T08:00:00.000Z`.
+
+    Cal.com's fixed layout (`YYYY-MM-DDTHH:MM:SS`, optional fraction, `Z` or `±HH:MM`) is split
+    into its date and its time of day, each looked up in a small cache: a response has a few
+    dozen distinct days and times for thousands of slots. Anything else goes through
+    `datetime.fromisoformat`. Raises ValueError.
+    """
+    try:
+        return _day_epochs[value[:10]] + _day_offsets[value[10:]]
+    except KeyError:
+        pass
+
+    if len(value) >= 20 and value[10] == "T" and value[13] == ":" and value[16] == ":":
+        day, time_of_day = value[:10], value[10:]
+        if day not in _day_epochs:
+            ordinal = datetime.date.fromisoformat(day).toordinal()
+            _cache(_day_epochs, day, (ordinal - _EPOCH_ORDINAL) * 86400)
+        if time_of_day not in _day_offsets:
+            _cache(_day_offsets, time_of_day, _parse_time_of_day(time_of_day))
+        return _day_epochs[day] + _day_offsets[time_of_day]
+
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        raise ValueError(f"timestamp without offset: {value!r}")
+    return int(parsed.timestamp())
+
+
+def _parse_time_of_day(value: str) -> int:
+    # "THH:MM:SS", then an optional fraction, then "Z" or "±HH:MM"
+    seconds = int(value[1:3]) * 3600 + int(value[4:6]) * 60 + int(value[7:9])
+    zone = value[9:]
+    if zone[:1] == ".":
+        zone = zone[1:].lstrip("0123456789")  # slots start on whole seconds
+    if zone == "Z":
+        return seconds
+    if len(zone) == 6 and zone[0] in "+-" and zone[3] == ":":
+        offset = int(zone[1:3]) * 3600 + int(zone[4:6]) * 60
+        return seconds - offset if zone[0] == "+" else seconds + offset
+    raise ValueError(f"unsupported timestamp: {value!r}")
+
+
+def _cache(cache: dict[str, int], key: str, value: int) -> None:
+    if len(cache) >= _PARSE_CACHE_MAX:
+        cache.clear()
+    cache[key] = value
+
+
+class SlotsDecoder:
+    """Incremental decoder of one `slots/` response body.
+
+    Keeps the slot starts of [start_ts, end_ts). With `limit`, it is `done` as soon as `limit`
+    of them are known, and it is always `done` once a slot past the window is seen: Cal.com
+    returns days and slots in time order (a body seen out of order is read to the end).
+    """
+
+    def __init__(self, *, start_ts: float, end_ts: float, limit: int | None = None) -> None:
+        self._start_ts = start_ts
+        self._end_ts = end_ts
+        self._limit = limit
+        self._text = ""
+        self._pos = 0
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._state = _TOP_OPEN
+        self._has_data = False
+        self._starts = array("q")
+        self._last_ts = -(2**63)
+        self._ordered = True
+        self.done = False
+        self.seen = 0
+        self.invalid = 0
+
+    def feed(self, chunk: bytes) -> None:
+        if self.done:
+            return
+        self._text = self._text[self._pos :] + self._utf8.decode(chunk)
+        self._pos = 0
+        self._parse(eof=False)
+
+    def close(self) -> list[int]:
+        """Slot starts (epoch seconds, sorted) of the window; ValueError if the body is not a
+        complete `slots/` response"""
+        if not self.done:
+            self._text = self._text[self._pos :] + self._utf8.decode(b"", final=True)
+            self._pos = 0
+            self._parse(eof=True)
+            if self._state != _END:
+                raise ValueError("Unexpected API response format: truncated slots response")
+            if not self._has_data:
+                raise ValueError("Unexpected API response format: no data object")
+
+        starts = list(self._starts)
+        if not self._ordered:
+            starts.sort()
+        return starts[: self._limit] if self._limit is not None else starts
+
+    def _parse(self, *, eof: bool) -> None:
+        text = self._text
+        while not self.done and self._state != _END:
+            pos = self._pos
+            state = self._state
+
+            if state in (_TOP_OPEN, _DATA_OPEN):
+                if (m := _PUNCT.match(text, pos)) is None:
+                    return self._need_more(eof)
+                if m.group(1) != "{":
+                    raise ValueError("Unexpected API response format: not a slots response")
+                self._pos = m.end()
+                self._state = _TOP_KEY if state == _TOP_OPEN else _DAY_KEY
+
+            elif state in (_TOP_KEY, _DAY_KEY):
+                if (m := _PUNCT.match(text, pos)) is not None and m.group(1) == "}":
+                    self._pos = m.end()
+                    self._state = _TOP_NEXT if state == _DAY_KEY else _END
+                    continue
+                if (m := _KEY.match(text, pos)) is None:
+                    return self._need_more(eof)
+                if state == _TOP_KEY and m.group(1) == '"data"':
+                    self._has_data = True
+                    self._pos = m.end()
+                    self._state = _DATA_OPEN
+                    continue
+                if state == _DAY_KEY:
+                    end = self._day(m.end(), eof)
+                else:
+                    end = _value_end(text, m.end(), eof)  # "status" and the like
+                if end is None:
+                    return self._need_more(eof)
+                self._pos = end
+                self._state = _TOP_NEXT if state == _TOP_KEY else _DAY_NEXT
+
+            else:  # _TOP_NEXT, _DAY_NEXT
+                if (m := _PUNCT.match(text, pos)) is None or m.group(1) not in ",}":
+                    return self._need_more(eof)
+                self._pos = m.end()
+                if m.group(1) == ",":
+                    self._state = _TOP_KEY if state == _TOP_NEXT else _DAY_KEY
+                else:
+                    self._state = _END if state == _TOP_NEXT else _TOP_NEXT
+
+    def _day(self, pos: int, eof: bool) -> int | None:
+        """Decode the slots of one day starting at `pos`; returns the end of the day's value"""
+        text = self._text
+        slots = None
+        # a day of flat slot objects ends at the first "]": decoded as soon as it has arrived
+        # (with a nested array or a "]" in a string, that span is not valid JSON)
+        if (close := text.find("]", pos)) != -1:
+            try:
+                slots = json.loads(text[pos : close + 1])
+                end = close + 1
+            except ValueError:
+                pass
+        if slots is None:
+            if close == -1 and not eof:
+                return None  # not all here yet
+            if (end := _value_end(text, pos, eof)) is None:
+                return None
+            slots = json.loads(text[pos:end])
+
+        if isinstance(slots, list):
+            try:
+                starts = [slot["start"] for slot in slots]
+            except (KeyError, TypeError):
+                starts = [slot.get("start") for slot in slots if isinstance(slot, dict)]
+            self._add([start for start in starts if isinstance(start, str)])
+        return end
+
+    def _add(self, values: list[str]) -> None:
+        """Keep the in-window starts of one day"""
+        if self.done or not values:
+            return
+        try:
+            # the whole day at once when its date and times of day are already known
+            day = [_day_epochs[v[:10]] + _day_offsets[v[10:]] for v in values]
+        except KeyError:
+            day = []
+            for value in values:
+                try:
+                    day.append(parse_utc_timestamp(value))
+                except ValueError:
+                    self.invalid += 1
+            if not day:
+                return
+
+        self.seen += len(day)
+        if day[0] < self._last_ts or (len(day) > 1 and day != sorted(day)):
+            self._ordered = False
+        self._last_ts = max(self._last_ts, *day) if not self._ordered else day[-1]
+        if not (self._start_ts <= day[0] and day[-1] < self._end_ts):
+            day = [ts for ts in day if self._start_ts <= ts < self._end_ts]
+        self._starts.extend(day)
+
+        if not self._ordered:
+            return
+        # in order: nothing after a slot past the window (or past `limit`) is needed
+        if self._last_ts >= self._end_ts:
+            self.done = True
+        if self._limit is not None and len(self._starts) >= self._limit:
+            del self._starts[self._limit :]
+            self.done = True
+
+    def _need_more(self, eof: bool) -> None:
+        if eof:
+            raise ValueError("Unexpected API response format: malformed slots response")
+
+
+def _value_end(text: str, pos: int, eof: bool) -> int | None:
+    """End of the JSON value starting at `pos` (after whitespace), None if not complete yet"""
+    pos = _BLANK.match(text, pos).end()
+    if text[pos : pos + 1] not in ("{", "["):
+        if (m := _SCALAR.match(text, pos)) is not None and (m.end() < len(text) or eof):
+            return m.end()  # (a number at the end of what was received may still go on)
+    else:
+        depth = 0
+        for token in _NESTING.finditer(text, pos):
+            kind = token.group()
+            if kind == '"':
+                break
+            if kind in ("{", "["):
+                depth += 1
+            elif kind in ("}", "]"):
+                depth -= 1
+                if depth == 0:
+                    return token.end()
+    if eof:
+        raise ValueError("Unexpected API response format: malformed slots response")
+    return None
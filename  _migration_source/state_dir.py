@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import os
+
+# directory of the files the worker keeps across jobs (queued bookings, spilled call records)
+STATE_DIR_ENV = "ZORA_STATE_DIR"
+STATE_DIR_NAME = "zora24"
+
+
+def state_path(name: str) -> str:
+    """Path of `name` in the worker's state directory, created (mode 0700) if needed.
+
+    These files hold callers' names and contact details: they live in a directory owned by the
+    service (`ZORA_STATE_DIR`, `$XDG_STATE_HOME/zora24` or `~/.local/state/zora24` by default),
+    never in the shared temporary directory.
+    """
+    directory = os.getenv(STATE_DIR_ENV) or os.path.join(
+        os.getenv("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state"),
+        STATE_DIR_NAME,
+    )
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return os.path.join(directory, name)
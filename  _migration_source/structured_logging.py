@@ -0,0 +1,122 @@
+"""Structured logging for the calendar and tool hot paths, formatted off the event loop.
+
+    logger = structured_logging.get_logger("cal.com")
+    logger.info("📡 booking response", status=resp.status, body=response_text)
+
+A call on the event loop only checks the level and queues the record: rendering the fields
+(long values are truncated above DEBUG) and writing to the handlers happen on the listener thread
+installed by `configure_logging`. Records stay plain `logging` records, so every handler
+(LiveKit's included) renders them.
+
+Per-module levels come from `ZORA_LOG_LEVELS`, e.g. `cal.com=WARNING,zora-agent.chat=DEBUG`.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+import structlog
+
+LOG_LEVELS_ENV = "ZORA_LOG_LEVELS"
+# longest field value rendered above DEBUG (response bodies, payloads, transcripts)
+FIELD_PREVIEW_CHARS = 200
+
+_listener: QueueListener | None = None
+
+
+class _LazyEvent:
+    """Message of a record, rendered when (and only if) a handler formats it"""
+
+    __slots__ = ("_event_dict", "_truncate")
+
+    def __init__(self, event_dict: dict[str, Any], truncate: bool) -> None:
+        self._event_dict = event_dict
+        self._truncate = truncate
+
+    def __str__(self) -> str:
+        event_dict = self._event_dict
+        parts = [str(event_dict.get("event", ""))]
+        for key, value in event_dict.items():
+            if key == "event":
+                continue
+            rendered = value if isinstance(value, str) else repr(value)
+            if self._truncate and len(rendered) > FIELD_PREVIEW_CHARS:
+                rendered = f"{rendered[:FIELD_PREVIEW_CHARS]}… ({len(rendered)} chars)"
+            parts.append(f"{key}={rendered}")
+        return " ".join(parts)
+
+
+def _to_lazy_record(
+    logger: logging.Logger, method_name: str, event_dict: dict[str, Any]
+) -> tuple[tuple[Any, ...], dict[str, Any]]:
+    kwargs: dict[str, Any] = {"stacklevel": 2}  # file and line of the caller, not structlog's
+    if "exc_info" in event_dict:
+        kwargs["exc_info"] = event_dict.pop("exc_info")
+    return (_LazyEvent(event_dict, truncate=method_name != "debug"),), kwargs
+
+
+def get_logger(name: str) -> structlog.BoundLogger:
+    """structlog logger writing to the `logging` logger `name` (levels and handlers apply)"""
+    return structlog.wrap_logger(
+        logging.getLogger(name),
+        processors=[structlog.stdlib.filter_by_level, _to_lazy_record],
+        wrapper_class=structlog.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # the listener runs in this process: keep the record as is instead of formatting it here
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_levels(spec: str) -> dict[str, str]:
+    """`"cal.com=WARNING,zora-agent=DEBUG"` -> `{"cal.com": "WARNING", "zora-agent": "DEBUG"}`"""
+    levels: dict[str, str] = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(levels: dict[str, str] | None = None) -> None:
+    """Move the root handlers behind a queue drained by a background thread (once per process)
+    and apply the per-module levels of `ZORA_LOG_LEVELS` (or `levels`)."""
+    global _listener
+
+    if levels is None:
+        levels = parse_levels(os.getenv(LOG_LEVELS_ENV, ""))
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    if _listener is not None:
+        return
+
+    root = logging.getLogger()
+    handlers = [h for h in root.handlers if not isinstance(h, QueueHandler)]
+    if not handlers:
+        return
+
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(_DeferredQueueHandler(records))
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush the queued records and stop the listener thread"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,33 @@
+-- Migration: Enregistrements d'appel (transcription, outils, réservations, usage)
+-- Date: 2026-10-16
+-- Objectif: Historique durable des appels, écrit par lots par le worker (call_records.py)
+
+CREATE TABLE public.call_records (
+  -- généré par le worker : un lot réécrit après un délai dépassé est dédoublonné
+  id UUID NOT NULL PRIMARY KEY,
+  call_id TEXT NOT NULL,
+  -- texte et sans clé étrangère : un enregistrement n'est jamais refusé (l'ID vient de l'env du worker)
+  assistant_id TEXT,
+  kind TEXT NOT NULL CHECK (kind IN ('transcript', 'tool', 'booking', 'usage')),
+  payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+  occurred_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+
+CREATE INDEX call_records_call_id_idx ON public.call_records (call_id, occurred_at);
+CREATE INDEX call_records_assistant_id_idx ON public.call_records (assistant_id, occurred_at DESC);
+
+-- Écriture réservée au worker (clé service, qui ignore RLS)
+ALTER TABLE public.call_records ENABLE ROW LEVEL SECURITY;
+
+-- Un utilisateur ne lit que les appels de ses assistants
+CREATE POLICY "Users can view their call records"
+ON public.call_records
+FOR SELECT
+USING (
+  EXISTS (
+    SELECT 1 FROM public.assistants
+    WHERE assistants.id::text = call_records.assistant_id
+    AND auth.jwt_sub() = assistants.user_id::text
+  )
+);
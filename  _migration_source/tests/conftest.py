@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# the agent modules are imported by name, as the worker runs them from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# files the worker keeps across jobs (queued bookings, spilled records) stay out of the home dir
+os.environ["ZORA_STATE_DIR"] = tempfile.mkdtemp(prefix="zora-tests-")
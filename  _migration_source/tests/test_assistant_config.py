@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from assistant_config import CALCOM_CONFIG_FUNCTION, AssistantConfigLoader, ConfigUnavailableError
+
+
+class EdgeFunction:
+    """Local stand-in for the `get-assistant-calcom-config` edge function"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.latency = 0.0
+        self.status = 200
+        self.event_id = "1001"
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        body = await request.json()
+        await asyncio.sleep(self.latency)
+        if self.status != 200:
+            return web.json_response({"error": "boom"}, status=self.status)
+        config = {"apiKey": f"key-{body['assistantId']}", "eventId": self.event_id}
+        return web.json_response({"calcomConfig": config})
+
+
+def _run(test, **loader_options):
+    """Runs `test(loader, function, clock)` against a stand-in on a local port"""
+    function = EdgeFunction()
+    now = [0.0]
+
+    async def main():
+        app = web.Application()
+        app.router.add_post(f"/functions/v1/{CALCOM_CONFIG_FUNCTION}", function.handle)
+        server = TestServer(app)
+        await server.start_server()
+        loader = AssistantConfigLoader(
+            supabase_url=str(server.make_url("")).rstrip("/"),
+            supabase_key="test-key",
+            clock=lambda: now[0],
+            **loader_options,
+        )
+        try:
+            await test(loader, function, now)
+        finally:
+            await loader.aclose()
+            await server.close()
+
+    asyncio.run(main())
+
+
+async def _settle(loader):
+    # let background refreshes finish
+    while loader._tasks or loader._pending:
+        await asyncio.sleep(0.01)
+
+
+def test_fresh_config_is_served_from_the_cache():
+    async def test(loader, function, now):
+        first = await loader.get_calcom_config("a-1")
+        now[0] = 59.0
+        again = await loader.get_calcom_config("a-1")
+        assert first == again == {"apiKey": "key-a-1", "eventId": "1001"}
+        assert function.calls == 1
+        assert loader.stats.misses == 1 and loader.stats.fresh_hits == 1
+
+    _run(test)
+
+
+def test_stale_config_is_served_then_revalidated():
+    async def test(loader, function, now):
+        await loader.get_calcom_config("a-1")
+        function.event_id = "2002"
+        now[0] = 61.0
+        # served at once, refreshed in the background
+        assert (await loader.get_calcom_config("a-1"))["eventId"] == "1001"
+        assert loader.stats.stale_hits == 1
+        await _settle(loader)
+        assert function.calls == 2
+        assert (await loader.get_calcom_config("a-1"))["eventId"] == "2002"
+        assert loader.stats.fresh_hits == 1
+
+    _run(test)
+
+
+def test_config_older_than_the_stale_ttl_is_fetched_again():
+    async def test(loader, function, now):
+        await loader.get_calcom_config("a-1")
+        function.event_id = "2002"
+        now[0] = 3600.0
+        assert (await loader.get_calcom_config("a-1"))["eventId"] == "2002"
+        assert loader.stats.misses == 2 and loader.stats.stale_hits == 0
+
+    _run(test)
+
+
+def test_slow_or_failing_function_does_not_block_a_stale_config():
+    async def test(loader, function, now):
+        await loader.get_calcom_config("a-1")
+        now[0] = 120.0
+        function.latency = 1.0
+        started_at = asyncio.get_running_loop().time()
+        assert (await loader.get_calcom_config("a-1"))["eventId"] == "1001"
+        assert asyncio.get_running_loop().time() - started_at < 0.1
+        await _settle(loader)
+
+        function.latency, function.status = 0.0, 500
+        now[0] = 240.0
+        assert (await loader.get_calcom_config("a-1"))["eventId"] == "1001"
+        await _settle(loader)
+        assert loader.stats.refresh_failures == 1
+        # the failed refresh left the stale config in place
+        assert (await loader.get_calcom_config("a-1"))["eventId"] == "1001"
+
+    _run(test, fetch_timeout=0.2)
+
+
+def test_fetch_timeout_without_a_cached_config():
+    async def test(loader, function, now):
+        function.latency = 0.5
+        started_at = asyncio.get_running_loop().time()
+        # not the same as an assistant without configuration
+        with pytest.raises(ConfigUnavailableError):
+            await loader.get_calcom_config("a-1")
+        assert asyncio.get_running_loop().time() - started_at < 0.4
+        # the request goes on: its answer serves the next call
+        await _settle(loader)
+        assert await loader.get_calcom_config("a-1") == {"apiKey": "key-a-1", "eventId": "1001"}
+        assert function.calls == 1
+
+    _run(test, fetch_timeout=0.2)
+
+
+def test_failing_function_without_a_cached_config():
+    async def test(loader, function, now):
+        function.status = 500
+        with pytest.raises(ConfigUnavailableError):
+            await loader.get_calcom_config("a-1")
+        function.status = 200
+        assert await loader.get_calcom_config("a-1") == {"apiKey": "key-a-1", "eventId": "1001"}
+
+    _run(test)
+
+
+def test_invalidate_drops_the_entry():
+    async def test(loader, function, now):
+        await loader.get_calcom_config("a-1")
+        await loader.get_calcom_config("a-2")
+        function.event_id = "2002"
+        loader.invalidate("a-1")
+        assert (await loader.get_calcom_config("a-1"))["eventId"] == "2002"
+        assert (await loader.get_calcom_config("a-2"))["eventId"] == "1001"
+        assert function.calls == 3
+
+    _run(test)
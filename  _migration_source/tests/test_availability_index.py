@@ -0,0 +1,163 @@
+import asyncio
+import datetime
+from zoneinfo import ZoneInfo
+
+from availability_index import AvailabilityIndex, ListedSlots
+from calendar_api import AvailableSlot, FakeCalendar
+
+PARIS = ZoneInfo("Europe/Paris")
+START = datetime.datetime(2026, 10, 19, 9, 0, tzinfo=PARIS)
+DAY = datetime.timedelta(days=1)
+
+
+def _slots(start, count, *, step_min=30, calendar=None):
+    return [
+        AvailableSlot(
+            start_time=start + datetime.timedelta(minutes=step_min * i),
+            duration_min=30,
+            calendar=calendar,
+        )
+        for i in range(count)
+    ]
+
+
+class RecordingCalendar(FakeCalendar):
+    """FakeCalendar with four slots a day, recording the windows it is asked for"""
+
+    def __init__(self):
+        slots = [slot for day in range(30) for slot in _slots(START + day * DAY, 4, step_min=120)]
+        super().__init__(timezone="Europe/Paris", slots=slots)
+        self.windows = []
+
+    async def list_available_slots(self, *, start_time, end_time, limit=None):
+        self.windows.append((start_time, end_time))
+        return await super().list_available_slots(
+            start_time=start_time, end_time=end_time, limit=limit
+        )
+
+
+def _index(now):
+    return AvailabilityIndex(max_age=120.0, clock=lambda: now[0])
+
+
+def test_widening_fetches_only_the_missing_interval():
+    async def test():
+        index, calendar = _index([0.0]), RecordingCalendar()
+        fetch = calendar.list_available_slots
+        week = await index.list_slots(fetch, start_time=START, end_time=START + 7 * DAY)
+        assert len(week) == 28
+
+        two_weeks = await index.list_slots(fetch, start_time=START, end_time=START + 14 * DAY)
+        assert two_weeks == await fetch(start_time=START, end_time=START + 14 * DAY)
+        assert calendar.windows[:2] == [
+            (START, START + 7 * DAY),
+            (START + 7 * DAY, START + 14 * DAY),
+        ]
+        # and nothing at all once known
+        calendar.windows.clear()
+        await index.list_slots(fetch, start_time=START + DAY, end_time=START + 3 * DAY)
+        assert calendar.windows == []
+
+    asyncio.run(test())
+
+
+def test_stale_interval_is_refreshed_on_its_own():
+    async def test():
+        now = [0.0]
+        index, calendar = _index(now), RecordingCalendar()
+        fetch = calendar.list_available_slots
+        await index.list_slots(fetch, start_time=START, end_time=START + 3 * DAY)
+        now[0] = 100.0
+        await index.list_slots(fetch, start_time=START + 3 * DAY, end_time=START + 6 * DAY)
+
+        now[0] = 130.0
+        assert index.missing(START, START + 6 * DAY) == [(START, START + 3 * DAY)]
+        # taken meanwhile: the refresh drops it
+        calendar._slots.remove(START)
+        calendar.windows.clear()
+        slots = await index.list_slots(fetch, start_time=START, end_time=START + 6 * DAY)
+        assert calendar.windows == [(START, START + 3 * DAY)]
+        assert len(slots) == 23 and slots[0].start_time != START
+
+    asyncio.run(test())
+
+
+def test_limit_stops_fetching_once_enough_slots_are_known():
+    async def test():
+        index, calendar = _index([0.0]), RecordingCalendar()
+        fetch = calendar.list_available_slots
+        slots = await index.list_slots(fetch, start_time=START, end_time=START + 7 * DAY, limit=6)
+        assert slots == (await fetch(start_time=START, end_time=START + 7 * DAY))[:6]
+        # only [START, last slot] is known: the rest of the week is still missing
+        assert index.missing(START, START + 7 * DAY)[0][0] > slots[-1].start_time
+
+    asyncio.run(test())
+
+
+def test_find_resolves_a_listed_id():
+    index = AvailabilityIndex()
+    index.record(START, START + DAY, _slots(START, 16))
+    listed = index.known(START, START + DAY)
+    for slot in listed:
+        assert index.find(slot.unique_hash) == slot
+    assert index.find("ST_unknown") is None
+
+
+def test_slot_id_does_not_depend_on_the_timezone():
+    slot = _slots(START, 1)[0]
+    utc_start = slot.start_time.astimezone(datetime.timezone.utc)
+    utc = AvailableSlot(start_time=utc_start, duration_min=30)
+    assert slot.unique_hash == utc.unique_hash
+    assert slot.unique_hash != _slots(START, 1, calendar="Dr Petit")[0].unique_hash
+
+
+def test_find_forgets_discarded_and_refetched_slots():
+    index = AvailabilityIndex()
+    first, second, third = _slots(START, 3)
+    index.record(START, START + DAY, [first, second, third])
+
+    index.discard(second.start_time)
+    assert index.find(second.unique_hash) is None
+
+    # refetched without the first slot (taken meanwhile)
+    index.record(START, START + DAY, [third])
+    assert index.find(first.unique_hash) is None
+    assert index.find(third.unique_hash) == third
+
+
+def test_find_tells_apart_calendars_at_the_same_time():
+    index = AvailabilityIndex()
+    martin = _slots(START, 1, calendar="Dr Martin")[0]
+    index.record(START, START + DAY, [martin])
+    assert index.find(martin.unique_hash).calendar == "Dr Martin"
+    assert index.find(_slots(START, 1, calendar="Dr Petit")[0].unique_hash) is None
+
+
+def test_listed_slots_keep_the_most_recently_listed():
+    listed = ListedSlots(max_size=3)
+    first, second, third, fourth = _slots(START, 4)
+    for slot in (first, second, third):
+        listed.add(slot)
+    assert listed.add(first) == first.unique_hash  # listed again: now the most recent
+    listed.add(fourth)
+    assert len(listed) == 3
+    assert listed.get(second.unique_hash) is None and listed.id_of(second.start_time) is None
+    assert listed.get(first.unique_hash) == first
+    assert listed.id_of(fourth.start_time) == fourth.unique_hash
+
+
+def test_listed_slots_prune_past_slots():
+    listed = ListedSlots()
+    slots = _slots(START, 4)
+    for slot in slots:
+        listed.add(slot)
+    assert listed.prune(slots[2].start_time) == 2
+    assert [listed.get(slot.unique_hash) for slot in slots] == [None, None, *slots[2:]]
+    assert listed.id_of(slots[0].start_time) is None
+
+
+def test_memoized_slot_id_is_left_out_of_equality():
+    slot = _slots(START, 1)[0]
+    twin = _slots(START, 1)[0]
+    assert slot.unique_hash  # memoized on `slot` only
+    assert slot == twin and hash(slot) == hash(twin)
@@ -0,0 +1,113 @@
+import asyncio
+import datetime
+import multiprocessing
+
+from availability_snapshot import AvailabilitySnapshot
+from calendar_api import AvailableSlot
+from calendar_registry import CalendarRegistry, CalendarSetup
+from slot_cache import SlotCache
+
+START = datetime.datetime(2026, 10, 19, 8, 0, tzinfo=datetime.timezone.utc)
+END = START + datetime.timedelta(days=7)
+SCOPE = ("cal_live_secret", 1001)
+SLOTS = [
+    AvailableSlot(start_time=START + datetime.timedelta(hours=i), duration_min=30)
+    for i in range(5)
+]
+
+
+def _processes(path, now, count=2):
+    """Snapshot, slot cache and registry of `count` worker processes sharing `path`"""
+    for _ in range(count):
+        snapshot = AvailabilitySnapshot(str(path), clock=lambda: now[0])
+        yield (
+            snapshot,
+            SlotCache(ttl=30.0, stale_ttl=900.0, clock=lambda: now[0], snapshot=snapshot),
+            CalendarRegistry(ttl=900.0, clock=lambda: now[0], snapshot=snapshot),
+        )
+
+
+def test_window_fetched_by_one_process_is_read_by_another(tmp_path):
+    now = [1000.0]
+    (_, first, _), (_, second, _) = _processes(tmp_path / "availability.db", now)
+    first.put(SCOPE, START, END, SLOTS)
+
+    now[0] += 10.0
+    assert second.get(SCOPE, START, END) == SLOTS
+    assert second.stats.shared_hits == 1
+    # no older than the TTL, whichever process fetched it
+    now[0] += 20.0
+    assert first.get(SCOPE, START, END) is None
+    assert second.get(SCOPE, START, END) is None
+    # still the last known availability of the other processes
+    _, third, _ = next(_processes(tmp_path / "availability.db", now, count=1))
+    slots, age_s = third.last_known(SCOPE, START, END)
+    assert slots == SLOTS and age_s == 30.0
+
+
+def test_booking_invalidates_the_window_in_every_process(tmp_path):
+    now = [1000.0]
+    (_, first, _), (_, second, _) = _processes(tmp_path / "availability.db", now)
+    first.put(SCOPE, START, END, SLOTS)
+    second.invalidate(SCOPE, SLOTS[2].start_time)
+    # the first process still has its own entry: it refetches after its TTL like before
+    assert first.get(SCOPE, START, END) == SLOTS
+    first.clear()
+    assert first.get(SCOPE, START, END) is None
+
+
+def test_setup_resolved_by_one_process_is_used_by_another(tmp_path):
+    async def test():
+        now = [1000.0]
+        (_, _, first), (_, _, second) = _processes(tmp_path / "availability.db", now)
+        setup = CalendarSetup(username="cabinet", event_type_id=1001)
+
+        async def resolve():
+            return setup
+
+        async def never():
+            raise AssertionError("resolved again")
+
+        await first.get_or_resolve(SCOPE, resolve)
+        assert await second.get_or_resolve(SCOPE, never) == setup
+        assert second.stats.shared_hits == 1
+
+        second.invalidate(SCOPE)
+        first.clear()
+        assert await first.get_or_resolve(SCOPE, resolve) == setup
+        assert first.stats.shared_hits == 0
+
+    asyncio.run(test())
+
+
+def test_api_keys_are_not_written_to_disk(tmp_path):
+    now = [1000.0]
+    path = tmp_path / "availability.db"
+    [(snapshot, cache, _)] = _processes(path, now, count=1)
+    cache.put(SCOPE, START, END, SLOTS)
+    snapshot.put_setup(SCOPE, "cabinet", 1001)
+    snapshot.close()
+    assert b"cal_live_secret" not in b"".join(p.read_bytes() for p in tmp_path.iterdir())
+
+
+def test_unusable_database_is_a_miss(tmp_path):
+    snapshot = AvailabilitySnapshot(str(tmp_path / "missing" / "availability.db"))
+    snapshot.put_window(SCOPE, 0, 3600, SLOTS)
+    assert snapshot.get_window(SCOPE, 0, 3600, max_age=60.0) is None
+    assert snapshot.stats.errors == 2
+
+
+def _put_in_another_process(path):
+    cache = SlotCache(snapshot=AvailabilitySnapshot(path))
+    cache.put(SCOPE, START, END, SLOTS)
+
+
+def test_window_is_shared_across_real_processes(tmp_path):
+    path = str(tmp_path / "availability.db")
+    process = multiprocessing.get_context("spawn").Process(
+        target=_put_in_another_process, args=(path,)
+    )
+    process.start()
+    process.join(60)
+    assert process.exitcode == 0
+    assert SlotCache(snapshot=AvailabilitySnapshot(path)).get(SCOPE, START, END) == SLOTS
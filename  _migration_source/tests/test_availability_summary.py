@@ -0,0 +1,83 @@
+import datetime
+from zoneinfo import ZoneInfo
+
+import availability_summary
+from availability_index import ListedSlots
+from calendar_api import AvailableSlot
+
+PARIS = ZoneInfo("Europe/Paris")
+# a Monday
+NOW = datetime.datetime(2026, 10, 19, 7, 30, tzinfo=PARIS)
+
+
+def _day(day, hours):
+    date = NOW.date() + datetime.timedelta(days=day)
+    return [
+        AvailableSlot(
+            start_time=datetime.datetime.combine(date, datetime.time(h, m), tzinfo=PARIS),
+            duration_min=30,
+        )
+        for h, m in hours
+    ]
+
+
+MORNING = [(9, 0), (9, 30), (10, 0), (11, 30)]
+AFTERNOON = [(14, 0), (16, 30)]
+
+
+def test_summary_counts_each_part_of_each_day():
+    slots = _day(0, MORNING + AFTERNOON) + _day(1, [(18, 30)])
+    listed = ListedSlots()
+    lines = availability_summary.summarize(slots, tz=PARIS, now=NOW, register=listed.add)
+    assert lines[0] == "7 créneaux libres (réserver avec l'identifiant) :"
+    # earliest and latest of the part stand for it
+    first, last = slots[0], slots[3]
+    assert lines[1] == (
+        f"- lundi 19 octobre (aujourd'hui) : matin 4 ({first.unique_hash} 09:00, "
+        f"{last.unique_hash} 11:30), après-midi 2 ({slots[4].unique_hash} 14:00, "
+        f"{slots[5].unique_hash} 16:30)"
+    )
+    assert lines[2] == f"- mardi 20 octobre (demain) : soir 1 ({slots[6].unique_hash} 18:30)"
+    # only the sampled slots are registered for booking
+    assert len(listed) == 5 and listed.get(slots[1].unique_hash) is None
+
+
+def test_summary_counts_the_days_past_the_first_week():
+    slots = [slot for day in range(10) for slot in _day(day, [(9, 0)])]
+    lines = availability_summary.summarize(
+        slots, tz=PARIS, now=NOW, register=ListedSlots().add
+    )
+    assert len(lines) == 1 + 7 + 2
+    assert lines[-2] == "- et 3 autres jours jusqu'au mercredi 28 octobre"
+
+
+def test_detail_lists_every_slot_up_to_its_limit():
+    slots = _day(3, MORNING + AFTERNOON)
+    lines = availability_summary.detail(
+        slots, tz=PARIS, now=NOW, register=ListedSlots().add, max_slots=4
+    )
+    ids = ", ".join(f"{slot.unique_hash} {slot.start_time:%H:%M}" for slot in slots[:4])
+    assert lines == [
+        f"- jeudi 22 octobre : {ids}",
+        "- et 2 autres créneaux : préciser le jour",
+    ]
+
+
+def test_days_are_parsed_in_french():
+    today = NOW.date()
+    parse = availability_summary.parse_day
+    assert parse("2026-10-22", today) == datetime.date(2026, 10, 22)
+    assert parse("Jeudi ", today) == datetime.date(2026, 10, 22)
+    assert parse("lundi", today) == today
+    assert parse("demain", today) == datetime.date(2026, 10, 20)
+    assert parse("aujourd’hui", today) == today
+    assert parse("mercredí", today) == datetime.date(2026, 10, 21)
+    assert parse("la semaine prochaine", today) is None
+
+
+def test_part_window_spans_the_local_day():
+    day = datetime.date(2026, 10, 25)  # back to winter time that night
+    start, end = availability_summary.part_window(day, None, PARIS)
+    assert end.timestamp() - start.timestamp() == 25 * 3600
+    start, end = availability_summary.part_window(day, "après-midi", PARIS)
+    assert (start.hour, end.hour) == (12, 18)
@@ -0,0 +1,195 @@
+import asyncio
+import datetime
+import logging
+
+import aiohttp
+import pytest
+
+from benchmarks.calcom_standin import CalComStandin, StandinConfig
+from booking_queue import BookingJournal, BookingQueuedError, BookingQueues
+from calendar_api import CalComCalendar, SlotUnavailableError
+from circuit_breaker import OPEN, CalendarUnavailableError, CircuitBreakers
+from slot_cache import SlotCache
+
+START = datetime.datetime(2026, 10, 19, 7, 0, tzinfo=datetime.timezone.utc)
+END = START + datetime.timedelta(days=30)
+
+
+def _run(test, *, breakers=None, **standin_options):
+    """Runs `test(calendar, standin)` with a CalComCalendar on a local Cal.com stand-in"""
+    config = StandinConfig(latency_ms=1.0, latency_per_day_ms=0.0, **standin_options)
+    standin = CalComStandin(config)
+
+    async def main():
+        base_url = await standin.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                calendar = CalComCalendar(
+                    api_key="test",
+                    timezone="Europe/Paris",
+                    event_id=str(standin.config.event_type_id),
+                    slot_cache=SlotCache(),
+                    registry=None,
+                    base_url=base_url,
+                    http_session=session,
+                    breakers=breakers or CircuitBreakers(),
+                    booking_queues=BookingQueues(),
+                )
+                await calendar.initialize()
+                await test(calendar, standin)
+        finally:
+            await standin.aclose()
+
+    asyncio.run(main())
+
+
+def test_whole_window_is_cached():
+    async def test(calendar, standin):
+        slots = await calendar.list_available_slots(start_time=START, end_time=END)
+        again = await calendar.list_available_slots(start_time=START, end_time=END)
+        assert slots == again and len(slots) == 22 * 16
+        assert standin.requests["slots"] == 1
+
+    _run(test)
+
+
+def test_limit_stops_a_cold_lookup_early():
+    async def test(calendar, standin):
+        first = await calendar.list_available_slots(start_time=START, end_time=END, limit=20)
+        assert len(first) == 20
+        assert first == sorted(first, key=lambda s: s.start_time)
+        assert first[0].start_time >= START
+        # cut short: not kept as the whole window
+        assert calendar.slot_cache.get(calendar.availability_scope, START, END) is None
+
+        whole = await calendar.list_available_slots(start_time=START, end_time=END)
+        assert whole[:20] == first
+        # a warm cache answers limited lookups too
+        assert await calendar.list_available_slots(start_time=START, end_time=END, limit=5) == (
+            whole[:5]
+        )
+        assert standin.requests["slots"] == 2
+
+    _run(test)
+
+
+def test_booking_logs_no_attendee_above_debug(caplog):
+    caplog.set_level(logging.DEBUG, logger="cal.com")
+
+    async def test(calendar, standin):
+        slots = await calendar.list_available_slots(start_time=START, end_time=END, limit=1)
+        await calendar.schedule_appointment(
+            start_time=slots[0].start_time,
+            attendee_email="jeanne.martin@example.com",
+            user_name="Jeanne Martin",
+        )
+
+    _run(test)
+    booking = [r for r in caplog.records if "ooking" in r.getMessage()]
+    info = [r.getMessage() for r in booking if r.levelno >= logging.INFO]
+    debug = [r.getMessage() for r in booking if r.levelno == logging.DEBUG]
+    assert any("Booking created" in message and "status=201" in message for message in info)
+    assert not any("example.com" in m or "Jeanne" in m for m in info)
+    # still available when debugging
+    assert any("jeanne.martin@example.com" in message for message in debug)
+
+
+def test_booking_drops_the_cached_window():
+    async def test(calendar, standin):
+        slots = await calendar.list_available_slots(start_time=START, end_time=END)
+        await calendar.schedule_appointment(
+            start_time=slots[0].start_time, attendee_email="a@example.com", user_name="A"
+        )
+        after = await calendar.list_available_slots(start_time=START, end_time=END)
+        assert after == slots[1:]
+        assert standin.requests["slots"] == 2
+
+    _run(test)
+
+
+def test_second_booking_of_a_slot_is_a_conflict():
+    async def test(calendar, standin):
+        slots = await calendar.list_available_slots(start_time=START, end_time=END, limit=1)
+        await calendar.schedule_appointment(
+            start_time=slots[0].start_time, attendee_email="a@example.com", user_name="A"
+        )
+        with pytest.raises(SlotUnavailableError):
+            await calendar.schedule_appointment(
+                start_time=slots[0].start_time, attendee_email="b@example.com", user_name="B"
+            )
+        assert standin.booked == {slots[0].start_time}
+
+    _run(test)
+
+
+def test_open_circuit_offers_last_known_slots_and_queues_bookings():
+    async def test(calendar, standin):
+        slots = await calendar.list_available_slots(start_time=START, end_time=END)
+        # a day later, a window that is not cached yet
+        start, end = START + datetime.timedelta(days=1), END + datetime.timedelta(days=1)
+        standin.config.error_rate = 1.0
+        with pytest.raises(aiohttp.ClientResponseError):
+            await calendar.list_available_slots(start_time=start, end_time=end)
+        assert calendar.breaker.state == OPEN
+
+        requests = dict(standin.requests)
+        with pytest.raises(CalendarUnavailableError) as unavailable:
+            await calendar.list_available_slots(start_time=start, end_time=end)
+        # what the first lookup knew of the window
+        known = unavailable.value.last_known(start, end)
+        assert known.slots == [slot for slot in slots if slot.start_time >= start]
+        with pytest.raises(BookingQueuedError) as queued:
+            await calendar.schedule_appointment(
+                start_time=slots[0].start_time, attendee_email="a@example.com", user_name="A"
+            )
+        assert queued.value.position == 1 and len(calendar.booking_queue) == 1
+        # neither call reached Cal.com
+        assert standin.requests == requests
+        await calendar.booking_queue.aclose()
+
+    _run(test, breakers=CircuitBreakers(failure_threshold=1))
+
+
+def test_queued_booking_is_sent_by_the_next_job(tmp_path):
+    standin = CalComStandin(StandinConfig(latency_ms=1.0, latency_per_day_ms=0.0))
+    journal = BookingJournal(str(tmp_path / "bookings.json"))
+
+    async def main():
+        base_url = await standin.start()
+
+        def calendar(session, breakers):
+            return CalComCalendar(
+                api_key="test",
+                timezone="Europe/Paris",
+                event_id=str(standin.config.event_type_id),
+                slot_cache=None,
+                registry=None,
+                base_url=base_url,
+                http_session=session,
+                breakers=breakers,
+                booking_queues=BookingQueues(journal=journal),
+            )
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                first = calendar(session, CircuitBreakers(failure_threshold=1))
+                await first.initialize()
+                first.breaker.record_failure()
+                with pytest.raises(BookingQueuedError):
+                    await first.schedule_appointment(
+                        start_time=START, attendee_email="a@example.com", user_name="A"
+                    )
+                # the call ends while Cal.com is still unavailable
+                await first.booking_queue.aclose()
+                assert standin.requests.get("bookings", 0) == 0
+
+                # the next call to this calendar, in another process
+                second = calendar(session, CircuitBreakers())
+                await second.initialize()
+                assert len(second.booking_queue) == 1
+                await second.booking_queue.aclose()
+                assert standin.requests["bookings"] == 1 and START in standin.booked
+        finally:
+            await standin.aclose()
+
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from calendar_registry import CalendarRegistry, CalendarSetup
+
+KEY = ("api-key", "1001")
+SETUP = CalendarSetup(username="cabinet", event_type_id=1001)
+
+
+class Resolver:
+    def __init__(self, *setups, delay=0.0):
+        self._setups = list(setups) or [SETUP]
+        self._delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        setup = self._setups[min(self.calls, len(self._setups)) - 1]
+        if isinstance(setup, Exception):
+            raise setup
+        return setup
+
+
+def _registry(now):
+    return CalendarRegistry(ttl=900.0, revalidate_after=300.0, clock=lambda: now[0])
+
+
+async def _settle(registry):
+    while registry._tasks:
+        await asyncio.gather(*registry._tasks)
+
+
+def test_concurrent_first_calls_share_one_resolution():
+    async def test():
+        registry = _registry([0.0])
+        resolver = Resolver(delay=0.01)
+        setups = await asyncio.gather(
+            *(registry.get_or_resolve(KEY, resolver) for _ in range(10))
+        )
+        assert setups == [SETUP] * 10
+        assert resolver.calls == 1
+        assert registry.get(KEY) == SETUP
+
+    asyncio.run(test())
+
+
+def test_setup_is_resolved_again_after_its_ttl():
+    async def test():
+        now = [0.0]
+        registry = _registry(now)
+        resolver = Resolver()
+        await registry.get_or_resolve(KEY, resolver)
+        now[0] = 900.0
+        assert registry.get(KEY) is None
+        await registry.get_or_resolve(KEY, resolver)
+        assert resolver.calls == 2
+        assert registry.stats.misses == 2
+
+    asyncio.run(test())
+
+
+def test_old_setup_is_served_while_revalidated_in_the_background():
+    async def test():
+        now = [0.0]
+        registry = _registry(now)
+        renamed = CalendarSetup(username="cabinet-2", event_type_id=1001)
+        resolver = Resolver(SETUP, renamed)
+        await registry.get_or_resolve(KEY, resolver)
+
+        now[0] = 299.0
+        assert await registry.get_or_resolve(KEY, resolver) == SETUP
+        assert resolver.calls == 1
+        now[0] = 300.0
+        assert await registry.get_or_resolve(KEY, resolver) == SETUP
+        assert await registry.get_or_resolve(KEY, resolver) == SETUP
+        await _settle(registry)
+        assert resolver.calls == 2 and registry.stats.revalidations == 1
+        assert await registry.get_or_resolve(KEY, resolver) == renamed
+
+    asyncio.run(test())
+
+
+def test_failed_revalidation_keeps_the_current_setup():
+    async def test():
+        now = [0.0]
+        registry = _registry(now)
+        resolver = Resolver(SETUP, RuntimeError("cal.com down"))
+        await registry.get_or_resolve(KEY, resolver)
+        now[0] = 600.0
+        assert await registry.get_or_resolve(KEY, resolver) == SETUP
+        await _settle(registry)
+        assert registry.stats.revalidation_failures == 1
+        assert registry.get(KEY) == SETUP
+
+    asyncio.run(test())
+
+
+def test_failed_resolution_is_not_kept():
+    async def test():
+        registry = _registry([0.0])
+        resolver = Resolver(RuntimeError("bad api key"), SETUP)
+        with pytest.raises(RuntimeError):
+            await registry.get_or_resolve(KEY, resolver)
+        assert await registry.get_or_resolve(KEY, resolver) == SETUP
+
+    asyncio.run(test())
+
+
+def test_invalidate_forces_a_new_resolution():
+    async def test():
+        registry = _registry([0.0])
+        resolver = Resolver()
+        await registry.get_or_resolve(KEY, resolver)
+        registry.invalidate(KEY)
+        assert registry.get(KEY) is None
+        await registry.get_or_resolve(KEY, resolver)
+        assert resolver.calls == 2
+
+    asyncio.run(test())
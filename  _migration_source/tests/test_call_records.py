@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import stat
+
+from call_records import CallRecordSink
+
+
+def _spilled_rows(count: int) -> list[dict]:
+    return [{"id": f"spilled-{i}", "call_id": "old", "kind": "transcript"} for i in range(count)]
+
+
+class _Table:
+    """Writer standing for Supabase: keeps every row it received, by id"""
+
+    def __init__(self, latency: float = 0.0, fail: bool = False) -> None:
+        self.latency = latency
+        self.fail = fail
+        self.rows: dict[str, dict] = {}
+
+    async def __call__(self, rows: list[dict]) -> None:
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError("supabase down")
+        self.rows.update((row["id"], row) for row in rows)
+
+
+def test_batches_are_written_on_flush(tmp_path):
+    table = _Table()
+
+    async def run():
+        sink = CallRecordSink(writer=table, spill_path=str(tmp_path / "spill.jsonl"), batch_size=2)
+        recorder = sink.for_call("call-1", assistant_id="a-1")
+        for i in range(5):
+            recorder.transcript("user", f"message {i}")
+        await sink.aclose()
+        return sink
+
+    sink = asyncio.run(run())
+    assert len(table.rows) == 5
+    assert sink.stats.batches == 3
+    assert {row["call_id"] for row in table.rows.values()} == {"call-1"}
+
+
+def test_failed_write_spills_then_replays(tmp_path):
+    spill_path = tmp_path / "spill.jsonl"
+    table = _Table(fail=True)
+    now = [0.0]
+
+    async def run():
+        sink = CallRecordSink(
+            writer=table, spill_path=str(spill_path), retry_after=30.0, clock=lambda: now[0]
+        )
+        sink.emit("tool", {"name": "list_available_slots"}, call_id="call-1")
+        await sink.flush()
+        assert spill_path.exists() and not table.rows
+
+        table.fail = False
+        now[0] = 31.0
+        sink.emit("tool", {"name": "schedule_appointment"}, call_id="call-1")
+        await sink.aclose()
+        return sink
+
+    sink = asyncio.run(run())
+    assert len(table.rows) == 2
+    assert sink.stats.spilled == 1 and sink.stats.replayed == 1
+    assert not spill_path.exists()
+    assert not (tmp_path / "spill.jsonl.replay").exists()
+
+
+def test_spill_file_is_private_to_the_service(tmp_path, monkeypatch):
+    # spilled records hold callers' contact details: kept in the service's state directory,
+    # readable by its owner only
+    monkeypatch.setenv("ZORA_STATE_DIR", str(tmp_path / "state"))
+    previous_umask = os.umask(0o022)
+
+    async def run():
+        sink = CallRecordSink(writer=_Table(fail=True))
+        sink.emit("transcript", {"text": "Je suis Jean Dupont, 06 12 34 56 78"}, call_id="call-1")
+        await sink.flush()
+        return sink
+
+    try:
+        sink = asyncio.run(run())
+    finally:
+        os.umask(previous_umask)
+    spill_path = tmp_path / "state" / "call-records.jsonl"
+    assert sink.stats.spilled == 1
+    assert spill_path.exists()
+    assert stat.S_IMODE(spill_path.stat().st_mode) == 0o600
+    assert stat.S_IMODE((tmp_path / "state").stat().st_mode) == 0o700
+
+
+def test_sinks_sharing_a_spill_file_replay_it_once(tmp_path):
+    # worker processes of a host share the spill file: concurrent replays must not fail
+    spill_path = tmp_path / "spill.jsonl"
+    spill_path.write_text("".join(json.dumps(row) + "\n" for row in _spilled_rows(500)))
+    table = _Table(latency=0.01)
+
+    async def run():
+        sinks = [
+            CallRecordSink(writer=table, spill_path=str(spill_path), batch_size=200)
+            for _ in range(2)
+        ]
+        for i, sink in enumerate(sinks):
+            sink.emit("usage", {"sink": i}, call_id=f"call-{i}")
+        await asyncio.gather(*(sink.flush() for sink in sinks))
+        await asyncio.gather(*(sink.aclose() for sink in sinks))
+        return sinks
+
+    sinks = asyncio.run(run())
+    assert len(table.rows) == 502
+    assert sum(sink.stats.replayed for sink in sinks) == 500
+    assert not spill_path.exists()
+    assert not (tmp_path / "spill.jsonl.replay").exists()
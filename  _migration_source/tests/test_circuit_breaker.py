@@ -0,0 +1,225 @@
+import asyncio
+import datetime
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from booking_queue import CONFIRMED, REJECTED, BookingJournal, BookingQueue, PendingBooking
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+START = datetime.datetime(2026, 10, 19, 9, 0, tzinfo=datetime.timezone.utc)
+
+
+def _breaker(now):
+    return CircuitBreaker("test", failure_threshold=3, reset_timeout=30.0, clock=lambda: now[0])
+
+
+def test_consecutive_failures_open_the_circuit():
+    breaker = _breaker([0.0])
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # not consecutive any more
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats.opened == 1 and breaker.stats.rejected == 1
+
+
+def test_half_open_lets_a_single_probe_through():
+    now = [0.0]
+    breaker = _breaker(now)
+    for _ in range(3):
+        breaker.record_failure()
+
+    now[0] = 29.0
+    assert not breaker.allow()
+    now[0] = 30.0
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # the probe is still running
+
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_failed_probe_opens_the_circuit_again():
+    now = [0.0]
+    breaker = _breaker(now)
+    for _ in range(3):
+        breaker.record_failure()
+    now[0] = 30.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    now[0] = 59.0
+    assert not breaker.allow()
+    now[0] = 60.0
+    assert breaker.allow()
+
+
+def test_abandoned_probe_is_replaced():
+    now = [0.0]
+    breaker = _breaker(now)
+    for _ in range(3):
+        breaker.record_failure()
+    now[0] = 30.0
+    assert breaker.allow()
+    # the probe's caller hung up without an outcome
+    now[0] = 59.0
+    assert not breaker.allow()
+    now[0] = 60.0
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+
+
+class Confirmations:
+    """`PendingBooking.confirm` of each start time, answering the given outcomes in turn"""
+
+    def __init__(self, **outcomes):
+        self._outcomes = {key: list(values) for key, values in outcomes.items()}
+        self.sent = []
+
+    def booking(self, name, hour):
+        async def confirm():
+            self.sent.append(name)
+            outcome = self._outcomes[name].pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        return PendingBooking(
+            start_time=START + datetime.timedelta(hours=hour), user_name=name, confirm=confirm
+        )
+
+
+def test_queued_bookings_are_sent_oldest_first_once_the_calendar_answers():
+    async def test():
+        queue = BookingQueue("test", retry_interval=0.01)
+        confirmations = Confirmations(
+            a=[None, CONFIRMED], b=[REJECTED], c=[RuntimeError("500")], d=[CONFIRMED]
+        )
+        for hour, name in enumerate("abcd"):
+            assert queue.enqueue(confirmations.booking(name, hour)) == hour + 1
+
+        while len(queue):
+            await asyncio.sleep(0.01)
+        # still unavailable on the first round: nothing else is attempted then
+        assert confirmations.sent == ["a", "a", "b", "c", "d"]
+        stats = queue.stats
+        assert (stats.confirmed, stats.rejected, stats.failed) == (2, 1, 1)
+        await queue.aclose()
+
+    asyncio.run(test())
+
+
+def test_full_queue_refuses_bookings():
+    async def test():
+        queue = BookingQueue("test", max_size=2, retry_interval=60.0)
+        confirmations = Confirmations(a=[CONFIRMED], b=[CONFIRMED], c=[CONFIRMED])
+        queue.enqueue(confirmations.booking("a", 0))
+        queue.enqueue(confirmations.booking("b", 1))
+        with pytest.raises(OverflowError):
+            queue.enqueue(confirmations.booking("c", 2))
+        assert len(queue) == 2 and queue.stats.dropped == 1
+        await queue.aclose()
+
+    asyncio.run(test())
+
+
+
+def _journaled(name, hour, confirm):
+    return PendingBooking(
+        start_time=START + datetime.timedelta(hours=hour),
+        user_name=name,
+        confirm=confirm,
+        calendar="cal",
+        request={"name": name},
+    )
+
+
+def test_bookings_not_sent_when_the_job_ends_are_sent_by_the_next_one(tmp_path):
+    async def test():
+        journal = BookingJournal(str(tmp_path / "bookings.json"))
+
+        async def unavailable():
+            return None
+
+        first = BookingQueue("test", retry_interval=60.0, journal=journal)
+        first.enqueue(_journaled("a", 0, unavailable))
+        first.enqueue(_journaled("b", 1, unavailable))
+        await first.aclose(timeout=1.0)
+        assert len(first) == 0
+
+        sent = []
+
+        def confirm(start_time, request):
+            async def _confirm():
+                sent.append((start_time, request["name"]))
+                return CONFIRMED
+
+            return _confirm
+
+        # another job (here, another queue) of the same calendar
+        assert BookingQueue("other", journal=journal).recover("elsewhere", confirm) == 0
+        second = BookingQueue("test", retry_interval=60.0, journal=journal)
+        assert second.recover("cal", confirm) == 2
+        await second.aclose()
+        assert sent == [(START, "a"), (START + datetime.timedelta(hours=1), "b")]
+        # sent: gone from the journal
+        assert second.recover("cal", confirm) == 0
+        assert json.loads((tmp_path / "bookings.json").read_text()) == {}
+        assert (tmp_path / "bookings.json").stat().st_mode & 0o777 == 0o600
+
+    asyncio.run(test())
+
+
+def test_bookings_of_a_running_job_are_not_claimed(tmp_path):
+    async def test():
+        journal = BookingJournal(str(tmp_path / "bookings.json"))
+        queue = BookingQueue("test", retry_interval=60.0, journal=journal)
+
+        async def unavailable():
+            return None
+
+        queue.enqueue(_journaled("a", 0, unavailable))
+        # another process: this one is still sending the booking
+        claim = (
+            "import sys; from booking_queue import BookingJournal; "
+            "print(len(BookingJournal(sys.argv[1]).claim('cal')))"
+        )
+
+        def claimed():
+            run = [sys.executable, "-c", claim, str(tmp_path / "bookings.json")]
+            agent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            return int(subprocess.run(run, cwd=agent_dir, capture_output=True, check=True).stdout)
+
+        assert claimed() == 0
+        await queue.aclose(timeout=0.0)
+        # released when the job ended
+        assert claimed() == 1
+        # claimed by a process that has exited since: claimed again
+        assert claimed() == 1
+
+    asyncio.run(test())
+
+
+def test_booking_is_refused_when_the_journal_is_unavailable(tmp_path):
+    async def test():
+        journal = BookingJournal(str(tmp_path / "missing" / "bookings.json"))
+        queue = BookingQueue("test", journal=journal)
+
+        async def confirm():
+            return CONFIRMED
+
+        # only in memory, it would be lost with the job's process
+        with pytest.raises(OSError):
+            queue.enqueue(_journaled("a", 0, confirm))
+        assert len(queue) == 0 and queue.stats.dropped == 1
+
+    asyncio.run(test())
@@ -0,0 +1,158 @@
+import asyncio
+import datetime
+
+import pytest
+
+from availability_index import AvailabilityIndex
+from calendar_api import AvailableSlot, FakeCalendar, PartialSlots
+from circuit_breaker import CalendarUnavailableError, LastKnownAvailability
+from composite_calendar import CompositeCalendar
+from slot_coalescing import CoalescingCalendar, SlotLookupCoalescer
+
+UTC = datetime.timezone.utc
+START = datetime.datetime(2026, 10, 19, 8, 0, tzinfo=UTC)
+END = START + datetime.timedelta(days=1)
+
+
+def _at(*hours):
+    return [
+        AvailableSlot(start_time=START + datetime.timedelta(hours=h), duration_min=30)
+        for h in hours
+    ]
+
+
+class Backend(FakeCalendar):
+    """FakeCalendar answering after `delay`, or failing with `error`"""
+
+    def __init__(self, *hours, delay=0.0, error=None):
+        super().__init__(timezone="Europe/Paris", slots=_at(*hours))
+        self.delay = delay
+        self.error = error
+        self.answered = 0
+
+    async def list_available_slots(self, *, start_time, end_time, limit=None):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        self.answered += 1
+        return await super().list_available_slots(
+            start_time=start_time, end_time=end_time, limit=limit
+        )
+
+
+def test_slots_are_merged_in_time_order_with_their_owner():
+    async def test():
+        cal = CompositeCalendar({"Dr Martin": Backend(0, 2, 4), "Dr Petit": Backend(1, 2, 3)})
+        slots = await cal.list_available_slots(start_time=START, end_time=END)
+        assert [(s.start_time, s.calendar) for s in slots] == [
+            (_at(0)[0].start_time, "Dr Martin"),
+            (_at(1)[0].start_time, "Dr Petit"),
+            (_at(2)[0].start_time, "Dr Martin"),  # on a tie, the calendar listed first
+            (_at(3)[0].start_time, "Dr Petit"),
+            (_at(4)[0].start_time, "Dr Martin"),
+        ]
+        assert cal.stats.duplicates == 1
+        limited = await cal.list_available_slots(start_time=START, end_time=END, limit=2)
+        assert limited == slots[:2]
+
+    asyncio.run(test())
+
+
+def test_bookings_go_to_the_owner():
+    async def test():
+        martin, petit = Backend(0, 2), Backend(2)
+        cal = CompositeCalendar({"Dr Martin": martin, "Dr Petit": petit})
+        slot = (await cal.list_available_slots(start_time=START, end_time=END))[1]
+        assert slot.calendar == "Dr Martin"
+        await cal.schedule_appointment(
+            start_time=slot.start_time,
+            attendee_email="a@example.com",
+            user_name="A",
+            calendar=slot.calendar,
+        )
+        assert len(martin._slots) == 1 and len(petit._slots) == 1
+        # several calendars: the owner has to be given
+        with pytest.raises(ValueError):
+            await cal.schedule_appointment(
+                start_time=slot.start_time, attendee_email="a@example.com", user_name="A"
+            )
+
+    asyncio.run(test())
+
+
+def test_slow_or_failing_calendar_is_left_out():
+    async def test():
+        slow = Backend(1, delay=0.2)
+        failing = Backend(error=RuntimeError("500"))
+        cal = CompositeCalendar(
+            {"Dr Martin": Backend(0), "Dr Petit": slow, "Dr Durand": failing},
+            backend_timeout=0.05,
+        )
+        slots = await cal.list_available_slots(start_time=START, end_time=END)
+        assert [s.calendar for s in slots] == ["Dr Martin"]
+        assert isinstance(slots, PartialSlots)
+        assert set(slots.missing) == {"Dr Petit", "Dr Durand"}
+        assert (cal.stats.partial, cal.stats.timeouts, cal.stats.failures) == (1, 1, 1)
+        # the slow lookup goes on in the background (warming its cache)
+        await asyncio.sleep(0.3)
+        assert slow.answered == 1
+
+    asyncio.run(test())
+
+
+def test_partial_answer_is_shared_as_partial_and_kept_briefly():
+    async def test():
+        slow = Backend(1, delay=0.2)
+        cal = CompositeCalendar({"Dr Martin": Backend(0), "Dr Petit": slow}, backend_timeout=0.05)
+        coalescer = SlotLookupCoalescer()
+        sessions = [CoalescingCalendar(cal, key="practice", coalescer=coalescer) for _ in range(2)]
+        answers = await asyncio.gather(
+            *(s.list_available_slots(start_time=START, end_time=END) for s in sessions)
+        )
+        assert coalescer.stats.joined == 1
+        assert all(isinstance(a, PartialSlots) and a.missing == ("Dr Petit",) for a in answers)
+
+        now = [0.0]
+        index = AvailabilityIndex(max_age=120.0, partial_max_age=5.0, clock=lambda: now[0])
+        slots = await index.list_slots(
+            sessions[0].list_available_slots, start_time=START, end_time=END
+        )
+        assert [s.calendar for s in slots] == ["Dr Martin"]
+        # fetched again within seconds, not after the usual two minutes
+        now[0] = 6.0
+        assert index.missing(START, END) == [(START, END)]
+        await asyncio.sleep(0.3)  # Dr Petit answers again in time
+        slow.delay = 0.0
+        slots = await index.list_slots(
+            sessions[0].list_available_slots, start_time=START, end_time=END
+        )
+        assert [s.calendar for s in slots] == ["Dr Martin", "Dr Petit"]
+        now[0] = 100.0
+        assert index.missing(START, END) == []
+
+    asyncio.run(test())
+
+
+def test_no_answer_merges_the_last_known_availability():
+    async def test():
+        def down(*hours, age_s):
+            known = LastKnownAvailability(slots=_at(*hours), age_s=age_s)
+            return Backend(
+                error=CalendarUnavailableError("circuit open", last_known=lambda s, e: known)
+            )
+
+        cal = CompositeCalendar(
+            {"Dr Martin": down(0, 2, age_s=10.0), "Dr Petit": down(1, age_s=40.0)}
+        )
+        with pytest.raises(CalendarUnavailableError) as error:
+            await cal.list_available_slots(start_time=START, end_time=END)
+        known = error.value.last_known(START, END)
+        assert [s.calendar for s in known.slots] == ["Dr Martin", "Dr Petit", "Dr Martin"]
+        assert known.age_s == 40.0
+
+        # any other failure is raised as is
+        cal = CompositeCalendar({"Dr Martin": Backend(error=RuntimeError("500"))})
+        with pytest.raises(RuntimeError):
+            await cal.list_available_slots(start_time=START, end_time=END)
+
+    asyncio.run(test())
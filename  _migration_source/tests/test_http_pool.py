@@ -0,0 +1,80 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from http_pool import HttpPool
+
+
+def _run(test, *, delay=0.0):
+    """Runs `test(pool, server)` with a pool against a local HTTP server"""
+
+    async def handler(request):
+        await asyncio.sleep(delay)
+        return web.json_response({"status": "success"})
+
+    async def main():
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handler)
+        async with TestServer(app) as server:
+            pool = HttpPool(limit_per_host=2)
+            try:
+                await test(pool, server)
+            finally:
+                await pool.aclose()
+
+    asyncio.run(main())
+
+
+def test_warm_connections_are_reused():
+    async def test(pool, server):
+        await pool.warm(str(server.make_url("/")), connections=2)
+        assert pool.stats.connections_created == 2
+
+        session = pool.session()
+        for _ in range(3):
+            async with session.get(server.make_url("/v2/slots")) as resp:
+                await resp.read()
+        assert pool.stats.connections_created == 2
+        assert pool.stats.connections_reused == 3
+        assert pool.stats.requests == 5 and pool.stats.in_flight == 0
+
+    _run(test)
+
+
+def test_requests_past_the_host_limit_wait_for_a_connection():
+    async def test(pool, server):
+        session = pool.session()
+
+        async def get():
+            async with session.get(server.make_url("/v2/slots")) as resp:
+                await resp.read()
+
+        await asyncio.gather(*(get() for _ in range(4)))
+        assert pool.stats.connections_created == 2
+        assert pool.stats.queued == 2 and pool.stats.queued_s > 0
+        assert pool.stats.peak_in_flight == 4
+
+    _run(test, delay=0.05)
+
+
+def test_last_holder_closes_the_pool():
+    async def test(pool, server):
+        first, second = pool.acquire(), pool.acquire()
+        assert first is second
+        await pool.release()
+        assert not first.closed
+        await pool.release()
+        assert first.closed
+        # a later job gets a new session
+        assert pool.session() is not first
+
+    _run(test)
+
+
+def test_failed_warmup_is_not_an_error():
+    async def test(pool, server):
+        await pool.warm("http://127.0.0.1:9/", connections=1)
+        assert pool.stats.connections_created == 0
+
+    _run(test)
@@ -0,0 +1,32 @@
+import ast
+import os
+import subprocess
+import sys
+
+import pytest
+
+SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "load_agent_tools.py"
+)
+
+
+def _outcomes(*args):
+    """Outcome counts of a small run of the load test"""
+    run = subprocess.run(
+        [sys.executable, SCRIPT, "--think-ms", "1", "--arrival-s", "0.1", *args],
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    )
+    line = next(line for line in run.stdout.splitlines() if "outcomes:" in line)
+    return ast.literal_eval(line.split("outcomes:", 1)[1].strip())
+
+
+@pytest.mark.parametrize(
+    "backend", [["--backend", "fake"], ["--backend", "standin", "--latency-ms", "2"]]
+)
+def test_every_session_books_a_slot(backend):
+    outcomes = _outcomes(*backend, "--ramp", "10")
+    assert outcomes.get("schedule_appointment:ok") == 10
+    assert not any(key.endswith(":tool_error") for key in outcomes)
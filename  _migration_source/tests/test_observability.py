@@ -0,0 +1,109 @@
+import asyncio
+import multiprocessing
+
+import aiohttp
+import prometheus_client
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from prometheus_client import multiprocess
+
+import observability
+from livekit.agents import ToolError
+
+
+def _sample(name, **labels):
+    return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_tool_span_records_the_outcome_and_assistant():
+    @observability.traced_tool
+    async def lookup(fail=None):
+        if fail is not None:
+            raise fail
+
+    def count(outcome):
+        return _sample(
+            "zora_tool_duration_seconds_count",
+            assistant_id="asst-obs",
+            tool="lookup",
+            outcome=outcome,
+        )
+
+    async def test():
+        observability.set_assistant_id("asst-obs")
+        await lookup()
+        with pytest.raises(ToolError):
+            await lookup(ToolError("créneau pris"))
+        with pytest.raises(RuntimeError):
+            await lookup(RuntimeError("bug"))
+
+    before = {outcome: count(outcome) for outcome in ("ok", "tool_error", "error")}
+    asyncio.run(test())
+    assert {outcome: count(outcome) - before[outcome] for outcome in before} == {
+        "ok": 1,
+        "tool_error": 1,
+        "error": 1,
+    }
+
+
+def test_calcom_request_records_its_phases():
+    async def handler(request):
+        return web.json_response({"status": "success", "data": []})
+
+    def count(phase):
+        return _sample(
+            "zora_calcom_http_duration_seconds_count",
+            assistant_id="asst-http",
+            operation="test_slots",
+            phase=phase,
+        )
+
+    async def test():
+        observability.set_assistant_id("asst-http")
+        app = web.Application()
+        app.router.add_get("/slots", handler)
+        async with TestServer(app) as server, aiohttp.ClientSession(
+            trace_configs=[observability.http_trace_config()]
+        ) as session:
+            with observability.calcom_request("test_slots") as timings:
+                async with session.get(server.make_url("/slots"), trace_request_ctx=timings) as r:
+                    timings.response_started()
+                    await r.json()
+                    timings.body_parsed()
+            return timings
+
+    phases = ("connect", "ttfb", "body", "total")
+    before = {phase: count(phase) for phase in phases}
+    timings = asyncio.run(test())
+    assert set(timings.phases()) >= {"connect", "ttfb", "body"}
+    assert {phase: count(phase) - before[phase] for phase in phases} == dict.fromkeys(phases, 1)
+
+
+def test_circuit_state_is_exposed():
+    observability.record_circuit_state("test-calendar", "open")
+    assert _sample("zora_calcom_circuit_open", calendar="test-calendar") == 1
+    observability.record_circuit_state("test-calendar", "closed")
+    assert _sample("zora_calcom_circuit_open", calendar="test-calendar") == 0
+    assert _sample(
+        "zora_calcom_circuit_transitions_total", calendar="test-calendar", state="open"
+    ) == 1
+
+
+def _record_in_a_job_process():
+    observability.record("tool", 120.0, assistant_id="asst-job", tool="lookup", outcome="ok")
+
+
+def test_samples_of_job_processes_reach_the_multiprocess_collector(tmp_path, monkeypatch):
+    # set by the worker (`prometheus_multiproc_dir`) before the job processes start
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    process = multiprocessing.get_context("spawn").Process(target=_record_in_a_job_process)
+    process.start()
+    process.join(60)
+    assert process.exitcode == 0
+
+    # what the worker's /metrics endpoint serves in multiprocess mode
+    registry = prometheus_client.CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    labels = {"assistant_id": "asst-job", "tool": "lookup", "outcome": "ok"}
+    assert registry.get_sample_value("zora_tool_duration_seconds_count", labels) == 1.0
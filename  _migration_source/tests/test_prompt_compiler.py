@@ -0,0 +1,46 @@
+from prompt_compiler import TODAY, InstructionCompiler
+
+BODY = "Tu es Zora, l'assistante vocale de Zora24.ai.\n" * 40
+
+
+def test_placeholder_in_the_last_lines_stays_in_place():
+    compiled = InstructionCompiler().compile(BODY + "Nous sommes le {today}.")
+    assert compiled.prefix == BODY
+    assert compiled.render({TODAY: "lundi 19 octobre 2026"}) == (
+        BODY + "Nous sommes le lundi 19 octobre 2026."
+    )
+
+
+def test_earlier_placeholders_become_references():
+    compiled = InstructionCompiler().compile("Nous sommes le {today}.\n" + BODY)
+    assert "{today}" not in compiled.prefix
+    assert "[DATE DU JOUR]" in compiled.prefix
+    monday = compiled.render({TODAY: "lundi 19 octobre 2026"})
+    tuesday = compiled.render({TODAY: "mardi 20 octobre 2026"})
+    assert monday.startswith(compiled.prefix) and tuesday.startswith(compiled.prefix)
+    assert monday.endswith("[DATE DU JOUR] : lundi 19 octobre 2026")
+
+
+def test_tenant_variables_are_labelled_by_name():
+    compiled = InstructionCompiler().compile(
+        "Cabinet : {practice}\n" + BODY + "Date : {today}", variables=(TODAY, "practice")
+    )
+    assert "[PRACTICE]" in compiled.prefix and "[DATE DU JOUR]" in compiled.prefix
+    rendered = compiled.render({TODAY: "lundi", "practice": "Dr Martin"})
+    assert rendered.endswith("[PRACTICE] : Dr Martin\n[DATE DU JOUR] : lundi")
+
+
+def test_template_without_placeholder_is_all_prefix():
+    compiled = InstructionCompiler().compile(BODY)
+    assert (compiled.prefix, compiled.suffix) == (BODY, "")
+    assert compiled.render({TODAY: "lundi"}) == BODY
+
+
+def test_compiled_templates_are_reused_and_bounded():
+    compiler = InstructionCompiler(max_entries=2)
+    first = compiler.compile(BODY + "{today}")
+    assert compiler.compile(BODY + "{today}") is first
+    compiler.compile("a {today}")
+    compiler.compile("b {today}")
+    assert compiler.compile(BODY + "{today}") is not first
+    assert (compiler.stats.hits, compiler.stats.misses) == (1, 4)
@@ -0,0 +1,122 @@
+import asyncio
+import datetime
+
+from calendar_api import AvailableSlot, FakeCalendar
+from range_planner import fetch_slots_chunked, fetch_slots_prefix, plan_windows
+
+UTC = datetime.timezone.utc
+START = datetime.datetime(2026, 10, 19, 14, 30, tzinfo=UTC)
+DAY = datetime.timedelta(days=1)
+
+
+class RecordingCalendar(FakeCalendar):
+    """FakeCalendar with a slot every 6 hours, recording the windows it is asked for"""
+
+    def __init__(self, *, days=90, delays=None):
+        slots = [
+            AvailableSlot(start_time=START + datetime.timedelta(hours=h), duration_min=30)
+            for h in range(0, days * 24, 6)
+        ]
+        super().__init__(timezone="Europe/Paris", slots=slots)
+        self.windows = []
+        self.cancelled = 0
+        self._delays = delays or {}
+
+    async def list_available_slots(self, *, start_time, end_time, limit=None):
+        self.windows.append((start_time, end_time))
+        try:
+            await asyncio.sleep(self._delays.get(start_time, 0.0))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return await super().list_available_slots(
+            start_time=start_time, end_time=end_time, limit=limit
+        )
+
+
+def test_chunks_are_aligned_on_utc_midnight():
+    windows = plan_windows(START, START + 20 * DAY, chunk_size=7 * DAY)
+    midnight = datetime.datetime(2026, 10, 19, tzinfo=UTC)
+    assert windows == [
+        (START, midnight + 7 * DAY),
+        (midnight + 7 * DAY, midnight + 14 * DAY),
+        (midnight + 14 * DAY, START + 20 * DAY),
+    ]
+    # a lookup started later the same day shares every chunk but the first
+    later = plan_windows(START + datetime.timedelta(hours=3), START + 20 * DAY)
+    assert later[1:] == windows[1:]
+
+
+def test_short_window_is_a_single_request():
+    async def test():
+        calendar = RecordingCalendar()
+        slots = await fetch_slots_chunked(
+            calendar.list_available_slots, start_time=START, end_time=START + 7 * DAY
+        )
+        assert calendar.windows == [(START, START + 7 * DAY)]
+        assert len(slots) == 28
+
+    asyncio.run(test())
+
+
+def test_chunked_fetch_matches_a_single_request():
+    async def test():
+        calendar = RecordingCalendar()
+        whole = await calendar.list_available_slots(start_time=START, end_time=START + 60 * DAY)
+        calendar.windows.clear()
+        # the first chunk answers last: the merge still follows time order
+        calendar._delays = {START: 0.02}
+        slots = await fetch_slots_chunked(
+            calendar.list_available_slots, start_time=START, end_time=START + 60 * DAY
+        )
+        assert slots == whole
+        assert len(calendar.windows) == 9
+
+    asyncio.run(test())
+
+
+def test_limit_stops_at_the_first_chunks():
+    async def test():
+        calendar = RecordingCalendar()
+        whole = await calendar.list_available_slots(start_time=START, end_time=START + 60 * DAY)
+        calendar.windows.clear()
+        slots = await fetch_slots_chunked(
+            calendar.list_available_slots,
+            start_time=START,
+            end_time=START + 60 * DAY,
+            limit=5,
+            concurrency=1,
+        )
+        assert slots == whole[:5]
+        assert len(calendar.windows) == 1
+
+    asyncio.run(test())
+
+
+def test_prefix_reports_how_far_it_is_known():
+    async def test():
+        calendar = RecordingCalendar()
+        midnight = datetime.datetime(2026, 10, 19, tzinfo=UTC)
+        # the second chunk is slow, later ones are abandoned once the limit is reached
+        calendar._delays = {midnight + 7 * DAY: 0.02, midnight + 14 * DAY: 0.5}
+        slots, covered_until = await fetch_slots_prefix(
+            calendar.list_available_slots,
+            start_time=START,
+            end_time=START + 60 * DAY,
+            limit=40,
+            concurrency=3,
+        )
+        assert covered_until == midnight + 14 * DAY
+        assert len(slots) >= 40
+        assert all(slot.start_time < covered_until for slot in slots)
+        await asyncio.sleep(0)  # let the abandoned chunk see its cancellation
+        assert calendar.cancelled == 1
+
+        # a single request cut by its limit is known up to its last slot
+        slots, covered_until = await fetch_slots_prefix(
+            calendar.list_available_slots, start_time=START, end_time=START + 7 * DAY, limit=3
+        )
+        assert len(slots) == 3
+        assert slots[-1].start_time < covered_until <= slots[-1].start_time + DAY
+
+    asyncio.run(test())
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+from rate_limiter import FileTokenBucket, RateLimitedError, RateLimiter, TokenBucket
+
+
+def _limiter(*, rate: float, burst: int = 1, **options) -> RateLimiter:
+    return RateLimiter("test", TokenBucket(rate=rate, burst=burst), **options)
+
+
+def test_free_token_admits_at_once():
+    limiter = _limiter(rate=1.0, burst=2)
+
+    async def run():
+        await limiter.acquire("slots")
+        await limiter.acquire("slots")
+
+    asyncio.run(run())
+    assert limiter.stats.admitted == 2 and limiter.stats.waited == 0
+
+
+def test_bookings_go_before_availability():
+    limiter = _limiter(rate=20.0, max_wait=1.0)
+    order = []
+
+    async def run():
+        await limiter.acquire("slots")  # the only token
+
+        async def request(operation):
+            await limiter.acquire(operation)
+            order.append(operation)
+
+        lookup = asyncio.create_task(request("slots"))
+        await asyncio.sleep(0)
+        await asyncio.gather(lookup, request("booking"))
+
+    asyncio.run(run())
+    assert order == ["booking", "slots"]
+
+
+def test_availability_wait_is_bounded():
+    limiter = _limiter(rate=1.0, max_wait=0.1)
+
+    async def run():
+        await limiter.acquire("slots")
+        started_at = time.monotonic()
+        with pytest.raises(RateLimitedError):
+            await limiter.acquire("slots")
+        return time.monotonic() - started_at
+
+    assert asyncio.run(run()) < 0.3
+    assert limiter.stats.rejected == 1
+
+
+def test_booking_waits_longer_than_a_lookup():
+    # a token every 0.4 s: too late for a lookup, in time for a booking
+    limiter = _limiter(rate=2.5, max_wait=0.1, booking_max_wait=1.0, booking_send_reserve=0.0)
+
+    async def run():
+        await limiter.acquire("slots")
+        with pytest.raises(RateLimitedError):
+            await limiter.acquire("slots")
+        await limiter.acquire("booking", timeout=1.0)
+
+    asyncio.run(run())
+    assert limiter.stats.waited == 1
+
+
+def test_booking_wait_keeps_time_to_send_it():
+    limiter = _limiter(rate=0.5, booking_max_wait=5.0, booking_send_reserve=0.3)
+
+    async def run():
+        await limiter.acquire("slots")
+        started_at = time.monotonic()
+        with pytest.raises(RateLimitedError):
+            await limiter.acquire("booking", timeout=0.4)
+        return time.monotonic() - started_at
+
+    # rejected 0.3 s before its deadline, not at it
+    assert asyncio.run(run()) < 0.25
+
+
+def test_file_bucket_is_shared(tmp_path):
+    path = str(tmp_path / "calcom.bucket")
+    first = FileTokenBucket(path, rate=0.01, burst=2)
+    second = FileTokenBucket(path, rate=0.01, burst=2)
+    try:
+        assert first.take() == 0
+        assert second.take() == 0
+        assert first.take() > 0 and second.take() > 0
+    finally:
+        first.close()
+        second.close()
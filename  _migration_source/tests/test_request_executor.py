@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from rate_limiter import RateLimiter, TokenBucket
+from request_executor import (
+    CalendarTimeoutError,
+    RequestExecutor,
+    time_remaining,
+    turn_deadline,
+)
+
+
+class Attempts:
+    """An HTTP call answering after the given delays in turn, failing with the given errors"""
+
+    def __init__(self, *delays, errors=()):
+        self._delays = list(delays)
+        self._errors = list(errors)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        call = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self._delays[min(call, len(self._delays) - 1)])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if call < len(self._errors) and self._errors[call] is not None:
+            raise self._errors[call]
+        return call
+
+
+def _executor(**options):
+    return RequestExecutor(retry_base_delay=0.01, hedge_default_delay=0.05, **options)
+
+
+def _http_error(status):
+    request_info = aiohttp.RequestInfo(
+        URL("http://cal.test/slots"), "GET", CIMultiDictProxy(CIMultiDict())
+    )
+    return aiohttp.ClientResponseError(request_info, (), status=status)
+
+
+def test_turn_deadline_nests_to_the_earliest():
+    assert time_remaining() is None
+    with turn_deadline(3.0, reserve=1.0):
+        assert 1.9 < time_remaining() <= 2.0
+        with turn_deadline(10.0, reserve=0.0):
+            assert time_remaining() <= 2.0
+        with turn_deadline(0.5, reserve=0.0):
+            assert time_remaining() <= 0.5
+    assert time_remaining() is None
+
+
+def test_slow_idempotent_call_is_hedged():
+    async def test():
+        executor = _executor()
+        attempt = Attempts(1.0, 0.01)
+        assert await executor.run("slots", attempt, idempotent=True) == 1
+        assert executor.stats.hedges == 1 and executor.stats.hedge_wins == 1
+        await asyncio.sleep(0)
+        assert attempt.cancelled == 1  # the slow primary
+
+    asyncio.run(test())
+
+
+def test_wait_for_a_rate_limit_token_is_not_hedged_nor_timed():
+    async def test():
+        executor = _executor()
+        # one token every 0.2s: the second and third lookups queue longer than the hedge delay
+        limiter = RateLimiter("test", TokenBucket(rate=5.0, burst=1), max_wait=1.0)
+
+        async def admit(timeout):
+            await limiter.acquire("slots", timeout=timeout)
+
+        attempt = Attempts(0.01)
+        results = await asyncio.gather(
+            *(executor.run("slots", attempt, idempotent=True, admit=admit) for _ in range(3))
+        )
+        assert sorted(results) == [0, 1, 2]
+        assert executor.stats.hedges == 0 and limiter.stats.rejected == 0
+        assert executor.latencies.percentile("slots", 100) < 0.1
+
+    asyncio.run(test())
+
+
+def test_hedge_delay_follows_recent_latencies():
+    async def test():
+        executor = _executor(hedge_min_samples=5)
+        for _ in range(5):
+            await executor.run("slots", Attempts(0.1), idempotent=True)
+        hedges = executor.stats.hedges
+        # past the default delay, but within what this operation usually takes
+        assert await executor.run("slots", Attempts(0.07), idempotent=True) == 0
+        assert executor.stats.hedges == hedges
+
+    asyncio.run(test())
+
+
+def test_transient_errors_are_retried_within_the_deadline():
+    async def test():
+        executor = _executor()
+        attempt = Attempts(0.0, errors=[_http_error(503), aiohttp.ClientConnectionError()])
+        assert await executor.run("slots", attempt, idempotent=True) == 2
+        assert executor.stats.retries == 2
+
+        # a 4xx is an answer, not a transient failure
+        attempt = Attempts(0.0, errors=[_http_error(404)])
+        with pytest.raises(aiohttp.ClientResponseError):
+            await executor.run("slots", attempt, idempotent=True)
+        assert attempt.calls == 1
+
+    asyncio.run(test())
+
+
+def test_booking_is_sent_once():
+    async def test():
+        executor = _executor()
+        attempt = Attempts(0.0, errors=[_http_error(503)])
+        with pytest.raises(aiohttp.ClientResponseError):
+            await executor.run("book", attempt, idempotent=False)
+        assert attempt.calls == 1
+
+        attempt = Attempts(1.0)
+        with turn_deadline(0.1, reserve=0.0), pytest.raises(CalendarTimeoutError):
+            await executor.run("book", attempt, idempotent=False)
+        assert attempt.calls == 1 and executor.stats.hedges == 0
+
+    asyncio.run(test())
+
+
+def test_call_ends_at_the_turn_deadline():
+    async def test():
+        executor = _executor()
+        started_at = time.monotonic()
+        with turn_deadline(0.2, reserve=0.0), pytest.raises(CalendarTimeoutError):
+            await executor.run("slots", Attempts(1.0), idempotent=True)
+        assert time.monotonic() - started_at < 0.3
+        assert executor.stats.timeouts == 1
+
+    asyncio.run(test())
@@ -0,0 +1,83 @@
+import datetime
+
+from calendar_api import AvailableSlot
+from slot_cache import SlotCache
+
+START = datetime.datetime(2026, 10, 19, 8, 0, tzinfo=datetime.timezone.utc)
+END = START + datetime.timedelta(days=7)
+SCOPE = ("api-key", 1001)
+
+
+def _slots(count, start=START):
+    return [
+        AvailableSlot(start_time=start + datetime.timedelta(hours=i), duration_min=30)
+        for i in range(count)
+    ]
+
+
+def _cache(now, **options):
+    return SlotCache(clock=lambda: now[0], ttl=30.0, stale_ttl=900.0, **options)
+
+
+def test_window_is_served_until_its_ttl():
+    now = [0.0]
+    cache = _cache(now)
+    assert cache.get(SCOPE, START, END) is None
+    cache.put(SCOPE, START, END, _slots(5))
+
+    now[0] = 29.0
+    assert cache.get(SCOPE, START, END) == _slots(5)
+    # a narrower window of the same entry is trimmed
+    assert cache.get(SCOPE, START, START + datetime.timedelta(hours=2)) is None
+    now[0] = 30.0
+    assert cache.get(SCOPE, START, END) is None
+    assert cache.stats.hits == 1 and cache.stats.misses == 3
+
+
+def test_starts_seconds_apart_share_an_entry():
+    now = [0.0]
+    cache = _cache(now)
+    week = datetime.timedelta(days=7)
+    first, later = START + datetime.timedelta(seconds=10), START + datetime.timedelta(seconds=50)
+    cache.put(SCOPE, *cache.fetch_window(first, first + week), _slots(5))
+    assert cache.get(SCOPE, later, later + week) == _slots(5)[1:]
+
+
+def test_least_recently_used_window_is_evicted():
+    now = [0.0]
+    cache = _cache(now, max_entries=2)
+    days = [START + datetime.timedelta(days=i) for i in range(3)]
+    for day in days[:2]:
+        cache.put(SCOPE, day, day + datetime.timedelta(days=1), _slots(1, day))
+    cache.get(SCOPE, days[0], days[0] + datetime.timedelta(days=1))
+    cache.put(SCOPE, days[2], days[2] + datetime.timedelta(days=1), _slots(1, days[2]))
+
+    assert len(cache) == 2 and cache.stats.evictions == 1
+    assert cache.get(SCOPE, days[1], days[1] + datetime.timedelta(days=1)) is None
+    assert cache.get(SCOPE, days[0], days[0] + datetime.timedelta(days=1)) is not None
+
+
+def test_booking_invalidates_the_windows_holding_the_slot():
+    now = [0.0]
+    cache = _cache(now)
+    week_two = END + datetime.timedelta(days=7)
+    cache.put(SCOPE, START, END, _slots(5))
+    cache.put(SCOPE, END, week_two, _slots(5, END))
+    cache.put(("other-key", 1001), START, END, _slots(5))
+
+    assert cache.invalidate(SCOPE, at=START + datetime.timedelta(hours=1)) == 1
+    assert cache.get(SCOPE, START, END) is None
+    assert cache.get(SCOPE, END, week_two) is not None
+    assert cache.get(("other-key", 1001), START, END) is not None
+
+
+def test_last_known_serves_expired_windows_until_the_stale_ttl():
+    now = [0.0]
+    cache = _cache(now)
+    cache.put(SCOPE, START, END, _slots(5))
+
+    now[0] = 600.0
+    slots, age = cache.last_known(SCOPE, START, START + datetime.timedelta(hours=3))
+    assert slots == _slots(3) and age == 600.0
+    now[0] = 900.0
+    assert cache.last_known(SCOPE, START, END) is None
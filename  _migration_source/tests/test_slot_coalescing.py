@@ -0,0 +1,197 @@
+import asyncio
+import datetime
+
+import pytest
+
+from calendar_api import AvailableSlot, FakeCalendar
+from request_executor import CalendarTimeoutError, turn_deadline
+from slot_coalescing import CoalescingCalendar, SlotLookupCoalescer
+
+START = datetime.datetime(2026, 10, 19, 7, 0, tzinfo=datetime.timezone.utc)
+END = START + datetime.timedelta(days=7)
+
+
+class CountingCalendar(FakeCalendar):
+    """FakeCalendar answering after `latency`, counting its lookups; fails while `error` is set"""
+
+    def __init__(self, *, latency: float = 0.05, error: Exception | None = None) -> None:
+        slots = [
+            AvailableSlot(start_time=START + datetime.timedelta(hours=h), duration_min=30)
+            for h in range(0, 7 * 24, 5)
+        ]
+        super().__init__(timezone="Europe/Paris", slots=slots)
+        self.latency = latency
+        self.error = error
+        self.lookups = 0
+
+    async def list_available_slots(self, *, start_time, end_time, limit=None):
+        self.lookups += 1
+        await asyncio.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return await super().list_available_slots(
+            start_time=start_time, end_time=end_time, limit=limit
+        )
+
+
+def _calendars(upstream, coalescer, count):
+    # one wrapper per session, all on the same upstream availability
+    return [CoalescingCalendar(upstream, key="practice", coalescer=coalescer) for _ in range(count)]
+
+
+def test_concurrent_lookups_share_one_upstream_fetch():
+    upstream = CountingCalendar()
+    coalescer = SlotLookupCoalescer()
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                calendar.list_available_slots(start_time=START, end_time=END)
+                for calendar in _calendars(upstream, coalescer, 20)
+            )
+        )
+
+    results = asyncio.run(run())
+    assert coalescer.stats.upstream_fetches == 1
+    assert coalescer.stats.joined == 19
+    assert upstream.lookups == 1
+    assert all(result == results[0] for result in results) and results[0]
+    assert coalescer.in_flight("practice") == 0
+
+
+def test_covered_window_joins_and_is_trimmed():
+    upstream = CountingCalendar()
+    coalescer = SlotLookupCoalescer()
+    day_end = START + datetime.timedelta(days=1)
+
+    async def run():
+        wide, narrow = _calendars(upstream, coalescer, 2)
+        return await asyncio.gather(
+            wide.list_available_slots(start_time=START, end_time=END),
+            narrow.list_available_slots(start_time=START, end_time=day_end),
+        )
+
+    week, day = asyncio.run(run())
+    assert coalescer.stats.upstream_fetches == 1
+    assert day == [slot for slot in week if slot.start_time < day_end]
+
+
+def test_lookup_past_the_turn_deadline_times_out():
+    upstream = CountingCalendar(latency=0.5)
+    coalescer = SlotLookupCoalescer()
+
+    async def run():
+        calendar = CoalescingCalendar(upstream, key="practice", coalescer=coalescer)
+        with turn_deadline(0.1, reserve=0.0):
+            await calendar.list_available_slots(start_time=START, end_time=END)
+
+    with pytest.raises(CalendarTimeoutError):
+        asyncio.run(run())
+
+
+def test_follower_outlives_a_leader_that_times_out():
+    upstream = CountingCalendar(latency=0.2)
+    coalescer = SlotLookupCoalescer()
+
+    async def run():
+        leader, follower = _calendars(upstream, coalescer, 2)
+
+        async def impatient():
+            with turn_deadline(0.05, reserve=0.0):
+                return await leader.list_available_slots(start_time=START, end_time=END)
+
+        return await asyncio.gather(
+            impatient(),
+            follower.list_available_slots(start_time=START, end_time=END),
+            return_exceptions=True,
+        )
+
+    leader_result, follower_result = asyncio.run(run())
+    assert isinstance(leader_result, CalendarTimeoutError)
+    # the shared request was not cancelled with the leader
+    assert isinstance(follower_result, list) and follower_result
+    assert upstream.lookups == 1
+
+
+def test_failed_fetch_is_not_kept_for_later_lookups():
+    upstream = CountingCalendar(error=ConnectionError("cal.com down"))
+    coalescer = SlotLookupCoalescer()
+
+    async def run():
+        calendars = _calendars(upstream, coalescer, 3)
+        failed = await asyncio.gather(
+            *(c.list_available_slots(start_time=START, end_time=END) for c in calendars),
+            return_exceptions=True,
+        )
+        upstream.error = None
+        retried = await calendars[0].list_available_slots(start_time=START, end_time=END)
+        return failed, retried
+
+    failed, retried = asyncio.run(run())
+    # the callers of the failed request got its error, not a hang
+    assert all(isinstance(result, ConnectionError) for result in failed)
+    # the next lookup starts a new request, and succeeds
+    assert retried
+    assert coalescer.stats.upstream_fetches == 2
+    assert coalescer.in_flight("practice") == 0
+
+
+def test_limited_lookup_reaches_the_calendar_with_its_limit():
+    upstream = CountingCalendar()
+    coalescer = SlotLookupCoalescer()
+    limits = []
+    list_slots = upstream.list_available_slots
+
+    async def recording(*, start_time, end_time, limit=None):
+        limits.append(limit)
+        return await list_slots(start_time=start_time, end_time=end_time, limit=limit)
+
+    upstream.list_available_slots = recording
+
+    async def run():
+        first, second, shorter = _calendars(upstream, coalescer, 3)
+        return await asyncio.gather(
+            first.list_available_slots(start_time=START, end_time=END, limit=5),
+            second.list_available_slots(start_time=START, end_time=END, limit=3),
+            shorter.list_available_slots(
+                start_time=START, end_time=START + datetime.timedelta(hours=12), limit=5
+            ),
+        )
+
+    five, three, half_day = asyncio.run(run())
+    # the later lookups are answered by the first one's request
+    assert limits == [5] and coalescer.stats.joined == 2
+    assert len(five) == 5 and three == five[:3]
+    assert half_day == [s for s in five if s.start_time < START + datetime.timedelta(hours=12)]
+
+
+def test_limited_lookup_joins_a_whole_window_request():
+    upstream = CountingCalendar()
+    coalescer = SlotLookupCoalescer()
+
+    async def run():
+        whole, limited = _calendars(upstream, coalescer, 2)
+        return await asyncio.gather(
+            whole.list_available_slots(start_time=START, end_time=END),
+            limited.list_available_slots(start_time=START, end_time=END, limit=4),
+        )
+
+    week, first = asyncio.run(run())
+    assert coalescer.stats.upstream_fetches == 1
+    assert first == week[:4]
+
+
+def test_lookup_past_a_limited_request_sends_its_own():
+    upstream = CountingCalendar()
+    coalescer = SlotLookupCoalescer()
+
+    async def run():
+        limited, more, whole = _calendars(upstream, coalescer, 3)
+        await asyncio.gather(
+            limited.list_available_slots(start_time=START, end_time=END, limit=3),
+            more.list_available_slots(start_time=START, end_time=END, limit=10),
+            whole.list_available_slots(start_time=START, end_time=END),
+        )
+
+    asyncio.run(run())
+    assert coalescer.stats.upstream_fetches == 3 and coalescer.stats.joined == 0
@@ -0,0 +1,141 @@
+import datetime
+import multiprocessing
+
+from availability_snapshot import AvailabilitySnapshot
+from calendar_api import AvailableSlot
+from slot_holds import BOOKED, CHOSEN, SlotHoldManager
+
+START = datetime.datetime(2026, 10, 19, 8, 0, tzinfo=datetime.timezone.utc)
+SCOPE = ("api-key", 1001)
+SLOTS = [
+    AvailableSlot(start_time=START + datetime.timedelta(minutes=30 * i), duration_min=30)
+    for i in range(12)
+]
+
+
+def _holds(now):
+    return SlotHoldManager(clock=lambda: now[0])
+
+
+def test_a_listing_holds_its_first_three_slots():
+    holds = _holds([0.0])
+    alice, bob = holds.session(), holds.session()
+    alice.offer(SCOPE, SLOTS)
+    assert alice.visible(SCOPE, SLOTS) == SLOTS
+    assert bob.visible(SCOPE, SLOTS) == SLOTS[3:]
+    # another practice is not affected
+    assert bob.visible(("other-key", 1001), SLOTS) == SLOTS
+
+
+def test_a_session_holds_at_most_six_slots():
+    holds = _holds([0.0])
+    alice, bob = holds.session(), holds.session()
+    for listing in (SLOTS[0:], SLOTS[3:], SLOTS[6:]):
+        alice.offer(SCOPE, listing)
+    # the oldest listing's holds were released first
+    assert bob.visible(SCOPE, SLOTS) == SLOTS[:3] + SLOTS[9:]
+    assert len(holds) == 6
+
+
+def test_offered_holds_expire():
+    now = [0.0]
+    holds = _holds(now)
+    alice, bob = holds.session(), holds.session()
+    alice.offer(SCOPE, SLOTS)
+    now[0] = 45.0
+    assert bob.visible(SCOPE, SLOTS) == SLOTS
+    assert holds.stats.expired == 3 and len(holds) == 0
+
+
+def test_a_chosen_slot_is_a_conflict_for_the_others():
+    holds = _holds([0.0])
+    alice, bob = holds.session(), holds.session()
+    alice.offer(SCOPE, SLOTS)
+    # an offered slot can still be chosen by another session: first to choose wins
+    assert bob.choose(SCOPE, SLOTS[0]) is None
+    assert holds.stats.taken_over == 1
+    assert alice.choose(SCOPE, SLOTS[0]) == CHOSEN
+    assert alice.visible(SCOPE, SLOTS[:1]) == []
+
+    # the booking failed: the slot is free again
+    bob.release(SCOPE, SLOTS[0])
+    assert alice.choose(SCOPE, SLOTS[0]) is None
+
+
+def test_a_booked_slot_is_hidden_from_every_session():
+    now = [0.0]
+    holds = _holds(now)
+    alice, bob = holds.session(), holds.session()
+    assert alice.choose(SCOPE, SLOTS[0]) is None
+    alice.booked(SCOPE, SLOTS[0])
+    assert alice.visible(SCOPE, SLOTS[:1]) == [] and bob.visible(SCOPE, SLOTS[:1]) == []
+    assert bob.choose(SCOPE, SLOTS[0]) == BOOKED
+    assert alice.choose(SCOPE, SLOTS[0]) == BOOKED
+    # until the availability of every session has been refreshed
+    now[0] = 120.0
+    assert bob.visible(SCOPE, SLOTS[:1]) == SLOTS[:1]
+
+
+def test_hang_up_releases_offered_and_chosen_holds():
+    holds = _holds([0.0])
+    alice, bob = holds.session(), holds.session()
+    alice.offer(SCOPE, SLOTS)
+    alice.choose(SCOPE, SLOTS[5])
+    alice.booked(SCOPE, SLOTS[6])
+    assert alice.release_all() == 4
+    assert bob.visible(SCOPE, SLOTS) == SLOTS[:6] + SLOTS[7:]
+
+
+def test_slots_of_different_calendars_are_held_apart():
+    holds = _holds([0.0])
+    alice, bob = holds.session(), holds.session()
+    martin = AvailableSlot(start_time=START, duration_min=30, calendar="Dr Martin")
+    petit = AvailableSlot(start_time=START, duration_min=30, calendar="Dr Petit")
+    assert alice.choose(SCOPE, martin) is None
+    assert bob.choose(SCOPE, petit) is None
+
+
+def _hold_in_another_process(path, chosen):
+    holds = SlotHoldManager(store=AvailabilitySnapshot(path)).session()
+    holds.offer(SCOPE, SLOTS)
+    assert holds.choose(SCOPE, SLOTS[chosen]) is None
+
+
+def test_holds_are_shared_across_real_processes(tmp_path):
+    path = str(tmp_path / "availability.db")
+    process = multiprocessing.get_context("spawn").Process(
+        target=_hold_in_another_process, args=(path, 5)
+    )
+    process.start()
+    process.join(60)
+    assert process.exitcode == 0
+
+    holds = SlotHoldManager(store=AvailabilitySnapshot(path))
+    bob = holds.session()
+    # the other call's listing and choice, as if it ran in this process
+    assert bob.visible(SCOPE, SLOTS) == SLOTS[3:5] + SLOTS[6:]
+    assert bob.choose(SCOPE, SLOTS[5]) == CHOSEN
+    assert bob.choose(SCOPE, SLOTS[0]) is None and holds.stats.taken_over == 1
+    bob.booked(SCOPE, SLOTS[0])
+    assert SlotHoldManager(store=AvailabilitySnapshot(path)).session().choose(
+        SCOPE, SLOTS[0]
+    ) == BOOKED
+
+
+def test_shared_holds_expire_and_are_released_like_local_ones(tmp_path):
+    now = [0.0]
+    snapshot = AvailabilitySnapshot(str(tmp_path / "availability.db"))
+    holds = SlotHoldManager(store=snapshot, clock=lambda: now[0])
+    alice, bob = holds.session(), holds.session()
+    for listing in (SLOTS[0:], SLOTS[3:], SLOTS[6:]):
+        alice.offer(SCOPE, listing)
+    assert bob.visible(SCOPE, SLOTS) == SLOTS[:3] + SLOTS[9:]
+    alice.choose(SCOPE, SLOTS[11])
+    alice.booked(SCOPE, SLOTS[10])
+    assert alice.release_all() == 7
+    assert bob.visible(SCOPE, SLOTS) == SLOTS[:10] + SLOTS[11:]
+    now[0] = 120.0
+    assert bob.visible(SCOPE, SLOTS) == SLOTS
+    assert len(holds) == 0 and holds.stats.expired == 1
+    # only digests of the scopes are written
+    assert b"api-key" not in b"".join(p.read_bytes() for p in tmp_path.iterdir())
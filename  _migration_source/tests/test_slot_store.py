@@ -0,0 +1,70 @@
+import datetime
+from zoneinfo import ZoneInfo
+
+from calendar_api import AvailableSlot
+from slot_store import SlotStore
+
+PARIS = ZoneInfo("Europe/Paris")
+START = datetime.datetime(2026, 10, 19, 9, 0, tzinfo=PARIS)
+HOUR = datetime.timedelta(hours=1)
+
+
+def _slots(count, start=START, calendar=None):
+    return [
+        AvailableSlot(start_time=start + i * HOUR, duration_min=30, calendar=calendar)
+        for i in range(count)
+    ]
+
+
+def test_window_is_sorted_and_in_the_store_timezone():
+    slots = _slots(10)
+    store = SlotStore(reversed(slots), tz=PARIS)
+    assert store.window(START, START + 10 * HOUR) == slots
+    assert store.window(START + HOUR, START + 4 * HOUR) == slots[1:4]
+    assert store.window(START, START + 10 * HOUR, limit=3) == slots[:3]
+    assert store.count(START + HOUR, START + 4 * HOUR) == 3
+    assert store.window(START, START + HOUR)[0].start_time.tzinfo == PARIS
+    # a window starting within a second after a slot excludes it
+    assert store.window(START + datetime.timedelta(milliseconds=1), START + HOUR) == []
+
+
+def test_calendars_are_kept():
+    martin, petit = _slots(2, calendar="Dr Martin"), _slots(2, calendar="Dr Petit")
+    store = SlotStore(martin + petit, tz=PARIS)
+    assert sorted(s.calendar for s in store.window(START, START + HOUR)) == [
+        "Dr Martin",
+        "Dr Petit",
+    ]
+    store.remove(START)  # every slot starting then
+    assert len(store) == 2
+
+
+def test_removed_slots_are_skipped_then_compacted():
+    store = SlotStore(_slots(10), tz=PARIS)
+    assert store.remove(START + 2 * HOUR)
+    assert not store.remove(START + 2 * HOUR)
+    assert not store.remove(START + 30 * HOUR)
+    assert len(store) == 9
+    assert store.count(START, START + 10 * HOUR) == 9
+    assert START + 2 * HOUR not in [s.start_time for s in store]
+    # tombstones stay until they are half of the entries
+    assert len(store._starts) == 10
+
+    for i in range(3, 8):
+        store.remove(START + i * HOUR)
+    assert len(store._starts) == len(store) == 4
+    assert store.window(START, START + 10 * HOUR) == [
+        s for i, s in enumerate(_slots(10)) if i < 2 or i >= 8
+    ]
+
+
+def test_replace_swaps_only_the_window():
+    store = SlotStore(_slots(10), tz=PARIS)
+    store.remove(START + 4 * HOUR)
+    refetched = _slots(2, start=START + 3 * HOUR + datetime.timedelta(minutes=30))
+    # slots outside the window are ignored
+    store.replace(START + 3 * HOUR, START + 6 * HOUR, refetched + _slots(1, START + 8 * HOUR))
+    assert store.window(START, START + 10 * HOUR) == (
+        _slots(3) + refetched + _slots(10)[6:]
+    )
+    assert len(store) == 9
@@ -0,0 +1,87 @@
+import datetime
+import json
+
+import pytest
+
+from slots_decoder import SlotsDecoder, parse_utc_timestamp
+
+UTC = datetime.timezone.utc
+START = datetime.datetime(2026, 10, 19, 8, 0, tzinfo=UTC)
+
+
+def _body(days=5, per_day=16, **extra):
+    data = {}
+    for day in range(days):
+        day_start = START + datetime.timedelta(days=day)
+        data[day_start.date().isoformat()] = [
+            {"start": f"{day_start + datetime.timedelta(minutes=30 * i):%Y-%m-%dT%H:%M:%S}.000Z"}
+            for i in range(per_day)
+        ]
+    return json.dumps({"status": "success", "data": data, **extra}, indent=1).encode()
+
+
+def _starts(days=5, per_day=16):
+    return [
+        int((START + datetime.timedelta(days=day, minutes=30 * i)).timestamp())
+        for day in range(days)
+        for i in range(per_day)
+    ]
+
+
+def _decode(body, *, chunk=7, start=START, end=None, limit=None):
+    end = end or START + datetime.timedelta(days=30)
+    decoder = SlotsDecoder(start_ts=start.timestamp(), end_ts=end.timestamp(), limit=limit)
+    fed = 0
+    while fed < len(body) and not decoder.done:
+        decoder.feed(body[fed : fed + chunk])
+        fed += chunk
+    return decoder.close(), fed, decoder
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64, 1 << 20])
+def test_decodes_any_chunking(chunk):
+    starts, _, _ = _decode(_body(), chunk=chunk)
+    assert starts == _starts()
+
+
+def test_keeps_only_the_window():
+    start = START + datetime.timedelta(hours=3)
+    end = START + datetime.timedelta(days=2, hours=1)
+    starts, _, _ = _decode(_body(), start=start, end=end)
+    assert starts == [ts for ts in _starts() if start.timestamp() <= ts < end.timestamp()]
+
+
+def test_limit_stops_reading_the_body():
+    body = _body(days=30)
+    starts, fed, decoder = _decode(body, limit=20)
+    assert starts == _starts(days=2)[:20]
+    assert decoder.done and fed < len(body) / 10
+
+
+def test_slot_past_the_window_stops_reading_the_body():
+    body = _body(days=30)
+    starts, fed, _ = _decode(body, end=START + datetime.timedelta(days=1))
+    assert starts == _starts(days=1)
+    assert fed < len(body) / 10
+
+
+def test_out_of_order_days_are_sorted_and_read_to_the_end():
+    first, second = json.loads(_body(days=2))["data"].items()
+    body = json.dumps({"data": dict([second, first])}).encode()
+    starts, fed, _ = _decode(body, limit=20)
+    assert fed >= len(body)
+    assert starts == _starts(days=2)[:20]
+
+
+def test_malformed_bodies_are_rejected():
+    for body in (b'{"data": {"2026-10-19": [{"start": "2026-', b'{"status": "error"}', b"[]"):
+        with pytest.raises(ValueError):
+            _decode(body)
+
+
+def test_timestamps_with_an_offset():
+    assert parse_utc_timestamp("2026-10-19T08:00:00.000Z") == int(START.timestamp())
+    assert parse_utc_timestamp("2026-10-19T10:00:00+02:00") == int(START.timestamp())
+    assert parse_utc_timestamp("2026-10-19T03:30:00-04:30") == int(START.timestamp())
+    with pytest.raises(ValueError):
+        parse_utc_timestamp("2026-10-19T08:00:00")
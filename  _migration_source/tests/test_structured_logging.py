@@ -0,0 +1,79 @@
+import logging
+import threading
+
+import structured_logging
+
+
+class Rendered:
+    """Field value counting how often it is rendered"""
+
+    def __init__(self, text):
+        self.text = text
+        self.renders = 0
+
+    def __repr__(self):
+        self.renders += 1
+        return self.text
+
+
+class Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        self.threads.append(threading.current_thread())
+
+
+def _logger(name, level):
+    handler = Records()
+    stdlib_logger = logging.getLogger(name)
+    stdlib_logger.setLevel(level)
+    stdlib_logger.handlers = [handler]
+    stdlib_logger.propagate = False
+    return structured_logging.get_logger(name), handler
+
+
+def test_fields_are_rendered_only_when_the_record_is_emitted():
+    logger, handler = _logger("test.lazy", logging.INFO)
+    body = Rendered("{}")
+    logger.debug("📡 response", body=body)
+    assert body.renders == 0 and handler.messages == []
+
+    logger.info("📡 response", status=200, body=body)
+    assert handler.messages == ["📡 response status=200 body={}"]
+    assert body.renders == 1
+
+
+def test_long_fields_are_truncated_above_debug():
+    logger, handler = _logger("test.truncate", logging.DEBUG)
+    body = "x" * 500
+    logger.info("payload", body=body)
+    logger.debug("payload", body=body)
+    info, debug = handler.messages
+    assert info == f"payload body={'x' * 200}… (500 chars)"
+    assert debug == f"payload body={body}"
+
+
+def test_levels_are_parsed_per_module():
+    assert structured_logging.parse_levels("cal.com=warning, zora-agent.chat=DEBUG,bad,=INFO") == {
+        "cal.com": "WARNING",
+        "zora-agent.chat": "DEBUG",
+    }
+
+
+def test_records_are_written_by_the_listener_thread(monkeypatch):
+    handler = Records()
+    monkeypatch.setattr(logging.getLogger(), "handlers", [handler])
+    structured_logging.configure_logging({"test.queued": "INFO"})
+    try:
+        logger = structured_logging.get_logger("test.queued")
+        logger.debug("dropped")
+        logger.info("🔍 lookup", days=14)
+    finally:
+        structured_logging.shutdown_logging()
+
+    assert handler.messages == ["🔍 lookup days=14"]
+    assert handler.threads[0] is not threading.current_thread()
@@ -0,0 +1,120 @@
+import asyncio
+import datetime
+import types
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import zora_agent
+from assistant_config import ConfigUnavailableError
+from calendar_api import CalendarUnavailableError, FakeCalendar, UnavailableCalendar
+from request_executor import turn_deadline
+
+
+def test_prewarm_runs_without_a_job_context(monkeypatch):
+    # the logging setup moves the root handlers, pytest's included
+    monkeypatch.setattr(zora_agent.structured_logging, "configure_logging", lambda: None)
+
+    proc = types.SimpleNamespace(userdata={})
+    zora_agent.prewarm(proc)
+    assert isinstance(proc.userdata["vad"], zora_agent.silero.VAD)
+    # needs the job context: built by the entrypoint
+    assert "turn_detector" not in proc.userdata
+
+
+def test_failed_config_fetch_never_falls_back_to_fake_slots(monkeypatch):
+    async def unavailable(assistant_id):
+        raise ConfigUnavailableError("timeout")
+
+    monkeypatch.setenv("ASSISTANT_ID", "a-1")
+    monkeypatch.delenv("CAL_API_KEY", raising=False)
+    monkeypatch.setattr(zora_agent, "get_assistant_calcom_config", unavailable)
+
+    async def test():
+        cal = await zora_agent.setup_calendar("Europe/Paris")
+        assert isinstance(cal, UnavailableCalendar)
+        now = datetime.datetime.now(ZoneInfo("Europe/Paris"))
+        with pytest.raises(CalendarUnavailableError):
+            await cal.list_available_slots(start_time=now, end_time=now + datetime.timedelta(days=1))
+        with pytest.raises(CalendarUnavailableError):
+            await cal.schedule_appointment(start_time=now, attendee_email="a@b.c", user_name="A")
+
+    asyncio.run(test())
+
+    # an assistant without Cal.com configuration: the test calendar, as before
+    async def not_configured(assistant_id):
+        return None
+
+    monkeypatch.setattr(zora_agent, "get_assistant_calcom_config", not_configured)
+    monkeypatch.setattr(zora_agent.shared_config_loader, "start_watching", lambda: None)
+    assert isinstance(asyncio.run(zora_agent.setup_calendar("Europe/Paris")), FakeCalendar)
+
+
+def _prefetch(calendar, days=14):
+    async def _ready():
+        return calendar
+
+    return zora_agent.SlotPrefetch.start(_ready(), tz=ZoneInfo("Europe/Paris"), days=days)
+
+
+def test_prefetch_serves_the_default_window():
+    async def test():
+        calendar = FakeCalendar(timezone="Europe/Paris")
+        prefetch = _prefetch(calendar)
+        slots = await prefetch.take()
+        assert slots == await calendar.list_available_slots(
+            start_time=prefetch.start_time, end_time=prefetch.end_time
+        )
+        assert prefetch.end_time - prefetch.start_time == datetime.timedelta(days=14)
+
+    asyncio.run(test())
+
+
+def test_prefetch_falls_back_when_empty_failed_or_old(monkeypatch):
+    class BrokenCalendar(FakeCalendar):
+        async def list_available_slots(self, *, start_time, end_time, limit=None):
+            raise CalendarUnavailableError("cal.com down")
+
+    async def test():
+        assert await _prefetch(FakeCalendar(timezone="Europe/Paris", slots=[])).take() is None
+        assert await _prefetch(BrokenCalendar(timezone="Europe/Paris", slots=[])).take() is None
+
+        prefetch = _prefetch(FakeCalendar(timezone="Europe/Paris"))
+        await prefetch.task
+        monkeypatch.setattr(zora_agent, "SLOT_PREFETCH_MAX_AGE", datetime.timedelta(0))
+        assert await prefetch.take() is None
+
+    asyncio.run(test())
+
+
+def test_prefetch_waits_no_longer_than_the_turn():
+    class SlowCalendar(FakeCalendar):
+        async def list_available_slots(self, *, start_time, end_time, limit=None):
+            await asyncio.sleep(1.0)
+            return await super().list_available_slots(start_time=start_time, end_time=end_time)
+
+    async def test():
+        prefetch = _prefetch(SlowCalendar(timezone="Europe/Paris"))
+        with turn_deadline(0.05, reserve=0.0):
+            assert await prefetch.take() is None
+        # the prefetch itself keeps running for a later lookup
+        assert not prefetch.task.done()
+        prefetch.cancel()
+
+    asyncio.run(test())
+
+
+def test_past_day_is_rejected_before_any_fetch():
+    class _Calendar(FakeCalendar):
+        async def list_available_slots(self, *, start_time, end_time, limit=None):
+            raise AssertionError("a past day must not reach the calendar")
+
+    agent = zora_agent.ZoraAgent(timezone="Europe/Paris")
+    ctx = types.SimpleNamespace(userdata=zora_agent.Userdata(cal=_Calendar(timezone="Europe/Paris")))
+    yesterday = datetime.datetime.now(ZoneInfo("Europe/Paris")).date() - datetime.timedelta(days=1)
+
+    async def test():
+        with pytest.raises(zora_agent.ToolError, match="déjà passé"):
+            await agent.list_available_slots(ctx, day=yesterday.isoformat())
+
+    asyncio.run(test())
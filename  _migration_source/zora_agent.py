@@ -1,23 +1,55 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import datetime
 import logging
 import os
 import sys
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
+from collections.abc import Awaitable, Hashable
 from typing import Literal
 from zoneinfo import ZoneInfo
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from calendar_api import AvailableSlot, CalComCalendar, Calendar, FakeCalendar, SlotUnavailableError
+import availability_summary
+import observability
+import structured_logging
+from assistant_config import ConfigUnavailableError, shared_config_loader
+from availability_index import AvailabilityIndex, ListedSlots
+from booking_queue import BookingQueuedError, shared_booking_queues
+from call_records import CallRecorder, shared_call_records
+from calendar_api import (
+    BASE_URL,
+    AvailableSlot,
+    CalComCalendar,
+    Calendar,
+    CalendarTimeoutError,
+    CalendarUnavailableError,
+    FakeCalendar,
+    SlotUnavailableError,
+    UnavailableCalendar,
+)
+from composite_calendar import CompositeCalendar
+from http_pool import shared_http_pool
+from prompt_compiler import TODAY, shared_instruction_compiler
+from rate_limiter import RateLimitedError
+from request_executor import time_remaining, turn_deadline
+from slot_coalescing import CoalescingCalendar
+from slot_holds import SessionHolds, shared_slot_holds
+from state_dir import state_path
 from dotenv import load_dotenv
 
 from livekit.agents import (
     Agent,
     AgentSession,
+    ChatMessage,
+    ConversationItemAddedEvent,
+    FunctionToolsExecutedEvent,
     JobContext,
+    JobProcess,
     MetricsCollectedEvent,
     RunContext,
     ToolError,
@@ -29,67 +61,124 @@ from livekit.agents import (
 from livekit.plugins import elevenlabs, deepgram, openai, silero
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
-# Import Supabase client
-try:
-    from supabase import create_client, Client
-except ImportError:
-    logger.warning("⚠️ Bibliothèque supabase-py non installée, configuration Cal.com indisponible")
-    create_client = None
-
 
 load_dotenv()
 
 
 logger = logging.getLogger("zora-agent")
+# chemins chauds (outils, transcription) : champs formatés hors de la boucle, seulement si émis
+tool_logger = structured_logging.get_logger("zora-agent.tools")
+chat_logger = structured_logging.get_logger("zora-agent.chat")
 
 
 async def get_assistant_calcom_config(assistant_id: str) -> dict | None:
     """
     Récupère la configuration Cal.com d'un assistant depuis Supabase
 
+    La configuration est mise en cache par processus worker (voir `AssistantConfigLoader`) :
+    seul le premier appel d'un assistant attend Supabase.
+
     Args:
         assistant_id: L'ID de l'assistant
 
     Returns:
         Configuration Cal.com ou None si non configuré
+
+    Raises:
+        ConfigUnavailableError: la configuration n'a pas pu être récupérée
     """
-    try:
-        # Vérifier si supabase est disponible
-        if create_client is None:
-            logger.warning("⚠️ Bibliothèque supabase-py non disponible")
-            return None
+    return await shared_config_loader.get_calcom_config(assistant_id)
 
-        # Créer le client Supabase
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_ANON_KEY")
 
-        if not supabase_url or not supabase_key:
-            logger.warning("⚠️ Variables d'environnement Supabase manquantes")
-            return None
+# Période de recherche (en jours) pour chaque valeur de `range` de list_available_slots
+RANGE_DAYS = {
+    "default": 14,
+    "+2week": 14,
+    "+1month": 30,
+    "+3month": 90,
+}
+
+# moments de la journée acceptés par list_available_slots (voir availability_summary.DAY_PARTS)
+DayPart = Literal["matin", "après-midi", "soir"]
+
+# au-delà, les créneaux préchargés au début de l'appel ne sont plus utilisés
+SLOT_PREFETCH_MAX_AGE = datetime.timedelta(minutes=5)
+
+# créneaux proches proposés quand un autre appel vient de retenir le créneau choisi
+CONFLICT_ALTERNATIVES = 3
+
+# silence acceptable pendant une réservation (annoncée à l'utilisateur, non relancée en cas
+# de lenteur) : plus long que le budget d'un tour ordinaire
+BOOKING_LATENCY_BUDGET_S = 8.0
+
+# métriques Prometheus des processus des jobs, dans le répertoire d'état du worker (à défaut de
+# PROMETHEUS_MULTIPROC_DIR)
+PROMETHEUS_MULTIPROC_DIR_NAME = "prometheus"
+
+
+@dataclass
+class SlotPrefetch:
+    """Créneaux de la période par défaut, demandés dès l'arrivée du job"""
 
-        supabase: Client = create_client(supabase_url, supabase_key)
+    start_time: datetime.datetime
+    end_time: datetime.datetime
+    task: asyncio.Task[list[AvailableSlot]]
 
-        # Appeler la fonction Supabase
-        response = await supabase.functions.invoke('get-assistant-calcom-config', {
-            'body': { 'assistantId': assistant_id }
-        })
+    @classmethod
+    def start(
+        cls, calendar: Awaitable[Calendar], *, tz: ZoneInfo, days: int
+    ) -> SlotPrefetch:
+        start_time = datetime.datetime.now(tz)
+        end_time = start_time + datetime.timedelta(days=days)
 
-        if response.error:
-            logger.error(f"❌ Erreur récupération config Cal.com: {response.error}")
+        async def _fetch() -> list[AvailableSlot]:
+            cal = CoalescingCalendar(await calendar)
+            return await cal.list_available_slots(start_time=start_time, end_time=end_time)
+
+        task = asyncio.create_task(_fetch())
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return cls(start_time=start_time, end_time=end_time, task=task)
+
+    @property
+    def age(self) -> datetime.timedelta:
+        return datetime.datetime.now(self.start_time.tzinfo) - self.start_time
+
+    async def take(self) -> list[AvailableSlot] | None:
+        """Créneaux préchargés pour [start_time, end_time), ou None s'ils sont trop anciens"""
+        if self.age > SLOT_PREFETCH_MAX_AGE:
             return None
 
-        data = response.data
-        if data and data.get('calcomConfig'):
-            calcom_config = data['calcomConfig']
-            logger.info("✅ Configuration Cal.com récupérée depuis Supabase")
-            return calcom_config
-        else:
-            logger.info("ℹ️ Aucune configuration Cal.com trouvée")
+        try:
+            # dans un tour, n'attend pas au-delà de l'échéance du tour
+            slots = await asyncio.wait_for(asyncio.shield(self.task), time_remaining())
+        except Exception as e:
+            logger.warning(f"⚠️ Préchargement des créneaux échoué: {e}")
             return None
 
-    except Exception as e:
-        logger.error(f"❌ Erreur lors de la récupération de la config Cal.com: {e}")
-        return None
+        # une liste vide peut masquer une erreur du calendrier : on redemande dans ce cas
+        return slots or None
+
+    def cancel(self) -> None:
+        self.task.cancel()
+
+
+@dataclass
+class Userdata:
+    cal: Calendar
+    slots_prefetch: SlotPrefetch | None = None
+    availability: AvailabilityIndex = field(default_factory=AvailabilityIndex)
+    records: CallRecorder | None = None
+    # créneaux retenus par cet appel, partagés avec les autres appels du worker
+    holds: SessionHolds = field(default_factory=shared_slot_holds.session)
+
+    @property
+    def hold_scope(self) -> Hashable:
+        # les appels qui consultent les mêmes disponibilités se voient leurs créneaux retenus
+        return getattr(self.cal, "availability_scope", None) or id(self.cal)
+
+    def record_booking(self, start_time: datetime.datetime, outcome: str) -> None:
+        if self.records is not None:
+            self.records.booking(start_time, outcome)
 
 
 class ZoraAgent(Agent):
@@ -102,20 +191,19 @@ class ZoraAgent(Agent):
         self.tz = ZoneInfo(timezone)
         today = datetime.datetime.now(self.tz).strftime("%A %d %B %Y")
 
-        # Prompt par défaut ou personnalisé
-        if custom_prompt:
-            instructions = custom_prompt.replace("{today}", today)
-        else:
-            instructions = self._get_default_prompt(today)
-
-        super().__init__(instructions=instructions)
-        self._slots_map: dict[str, AvailableSlot] = {}
+        # Prompt par défaut ou personnalisé, compilé une fois par worker : la date ne figure
+        # qu'à la fin, le début des instructions reste identique d'un appel (et d'un jour) à
+        # l'autre et profite du cache de préfixe du fournisseur LLM
+        instructions = shared_instruction_compiler.compile(
+            custom_prompt or self._get_default_prompt()
+        )
+        super().__init__(instructions=instructions.render({TODAY: today}))
+        self._slots_map = ListedSlots()
 
-    def _get_default_prompt(self, today: str) -> str:
-        """Prompt par défaut optimisé pour le MVP Zora24.ai"""
+    def _get_default_prompt(self) -> str:
+        """Prompt par défaut optimisé pour le MVP Zora24.ai (`{today}` remplacé au rendu)"""
         return (
             f"Tu es Zora, l'assistante vocale intelligente de Zora24.ai. "
-            f"Nous sommes le {today}. "
             f"Tu es spécialisée dans la prise de rendez-vous et tu t'exprimes exclusivement en français. "
             f"Tu es professionnelle, courtoise et efficace. "
             f"\n\n"
@@ -137,6 +225,7 @@ class ZoraAgent(Agent):
             f"- Collecter UNIQUEMENT le nom complet et le numéro de téléphone (PAS d'email)"
             f"- Rester naturel et conversationnel en français"
             f"- Si un créneau n'est plus disponible, proposer immédiatement des alternatives"
+            "\n\nNous sommes le {today}."
         )
 
     async def start(self, ctx: AgentSession) -> None:
@@ -149,6 +238,7 @@ class ZoraAgent(Agent):
         )
 
     @function_tool
+    @observability.traced_tool
     async def schedule_appointment(
         self,
         ctx: RunContext[Userdata],
@@ -165,7 +255,19 @@ class ZoraAgent(Agent):
             user_phone_number: Le numéro de téléphone de l'utilisateur
         """
         if not (slot := self._slots_map.get(slot_id)):
-            raise ToolError(f"Erreur : le créneau {slot_id} n'a pas été trouvé")
+            # créneau d'une liste plus ancienne : retrouvé dans les disponibilités déjà connues
+            if not (slot := ctx.userdata.availability.find(slot_id)):
+                raise ToolError(f"Erreur : le créneau {slot_id} n'a pas été trouvé")
+            self._slots_map.add(slot)
+
+        holds, scope = ctx.userdata.holds, ctx.userdata.hold_scope
+        if holds.choose(scope, slot) is not None:
+            # un autre appel réserve (ou vient de réserver) ce créneau : conflit réglé ici,
+            # sans aller-retour vers le calendrier
+            ctx.userdata.availability.discard(slot.start_time)
+            tool_logger.info("🔒 Créneau retenu par un autre appel", start=slot.start_time)
+            ctx.userdata.record_booking(slot.start_time, "held")
+            raise ToolError(self._taken_message(ctx.userdata, slot))
 
         ctx.disallow_interruptions()
         
@@ -176,15 +278,24 @@ class ZoraAgent(Agent):
             timestamp = int(datetime.datetime.now().timestamp())
             temp_email = f"{name_clean}_{timestamp}@temp.zora24.ai"
             
-            logger.info(f"📅 Tentative de réservation - Nom: {user_name}, Tél: {user_phone_number}")
-            logger.info(f"📧 Email temporaire généré: {temp_email}")
-            
-            await ctx.userdata.cal.schedule_appointment(
-                start_time=slot.start_time,
-                attendee_email=temp_email,
+            tool_logger.info(
+                "📅 Tentative de réservation",
                 user_name=user_name,
+                phone=user_phone_number,
+                email=temp_email,
             )
             
+            with turn_deadline(BOOKING_LATENCY_BUDGET_S):
+                # réservé sur le calendrier qui a proposé le créneau (plusieurs praticiens)
+                await ctx.userdata.cal.schedule_appointment(
+                    start_time=slot.start_time,
+                    attendee_email=temp_email,
+                    user_name=user_name,
+                    calendar=slot.calendar,
+                )
+            ctx.userdata.availability.discard(slot.start_time)
+            holds.booked(scope, slot)
+            
             # Formatage de la confirmation en français
             local = slot.start_time.astimezone(self.tz)
             appointment_details = local.strftime("%A %d %B %Y à %H:%M")
@@ -195,93 +306,254 @@ class ZoraAgent(Agent):
                 f"À bientôt !"
             )
                 
-            logger.info(f"✅ Rendez-vous confirmé : {appointment_details}")
+            tool_logger.info("✅ Rendez-vous confirmé", start=appointment_details)
+            ctx.userdata.record_booking(slot.start_time, "confirmed")
             return confirmation_message
             
         except SlotUnavailableError:
+            ctx.userdata.availability.discard(slot.start_time)
+            holds.booked(scope, slot)
+            ctx.userdata.record_booking(slot.start_time, "unavailable")
             raise ToolError("Ce créneau n'est malheureusement plus disponible. Puis-je vous proposer d'autres options ?")
+        except BookingQueuedError:
+            # calendrier indisponible : la réservation sera envoyée dès son retour
+            ctx.userdata.availability.discard(slot.start_time)
+            holds.booked(scope, slot)
+            local = slot.start_time.astimezone(self.tz)
+            tool_logger.warning("📥 Réservation mise en attente", start=slot.start_time)
+            ctx.userdata.record_booking(slot.start_time, "queued")
+            return (
+                f"C'est noté {user_name} : votre demande pour le "
+                f"{local.strftime('%A %d %B %Y à %H:%M')} est enregistrée. Le calendrier est "
+                f"momentanément indisponible, le rendez-vous sera confirmé dès son retour. "
+                f"Nous avons bien noté votre numéro : {user_phone_number}."
+            )
+        except RateLimitedError:
+            # réservation non envoyée (trop de demandes en même temps) : le créneau reste libre
+            holds.release(scope, slot)
+            tool_logger.warning("🚦 Réservation non envoyée, limite de requêtes atteinte")
+            ctx.userdata.record_booking(slot.start_time, "rate_limited")
+            raise ToolError(
+                "Le calendrier reçoit beaucoup de demandes en ce moment : la réservation n'a pas "
+                "encore pu être envoyée. Proposer à l'utilisateur de réessayer dans quelques "
+                "secondes, sur le même créneau."
+            )
+        except CalendarTimeoutError:
+            # la réservation a pu être enregistrée : ne pas la renvoyer une seconde fois
+            ctx.userdata.availability.discard(slot.start_time)
+            holds.booked(scope, slot)
+            tool_logger.error("⏱️ Réservation sans réponse du calendrier", start=slot.start_time)
+            ctx.userdata.record_booking(slot.start_time, "unconfirmed")
+            raise ToolError(
+                "Le calendrier n'a pas confirmé la réservation à temps : elle a peut-être été "
+                "enregistrée. Ne pas réserver à nouveau ce créneau ; proposer à l'utilisateur "
+                "une confirmation ultérieure."
+            )
         except Exception as e:
-            logger.error(f"❌ Erreur lors de la réservation: {e}")
+            holds.release(scope, slot)
+            tool_logger.error("❌ Erreur lors de la réservation", error=str(e))
+            ctx.userdata.record_booking(slot.start_time, "failed")
             raise ToolError("Je rencontre un problème technique. Pouvez-vous réessayer dans un moment ?")
 
     @function_tool
+    @observability.traced_tool
     async def list_available_slots(
         self, 
         ctx: RunContext[Userdata], 
-        range: Literal["+2week", "+1month", "+3month", "default"] = "default"
+        range: Literal["+2week", "+1month", "+3month", "default"] = "default",
+        day: str | None = None,
+        part_of_day: DayPart | None = None,
     ) -> str:
         """
-        Lister les créneaux disponibles dans la période demandée.
+        Consulter les créneaux disponibles.
         
-        Format de retour : <slot_id> – <Jour>, <Date> à <Heure> (<relatif>)
+        Sans filtre : résumé par jour et moment de la journée (nombre de créneaux et quelques
+        identifiants). Avec `day` et/ou `part_of_day` : tous les créneaux correspondants, chacun
+        avec son identifiant.
+        
+        Format de retour : - <Jour> : <moment> <nombre> (<slot_id> <Heure>, ...) ou
+        - <Jour> : <slot_id> <Heure>, ...
         
         Args:
             range: Période de recherche des créneaux libres
+            day: Jour précis (AAAA-MM-JJ, nom du jour comme "jeudi", "demain")
+            part_of_day: Moment de la journée
         """
         now = datetime.datetime.now(self.tz)
         
-        # Déterminer la période de recherche
-        range_mapping = {
-            "default": 14,
-            "+2week": 14,
-            "+1month": 30,
-            "+3month": 90
-        }
-        range_days = range_mapping.get(range, 14)
-        
-        logger.info(f"🔍 Recherche des créneaux sur {range_days} jours")
+        # Déterminer la période de recherche : la période demandée, ou le jour précisé
+        range_days = RANGE_DAYS.get(range, 14)
+        start_time, end_time = now, now + datetime.timedelta(days=range_days)
+        if day is not None:
+            if (date := availability_summary.parse_day(day, now.date())) is None:
+                raise ToolError(f"Jour non reconnu : {day}. Utiliser le format AAAA-MM-JJ.")
+            # un jour passé donnerait une période vide (début après la fin) : refusé avant
+            # toute requête au calendrier
+            if date < now.date():
+                raise ToolError(
+                    f"Le {date.isoformat()} est déjà passé : demander un jour à partir "
+                    f"d'aujourd'hui ({now.date().isoformat()})."
+                )
+            start_time, end_time = availability_summary.part_window(date, None, self.tz)
+            start_time = max(start_time, now)
+
+        tool_logger.info(
+            "🔍 Recherche des créneaux", days=range_days, day=day, part_of_day=part_of_day
+        )
         
         try:
-            slots = await ctx.userdata.cal.list_available_slots(
-                start_time=now, 
-                end_time=now + datetime.timedelta(days=range_days)
+            availability = ctx.userdata.availability
+            # échéance des requêtes au calendrier, dérivée du budget de latence du tour
+            with turn_deadline():
+                # premier appel : réutiliser la requête lancée au début de l'appel
+                if (prefetch := ctx.userdata.slots_prefetch) is not None:
+                    ctx.userdata.slots_prefetch = None
+                    if (prefetched := await prefetch.take()) is not None:
+                        availability.record(
+                            prefetch.start_time,
+                            prefetch.end_time,
+                            prefetched,
+                            fetched_at=time.monotonic() - prefetch.age.total_seconds(),
+                        )
+
+                # seules les périodes jamais consultées (ou trop anciennes) sont redemandées ;
+                # les longues périodes sont découpées en semaines demandées en parallèle.
+                # Toute la période : le résumé compte chaque jour, sans coupure arbitraire
+                slots = await availability.list_slots(
+                    ctx.userdata.cal.list_available_slots,
+                    start_time=start_time,
+                    end_time=end_time,
+                )
+
+            lines = self._describe_slots(
+                ctx.userdata, slots, now, day=day, part_of_day=part_of_day
             )
-            
-            if not slots:
+            if not lines:
+                if day is not None or part_of_day is not None:
+                    return "Aucun créneau libre à ce moment-là. Puis-je vous proposer un autre moment ?"
                 return "Aucun créneau n'est disponible pour le moment. Puis-je vous proposer une autre période ?"
             
-            lines: list[str] = []
+            tool_logger.info("✅ Créneaux trouvés", count=len(slots))
+            return "\n".join(lines)
             
-            for slot in slots[:20]:  # Limiter à 20 créneaux pour éviter la surcharge
-                local = slot.start_time.astimezone(self.tz)
-                delta = local - now
-                days = delta.days
-                
-                # Calcul du temps relatif en français
-                if local.date() == now.date():
-                    if delta.seconds < 3600:
-                        rel = "dans moins d'une heure"
-                    else:
-                        rel = "aujourd'hui"
-                elif local.date() == (now.date() + datetime.timedelta(days=1)):
-                    rel = "demain"
-                elif days < 7:
-                    rel = f"dans {days} jour{'s' if days > 1 else ''}"
-                elif days < 14:
-                    rel = "la semaine prochaine"
-                else:
-                    rel = f"dans {days // 7} semaine{'s' if days // 7 > 1 else ''}"
-
-                lines.append(
-                    f"{slot.unique_hash} – {local.strftime('%A %d %B %Y')} à "
-                    f"{local.strftime('%H:%M')} ({rel})"
+        except CalendarUnavailableError as e:
+            # calendrier injoignable : proposer les dernières disponibilités connues, à confirmer
+            known = e.last_known(start_time, end_time) if e.last_known is not None else None
+            lines = (
+                self._describe_slots(
+                    ctx.userdata, known.slots, now, day=day, part_of_day=part_of_day
+                )
+                if known is not None
+                else []
+            )
+            if not lines:
+                tool_logger.error(
+                    "🔌 Calendrier indisponible, aucune disponibilité connue", error=str(e)
+                )
+                return (
+                    "Le calendrier est momentanément indisponible : je ne peux pas consulter "
+                    "les créneaux libres pour le moment. Puis-je réessayer dans un instant ?"
                 )
-                self._slots_map[slot.unique_hash] = slot
 
-            logger.info(f"✅ {len(lines)} créneaux trouvés")
-            return "\n".join(lines)
-            
+            minutes = max(1, round(known.age_s / 60))
+            tool_logger.warning(
+                "🔌 Calendrier indisponible, créneaux provisoires", age_min=minutes
+            )
+            return "\n".join(
+                [
+                    f"Disponibilités provisoires (dernière mise à jour il y a {minutes} min, "
+                    "calendrier momentanément indisponible) : la réservation sera confirmée "
+                    "dès le retour du calendrier.",
+                    *lines,
+                ]
+            )
+        except (CalendarTimeoutError, RateLimitedError):
+            # à distinguer de "aucun créneau" : les disponibilités sont inconnues
+            tool_logger.error("⏱️ Le calendrier n'a pas répondu à temps")
+            return (
+                "Le calendrier met plus de temps que prévu à répondre : je ne peux pas encore "
+                "dire quels créneaux sont libres. Puis-je réessayer dans un instant ?"
+            )
         except Exception as e:
-            logger.error(f"❌ Erreur lors de la recherche des créneaux: {e}")
+            tool_logger.error("❌ Erreur lors de la recherche des créneaux", error=str(e))
             return "Je rencontre une difficulté pour consulter le calendrier. Pouvez-vous réessayer ?"
 
+    def _describe_slots(
+        self,
+        userdata: Userdata,
+        slots: list[AvailableSlot],
+        now: datetime.datetime,
+        *,
+        day: str | None,
+        part_of_day: str | None,
+    ) -> list[str]:
+        """Résumé par jour et moment de la journée, ou détail d'un jour / d'un moment ; les
+        créneaux cités sont enregistrés dans `_slots_map` pour la réservation et retenus
+        quelques instants pour cet appel"""
+        self._slots_map.prune(now)
+        # sans les créneaux retenus par d'autres appels (proposés, en cours de réservation)
+        slots = userdata.holds.visible(userdata.hold_scope, slots)
+        if part_of_day is not None:
+            slots = [
+                slot
+                for slot in slots
+                if availability_summary.part_of_day(slot.start_time.astimezone(self.tz))
+                == part_of_day
+            ]
+        if not slots:
+            return []
+
+        offered: list[AvailableSlot] = []
+
+        def _register(slot: AvailableSlot) -> str:
+            offered.append(slot)
+            return self._slots_map.add(slot)
+
+        describe = (
+            availability_summary.summarize
+            if day is None and part_of_day is None
+            else availability_summary.detail
+        )
+        lines = describe(slots, tz=self.tz, now=now, register=_register)
+        userdata.holds.offer(userdata.hold_scope, offered)
+        return lines
+
+    def _taken_message(self, userdata: Userdata, slot: AvailableSlot) -> str:
+        """Conflit avec un autre appel : les créneaux libres les plus proches du même jour,
+        parmi ceux déjà connus (aucune requête au calendrier)"""
+        now = datetime.datetime.now(self.tz)
+        local = slot.start_time.astimezone(self.tz)
+        start, end = availability_summary.part_window(local.date(), None, self.tz)
+        known = userdata.holds.visible(
+            userdata.hold_scope, userdata.availability.known(max(start, now), end)
+        )
+        nearest = sorted(
+            (s for s in known if s.start_time != slot.start_time),
+            key=lambda s: abs(s.start_time - slot.start_time),
+        )
+        lines = self._describe_slots(
+            userdata,
+            sorted(nearest[:CONFLICT_ALTERNATIVES], key=lambda s: s.start_time),
+            now,
+            day=local.date().isoformat(),
+            part_of_day=None,
+        )
+        message = "Ce créneau vient d'être choisi par une autre personne."
+        if not lines:
+            return f"{message} Puis-je vous proposer d'autres options ?"
+        return "\n".join([f"{message} Créneaux proches encore libres :", *lines])
+
 
 def setup_langfuse(
     host: str | None = None, 
     public_key: str | None = None, 
     secret_key: str | None = None
 ):
-    """Configuration optionnelle de Langfuse pour l'analyse des conversations"""
+    """Configuration optionnelle de Langfuse pour l'analyse des conversations
+
+    Returns:
+        Le TracerProvider installé, ou None si Langfuse n'est pas configuré
+    """
     try:
         from livekit.agents.telemetry import set_tracer_provider
         from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
@@ -307,20 +579,51 @@ def setup_langfuse(
         set_tracer_provider(trace_provider)
         
         logger.info("✅ Langfuse configuré avec succès")
+        return trace_provider
     except ImportError:
         logger.warning("⚠️ Langfuse non disponible (packages manquants)")
     except Exception as e:
         logger.error(f"❌ Erreur configuration Langfuse: {e}")
 
 
-async def entrypoint(ctx: JobContext):
-    """Point d'entrée principal de l'agent Zora"""
-    setup_langfuse()
-    await ctx.connect()
+def _rss_mb() -> float | None:
+    try:
+        import psutil
 
-    # Configuration française
-    timezone = "Europe/Paris"
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def prewarm(proc: JobProcess) -> None:
+    """Charge les modèles une seule fois par processus worker, avant l'arrivée des appels"""
+    # logs écrits par un thread dédié, niveaux par module depuis ZORA_LOG_LEVELS
+    structured_logging.configure_logging()
+
+    # le détecteur de fin de tour (MultilingualModel) a besoin du contexte du job : il est
+    # construit dans l'entrypoint, son modèle est chargé par le processus d'inférence du worker
+    loaders = {
+        "vad": silero.VAD.load,
+    }
+
+    for name, load in loaders.items():
+        rss_before = _rss_mb()
+        started_at = time.perf_counter()
+        proc.userdata[name] = load()
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+        rss_after = _rss_mb()
+        if rss_before is not None and rss_after is not None:
+            logger.info(
+                f"🔥 Modèle {name} préchargé en {elapsed_ms:.0f} ms "
+                f"(+{rss_after - rss_before:.1f} Mo, RSS {rss_after:.1f} Mo)"
+            )
+        else:
+            logger.info(f"🔥 Modèle {name} préchargé en {elapsed_ms:.0f} ms")
 
+
+async def setup_calendar(timezone: str) -> Calendar:
+    """Charge la config de l'assistant et initialise le calendrier correspondant"""
     # Configuration du calendrier par assistant
     assistant_id = os.getenv("ASSISTANT_ID")
     logger.info("🔧 Configuration du calendrier...")
@@ -329,15 +632,37 @@ async def entrypoint(ctx: JobContext):
 
     if assistant_id:
         logger.info(f"📋 Chargement config pour assistant: {assistant_id}")
-        calcom_config = await get_assistant_calcom_config(assistant_id)
+        try:
+            calcom_config = await get_assistant_calcom_config(assistant_id)
+        except ConfigUnavailableError as e:
+            # le cabinet a peut-être un calendrier : ni faux créneaux, ni clé legacy d'un autre
+            # calendrier, les outils répondent que le calendrier est indisponible
+            logger.error(f"❌ Config Cal.com indisponible, aucune réservation possible: {e}")
+            return UnavailableCalendar(str(e))
+        # invalide le cache de config quand le dashboard sauvegarde de nouveaux réglages
+        shared_config_loader.start_watching()
 
         if calcom_config and calcom_config.get('enabled', False):
             logger.info("✅ Configuration Cal.com trouvée et activée")
-            cal = CalComCalendar(
-                api_key=calcom_config['apiKey'],
-                timezone=timezone,
-                event_id=calcom_config.get('eventId')  # Utilise l'Event ID configuré
-            )
+            # cabinet à plusieurs praticiens / types de rendez-vous : interrogés en parallèle
+            if calendars := calcom_config.get('calendars'):
+                cal = CompositeCalendar(
+                    {
+                        str(c.get('calendarName') or c['eventId']): CalComCalendar(
+                            api_key=c.get('apiKey') or calcom_config['apiKey'],
+                            timezone=timezone,
+                            event_id=c['eventId'],
+                        )
+                        for c in calendars
+                    }
+                )
+                logger.info(f"📚 {len(calendars)} calendriers Cal.com combinés")
+            else:
+                cal = CalComCalendar(
+                    api_key=calcom_config['apiKey'],
+                    timezone=timezone,
+                    event_id=calcom_config.get('eventId')  # Utilise l'Event ID configuré
+                )
         else:
             logger.info("ℹ️ Configuration Cal.com non trouvée ou désactivée")
     else:
@@ -357,17 +682,61 @@ async def entrypoint(ctx: JobContext):
         await cal.initialize()
         logger.info("✅ Calendrier initialisé")
     except Exception as e:
+        # jamais de faux créneaux pour un vrai cabinet : l'initialisation est retentée au premier
+        # appel d'outil, qui répond en mode dégradé tant que Cal.com reste injoignable
         logger.error(f"❌ Échec initialisation calendrier: {e}")
-        logger.info("🔄 Basculement vers calendrier de test")
-        cal = FakeCalendar(timezone=timezone)
-        await cal.initialize()
+
+    return cal
+
+
+async def entrypoint(ctx: JobContext):
+    """Point d'entrée principal de l'agent Zora"""
+    # latences par phase (STT, LLM, outils / Cal.com, TTS), étiquetées par assistant
+    observability.set_assistant_id(os.getenv("ASSISTANT_ID"))
+    observability.setup_telemetry(tracer_provider=setup_langfuse())
+
+    # Configuration française
+    timezone = "Europe/Paris"
+
+    # connexions à Cal.com ouvertes (DNS, TLS) pendant le chargement de la config : initialize()
+    # et la première recherche de créneaux partent sur des sockets déjà prêts
+    shared_http_pool.acquire()
+
+    async def send_queued_bookings():
+        # le processus du job s'arrête après l'appel : dernier envoi des réservations en attente,
+        # les autres restent dans le journal pour le prochain appel du même calendrier. Les
+        # callbacks d'arrêt tournent en parallèle : le pool HTTP n'est libéré qu'après cet envoi
+        try:
+            for queue in shared_booking_queues:
+                await queue.aclose()
+        finally:
+            await shared_http_pool.release()
+
+    ctx.add_shutdown_callback(send_queued_bookings)
+    warmup_task = asyncio.create_task(shared_http_pool.warm(BASE_URL))
+
+    # Config, initialisation du calendrier et premiers créneaux démarrent dès l'arrivée du job,
+    # en parallèle de la connexion à la room
+    calendar_task = asyncio.create_task(setup_calendar(timezone))
+    slots_prefetch = SlotPrefetch.start(
+        calendar_task, tz=ZoneInfo(timezone), days=RANGE_DAYS["default"]
+    )
+
+    await ctx.connect()
+    cal = await calendar_task
+
+    # transcription, outils, réservations et usage de l'appel, écrits par lots hors du tour
+    records = shared_call_records.for_call(ctx.job.id, assistant_id=os.getenv("ASSISTANT_ID"))
 
     # Récupération du prompt personnalisé (optionnel)
     custom_prompt = os.getenv("ZORA_CUSTOM_PROMPT")
     
+    # les sessions du worker partagent les requêtes de disponibilités identiques en cours
+    userdata = Userdata(cal=CoalescingCalendar(cal), slots_prefetch=slots_prefetch, records=records)
+
     # Configuration de la session
     session = AgentSession[Userdata](
-        userdata=Userdata(cal=cal),
+        userdata=userdata,
         preemptive_generation=True,
         stt=deepgram.STT(
             language="fr",  # Français exclusivement
@@ -384,17 +753,32 @@ async def entrypoint(ctx: JobContext):
             model="eleven_flash_v2_5",
             voice="CwhRBWXzGAHq8TQ4Fs17"  # Roger - voix masculine claire
         ),
+        # modèles chargés par prewarm() ; repli sur un chargement local si le job n'en a pas
         turn_detection=MultilingualModel(),
-        vad=silero.VAD.load(),
+        vad=ctx.proc.userdata.get("vad") or silero.VAD.load(),
         max_tool_steps=3,  # Permettre plusieurs étapes pour les workflows complexes
     )
 
     # Collecteur de métriques
     usage_collector = metrics.UsageCollector()
 
-    @session.on("new_chat_message")
-    def on_new_chat_message(msg):
-        print(f"[{msg.role.upper()}]: {msg.content}")
+    @session.on("conversation_item_added")
+    def on_new_chat_message(ev: ConversationItemAddedEvent):
+        if isinstance(ev.item, ChatMessage) and (text := ev.item.text_content):
+            chat_logger.info("💬 Message", role=ev.item.role, content=text)
+            records.transcript(ev.item.role, text)
+
+    @session.on("function_tools_executed")
+    def _on_tools_executed(ev: FunctionToolsExecutedEvent):
+        for call, output in ev.zipped():
+            records.tool(
+                call.name,
+                arguments=call.arguments,
+                output=output.output,
+                is_error=output.is_error,
+            )
+
+    observability.instrument_session(session, assistant_id=os.getenv("ASSISTANT_ID"))
 
     @session.on("metrics_collected")
     def _on_metrics_collected(ev: MetricsCollectedEvent):
@@ -404,9 +788,50 @@ async def entrypoint(ctx: JobContext):
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"📊 Utilisation: {summary}")
+        backends = cal.calendars.values() if isinstance(cal, CompositeCalendar) else [cal]
+        calcom = [c for c in backends if isinstance(c, CalComCalendar)]
+        if calcom and calcom[0].slot_cache is not None:
+            stats = calcom[0].slot_cache.stats
+            logger.info(
+                f"📊 Cache créneaux: {stats.hits} hits, {stats.misses} misses "
+                f"({stats.hit_ratio:.0%}), {stats.evictions} évictions, "
+                f"{stats.invalidations} invalidations"
+            )
+        # un circuit (et une file de réservations) par clé d'API
+        for c in {c.breaker.name: c for c in calcom}.values():
+            breaker, queue = c.breaker, c.booking_queue
+            logger.info(
+                f"📊 Circuit Cal.com {breaker.name}: {breaker.state}, "
+                f"{breaker.stats.failures} échecs, {breaker.stats.rejected} appels refusés ; "
+                f"réservations en attente: {len(queue)} ({queue.stats.confirmed} confirmées, "
+                f"{queue.stats.rejected} refusées, {queue.stats.failed} en échec)"
+            )
+        pool = shared_http_pool.stats
+        logger.info(
+            f"📊 Pool HTTP: {pool.requests} requêtes, {pool.connections_created} connexions "
+            f"ouvertes ({pool.reuse_ratio:.0%} réutilisées), {pool.queued} en attente d'une "
+            f"connexion, pic de {pool.peak_in_flight} requêtes simultanées"
+        )
 
     ctx.add_shutdown_callback(log_usage)
 
+    async def save_call_records():
+        records.usage(dataclasses.asdict(usage_collector.get_summary()))
+        await shared_call_records.flush()
+
+    ctx.add_shutdown_callback(save_call_records)
+
+    async def cancel_prefetch():
+        slots_prefetch.cancel()
+
+    ctx.add_shutdown_callback(cancel_prefetch)
+
+    async def release_holds():
+        # raccroché : les créneaux proposés ou en cours de choix redeviennent visibles
+        userdata.holds.release_all()
+
+    ctx.add_shutdown_callback(release_holds)
+
     # Démarrage de l'agent
     await session.start(
         agent=ZoraAgent(timezone=timezone, custom_prompt=custom_prompt), 
@@ -415,9 +840,23 @@ async def entrypoint(ctx: JobContext):
 
 
 if __name__ == "__main__":
+    prometheus_port = (
+        int(os.environ["ZORA_PROMETHEUS_PORT"]) if os.getenv("ZORA_PROMETHEUS_PORT") else None
+    )
     cli.run_app(
         WorkerOptions(
-            entrypoint_fnc=entrypoint, 
-            agent_name="zora_agent"
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            agent_name="zora_agent",
+            # histogrammes de latence exposés sur :{port}/metrics (voir observability.py)
+            prometheus_port=prometheus_port,
+            # les appels tournent dans les processus des jobs : leurs métriques passent par ce
+            # répertoire (vidé au démarrage du worker), sans lui /metrics ne montre que le
+            # processus principal
+            prometheus_multiproc_dir=(
+                os.getenv("PROMETHEUS_MULTIPROC_DIR") or state_path(PROMETHEUS_MULTIPROC_DIR_NAME)
+                if prometheus_port is not None
+                else None
+            ),
         )
     )